@@ -0,0 +1,116 @@
+"""Near-duplicate detection over a synthetic 100k-track library.
+
+Generates songs from a random vocabulary and uploads of them in the usual
+disguises ("(Official Audio)", "[Lyrics]", "Title - Artist", different
+case and accents), plus live versions that must stay separate. Reports the
+time to index and cluster, pair precision and recall against the known
+songs, the latency of one ``similar`` lookup and of incremental adds.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_dedupe.py``.
+"""
+
+import random
+import statistics
+import time
+from itertools import combinations
+
+from ytmusic.dedupe import DuplicateIndex
+from ytmusic.models import Track
+
+TRACKS = 100_000
+SUFFIXES = (
+    "",
+    " (Official Audio)",
+    " [Official Music Video]",
+    " (Lyrics)",
+    " | Lyric Video",
+    " (Visualizer)",
+    " HD",
+)
+
+
+def library(rng: random.Random) -> tuple[list[Track], list[int]]:
+    letters = "abcdefghijklmnopqrstuvwxyzéö"
+    vocab = [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        for _ in range(20_000)
+    ]
+    tracks, song_of = [], []
+    song = 0
+    while len(tracks) < TRACKS:
+        artist = " ".join(rng.sample(vocab, rng.randint(1, 2))).title()
+        name = " ".join(rng.sample(vocab, rng.randint(1, 4))).title()
+        uploads = rng.choice((1, 1, 1, 2, 2, 3, 4))
+        for _ in range(uploads):
+            if rng.random() < 0.2:
+                title = f"{name} - {artist}"
+            else:
+                title = f"{artist} - {name}"
+            if rng.random() < 0.2:
+                title = title.upper() if rng.random() < 0.5 else title.lower()
+            title += rng.choice(SUFFIXES)
+            tracks.append(Track(title, f"{len(tracks):011d}"))
+            song_of.append(song)
+        if rng.random() < 0.05:
+            # A live recording is a different track.
+            tracks.append(Track(f"{artist} - {name} (Live)", f"{len(tracks):011d}"))
+            song += 1
+            song_of.append(song)
+        song += 1
+    return tracks[:TRACKS], song_of[:TRACKS]
+
+
+def main() -> None:
+    rng = random.Random(7)
+    tracks, song_of = library(rng)
+
+    index = DuplicateIndex()
+    start = time.perf_counter()
+    index.add(tracks)
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    clusters = index.clusters()
+    clustered = time.perf_counter() - start
+    print(
+        f"{len(tracks)} tracks: indexed in {indexed:.2f}s, clustered in {clustered:.2f}s"
+    )
+
+    row = {t.video_id: i for i, t in enumerate(tracks)}
+    found = {
+        pair
+        for c in clusters
+        for pair in combinations(sorted(row[t.video_id] for t in c), 2)
+    }
+    by_song: dict[int, list[int]] = {}
+    for i, s in enumerate(song_of):
+        by_song.setdefault(s, []).append(i)
+    truth = {pair for rows in by_song.values() for pair in combinations(rows, 2)}
+    hits = len(found & truth)
+    print(
+        f"{len(clusters)} clusters; pair precision {hits / max(1, len(found)):.3f}, "
+        f"recall {hits / max(1, len(truth)):.3f}"
+    )
+
+    probes = rng.sample(tracks, 200)
+    times = []
+    for t in probes:
+        start = time.perf_counter()
+        index.similar(t)
+        times.append(time.perf_counter() - start)
+    print(f"similar(): median {statistics.median(times) * 1000:.2f} ms")
+
+    extra = [Track(f"New Song {i} - Someone", f"new{i:08d}") for i in range(1000)]
+    start = time.perf_counter()
+    for t in extra[:100]:
+        index.add([t])
+    one = (time.perf_counter() - start) / 100
+    start = time.perf_counter()
+    index.add(extra[100:])
+    print(
+        f"incremental add: {one * 1000:.2f} ms per single track, "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms for 900 at once"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Format choice against a local HTTP server throttled to fixed rates.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_format_policy.py``.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ytmusic.config import FORMAT_MODES
+from ytmusic.formats import FormatPolicy
+
+SAMPLE_BYTES = 128 * 1024
+CHUNK = 8 * 1024
+RATES_KBPS = (96, 256, 1024, 8192)
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    """Serves zero bytes at ``/<kbit per second>``."""
+
+    def do_GET(self):
+        rate = int(self.path.strip("/")) * 1000 / 8
+        self.send_response(206)
+        self.send_header("Content-Length", str(SAMPLE_BYTES))
+        self.end_headers()
+        sent = 0
+        start = time.monotonic()
+        while sent < SAMPLE_BYTES:
+            self.wfile.write(b"\0" * CHUNK)
+            sent += CHUNK
+            ahead = sent / rate - (time.monotonic() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    print(
+        f"{'link':>10}  {'measured':>10}  "
+        + "  ".join(f"{m:>10}" for m in FORMAT_MODES)
+    )
+    for kbps in RATES_KBPS:
+        policy = FormatPolicy()
+        rate = policy.measure(f"{base}/{kbps}", SAMPLE_BYTES)
+        chosen = []
+        for mode in FORMAT_MODES:
+            policy.mode = mode
+            chosen.append(f"{policy.choose().label:>10}")
+        print(f"{kbps:>6}kbit  {rate * 8 / 1000:>6.0f}kbit  " + "  ".join(chosen))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
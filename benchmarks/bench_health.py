@@ -0,0 +1,79 @@
+"""Playlist health check against ``fake_ytdlp.py``.
+
+Builds a playlist where some tracks are private or deleted, some fail
+with a network error and a couple are rate limited, then checks it with
+one probe in flight and with the default concurrency. Reports probes per
+second, whether every verdict is right and the time of a second check
+answered from the verdict cache.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_health.py [--tracks N]``.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import ytmusic.health as health_module
+from ytmusic.config import HEALTH_CONCURRENCY
+from ytmusic.health import HealthChecker
+from ytmusic.models import Track
+
+health_module.YTDLP_BINARY = str(Path(__file__).with_name("fake_ytdlp.py"))
+os.environ.setdefault("FAKE_YTDLP_DELAY", "0.3")
+
+
+def playlist(n: int, rng: random.Random) -> list[Track]:
+    kinds = ["okay"] * 85 + ["priv"] * 6 + ["gone"] * 6 + ["flak"] * 3
+    tracks = []
+    for i in range(n):
+        kind = "rate" if i in (n // 3, 2 * n // 3) else rng.choice(kinds)
+        tracks.append(Track(f"Song {i}", f"{kind}{i:07d}"))
+    return tracks
+
+
+def run(tracks: list[Track], concurrency: int, path: Path) -> None:
+    checker = HealthChecker(path=path, concurrency=concurrency)
+    start = time.perf_counter()
+    progress = checker.check(tracks)
+    elapsed = time.perf_counter() - start
+    wrong = 0
+    for t in tracks:
+        v = checker.verdict(t.video_id)
+        kind = t.video_id[:4]
+        if kind in ("priv", "gone"):
+            wrong += v is None or v.ok
+        elif kind in ("flak", "rate"):
+            wrong += v is not None
+        else:
+            wrong += v is None or not v.ok
+    print(
+        f"concurrency {concurrency}: {len(tracks)} tracks in {elapsed:.1f}s "
+        f"({progress.rate:.1f} probes/s), {progress.dead} dead, "
+        f"{progress.unknown} unknown, {wrong} wrong verdicts"
+    )
+
+    again = HealthChecker(path=path, concurrency=concurrency)
+    start = time.perf_counter()
+    progress = again.check(tracks)
+    print(
+        f"  second check: {progress.cached} cached, "
+        f"{progress.finished - progress.cached} probed again "
+        f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=60)
+    args = parser.parse_args()
+    tracks = playlist(args.tracks, random.Random(5))
+    tmp = Path(tempfile.mkdtemp(prefix="ytmusic-health-"))
+    for concurrency in sorted({1, HEALTH_CONCURRENCY}):
+        run(tracks, concurrency, tmp / f"health-{concurrency}.json")
+
+
+if __name__ == "__main__":
+    main()
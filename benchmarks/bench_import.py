@@ -0,0 +1,92 @@
+"""Tracklist import throughput and accuracy against ``fake_ytdlp.py``.
+
+Generates an "Artist - Title" tracklist from a random vocabulary, with
+some lines that have no artist (several songs share the title) or find
+nothing, and imports it with one search in flight and with the default
+concurrency. Each search sleeps ``FAKE_YTDLP_DELAY`` seconds (default
+1.0, roughly a real yt-dlp search). Reports lines per minute, how many
+lines were matched or sent to review, and whether every match is the
+intended upload.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_import.py [--lines N]``.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import ytmusic.search as search_module
+from ytmusic.config import IMPORT_CONCURRENCY
+from ytmusic.importer import TracklistImporter
+from ytmusic.models import Playlist
+
+search_module.YTDLP_BINARY = str(Path(__file__).with_name("fake_ytdlp.py"))
+os.environ.setdefault("FAKE_YTDLP_DELAY", "1.0")
+
+
+def tracklist(n: int, rng: random.Random) -> list[str]:
+    vocab = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 8))
+        )
+        for _ in range(2000)
+    ]
+    lines = []
+    for i in range(n):
+        artist = " ".join(rng.sample(vocab, rng.randint(1, 2))).title()
+        title = " ".join(rng.sample(vocab, rng.randint(1, 4))).title()
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(title)
+        elif roll < 0.08:
+            lines.append(f"{artist} - {title} nomatch")
+        else:
+            lines.append(f"{i + 1}. {artist} - {title}")
+    return lines
+
+
+def run(lines: list[str], concurrency: int, tmp: Path) -> None:
+    playlist = Playlist(id="bench", name="Bench")
+    importer = TracklistImporter(
+        playlist,
+        lambda: None,
+        tmp / f"review-{concurrency}.tsv",
+        state=tmp / f"state-{concurrency}.json",
+        concurrency=concurrency,
+    )
+    start = time.perf_counter()
+    progress = importer.run(iter(lines))
+    elapsed = time.perf_counter() - start
+    # The official video, or the same song bare on the artist's channel.
+    wanted = {
+        t
+        for line in lines
+        if ". " in line and "nomatch" not in line
+        for t in (
+            line.split(". ", 1)[1] + " (Official Video)",
+            line.split(" - ", 1)[1],
+        )
+    }
+    wrong = sum(t.title not in wanted for t in playlist.tracks)
+    print(
+        f"concurrency {concurrency}: {len(lines)} lines in {elapsed:.1f}s, "
+        f"{progress.per_minute:.0f} lines/min; {progress.matched} matched, "
+        f"{progress.review} to review, {wrong} wrong matches"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=60)
+    args = parser.parse_args()
+    lines = tracklist(args.lines, random.Random(3))
+    tmp = Path(tempfile.mkdtemp(prefix="ytmusic-import-"))
+    for concurrency in sorted({1, IMPORT_CONCURRENCY}):
+        run(lines, concurrency, tmp)
+
+
+if __name__ == "__main__":
+    main()
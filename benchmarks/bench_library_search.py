@@ -0,0 +1,63 @@
+"""Local library search latency over a 100k-track index.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_library_search.py``.
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ytmusic.library import LibraryIndex
+from ytmusic.models import Track
+
+LIBRARY_SIZE = 100_000
+QUERIES = (
+    "artist 42",
+    "song title 99",
+    "titl numbr",
+    "remix",
+    "acoustic 5",
+    "artst 7 nmber",
+)
+WORDS = ("live", "remix", "acoustic", "official", "audio", "cover", "remastered")
+
+
+def _tracks() -> list[Track]:
+    rng = random.Random(1)
+    return [
+        Track(
+            f"Artist {i % 997} - Song Title Number {i} ({rng.choice(WORDS)})",
+            f"{i:011d}",
+        )
+        for i in range(LIBRARY_SIZE)
+    ]
+
+
+def main() -> None:
+    tracks = _tracks()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "library.jsonl"
+        index = LibraryIndex(path)
+        start = time.perf_counter()
+        index.add(tracks)
+        print(f"index {LIBRARY_SIZE} tracks: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        index.add(tracks[:20])
+        print(f"re-add 20 seen tracks: {(time.perf_counter() - start) * 1000:.2f}ms")
+        index.close()
+
+        start = time.perf_counter()
+        index = LibraryIndex(path)
+        print(f"load from disk: {time.perf_counter() - start:.2f}s")
+        for q in QUERIES:
+            start = time.perf_counter()
+            hits = index.search(q)
+            ms = (time.perf_counter() - start) * 1000
+            top = hits[0].title if hits else "-"
+            print(f"{q!r:>18}: {ms:7.2f}ms  {len(hits):2d} hits  {top}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Loudness analysis accuracy and throughput on generated WAV fixtures.
+
+Writes stereo 48 kHz 16-bit WAV files of known level to a temporary
+directory: a 997 Hz stereo sine, which per EBU Tech 3341 measures its
+peak level in dBFS as LUFS, and pink-ish noise with a quiet passage that
+the gate should ignore. Checks the measurements, then analyses a batch of 3-minute tracks through ``LoudnessStore`` and reports
+tracks per second per worker process.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_loudness.py``.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from ytmusic.loudness import LoudnessStore, analyze_file
+
+FS = 48000
+TRACK_SECS = 180
+TRACKS = 8
+
+
+def write_wav(path: Path, samples: np.ndarray) -> None:
+    data = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(FS)
+        w.writeframes(data.tobytes())
+
+
+def sine(peak_dbfs: float, secs: float) -> np.ndarray:
+    t = np.arange(int(FS * secs)) / FS
+    x = 10 ** (peak_dbfs / 20) * np.sin(2 * np.pi * 997 * t)
+    return np.column_stack([x, x])
+
+
+def music_like(rng: np.random.Generator, level_dbfs: float, secs: float) -> np.ndarray:
+    """Noise with a 1/f-ish spectrum, loud verses and a near-silent break."""
+    n = int(FS * secs)
+    spec = np.fft.rfft(rng.standard_normal((2, n)), axis=1)
+    spec /= np.sqrt(np.maximum(np.fft.rfftfreq(n, 1 / FS), 20))
+    x = np.fft.irfft(spec, n, axis=1).T
+    x *= 10 ** (level_dbfs / 20) / np.sqrt(np.mean(x**2))
+    x[n // 3 : n // 3 + FS * 10] *= 0.001
+    return x
+
+
+def main() -> None:
+    rng = np.random.default_rng(1)
+    workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print("accuracy")
+        for level in (-10.0, -20.0, -30.0):
+            path = root / f"sine{level:.0f}.wav"
+            write_wav(path, sine(level, 20))
+            expected = level
+            got = analyze_file(str(path))
+            print(
+                f"  997 Hz at {level:>5.1f} dBFS: {got:7.2f} LUFS (expect {expected:.2f})"
+            )
+            if abs(got - expected) > 0.2:
+                sys.exit("measurement off by more than 0.2 LU")
+
+        paths = []
+        for i in range(TRACKS):
+            path = root / f"track{i:02d}.wav"
+            write_wav(path, music_like(rng, -12.0 - 2 * i, TRACK_SECS))
+            paths.append(path)
+
+        start = time.perf_counter()
+        for p in paths[:2]:
+            analyze_file(str(p))
+        inline = (time.perf_counter() - start) / 2
+        print(f"\nin-process: {1 / inline:.2f} tracks/s ({TRACK_SECS}s stereo WAV)")
+
+        store = LoudnessStore(root / "loudness.json", workers=workers)
+        start = time.perf_counter()
+        futures = [store.submit(p.stem, p) for p in paths]
+        values = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+        store.close()
+        print(
+            f"pool of {workers}: {TRACKS} tracks in {elapsed:.2f}s, "
+            f"{TRACKS / elapsed / workers:.2f} tracks/s/core (incl. worker start-up)"
+        )
+        for p, v in zip(paths, values):
+            print(f"  {p.stem}: {v:6.2f} LUFS")
+
+
+if __name__ == "__main__":
+    main()
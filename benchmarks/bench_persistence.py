@@ -0,0 +1,166 @@
+"""Cost of saving playlist edits, and what a crash mid-save leaves behind.
+
+Builds a library of playlists and applies a burst of edits (one track
+added per edit, as when adding tracks one after another), saving after
+each the way the app would:
+
+- ``in-place``: the old ``save_playlists``, ``open(path, "w")`` and dump;
+- ``atomic``: ``save_playlists`` now, temp file, fsync and rename;
+- ``write-behind``: ``WriteBehind.submit`` of a snapshot, as the app does.
+
+For each it reports edits per second and the time an edit blocks the
+caller (the UI thread in the app), how many writes reached the disk, and
+the time ``close`` takes to flush the rest; the final file must hold every
+edit. Then it kills a process that keeps saving, at random moments, and
+counts files left unreadable by in-place and by atomic writes.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_persistence.py
+[--tracks N] [--edits N] [--kills N]``.
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ytmusic.models import Playlist, Track
+from ytmusic.storage import (
+    WriteBehind,
+    playlists_data,
+    snapshot_playlists,
+    write_json_atomic,
+)
+
+PLAYLISTS = 20
+
+# Saves a 5k-track library forever; argv: path, mode.
+_WRITER = """
+import json, sys
+from ytmusic.storage import write_json_atomic
+path, mode = sys.argv[1], sys.argv[2]
+data = {"playlists": {str(p): {"name": f"List {p}", "tracks": [
+    {"title": f"Artist {i} - Song {i}", "video_id": f"{i:011d}"}
+    for i in range(250)]} for p in range(20)}}
+print("ready", flush=True)
+while True:
+    if mode == "in-place":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        write_json_atomic(__import__("pathlib").Path(path), data, indent=2)
+"""
+
+
+def library(tracks: int) -> dict[str, Playlist]:
+    per = tracks // PLAYLISTS
+    return {
+        f"pl{p:02d}": Playlist(
+            f"pl{p:02d}",
+            f"List {p}",
+            [Track(f"Artist {i} - Song {i}", f"{p:02d}{i:09d}") for i in range(per)],
+        )
+        for p in range(PLAYLISTS)
+    }
+
+
+def save_in_place(path: Path, playlists: dict[str, Playlist]) -> None:
+    data = playlists_data(snapshot_playlists(playlists, "pl00"))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def save_atomic(path: Path, playlists: dict[str, Playlist]) -> None:
+    data = playlists_data(snapshot_playlists(playlists, "pl00"))
+    write_json_atomic(path, data, indent=2)
+
+
+def run(mode: str, tracks: int, edits: int, tmp: Path) -> None:
+    path = tmp / f"{mode}.json"
+    playlists = library(tracks)
+    writer = WriteBehind(path, playlists_data, indent=2)
+    blocked = []
+    began = time.perf_counter()
+    for n in range(edits):
+        t0 = time.perf_counter()
+        pl = playlists[f"pl{n % PLAYLISTS:02d}"]
+        pl.tracks.append(Track(f"New Song {n}", f"new{n:08d}"))
+        if mode == "in-place":
+            save_in_place(path, playlists)
+        elif mode == "atomic":
+            save_atomic(path, playlists)
+        else:
+            writer.submit(snapshot_playlists(playlists, "pl00"))
+        blocked.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    writer.close()
+    flush = time.perf_counter() - t0
+    elapsed = time.perf_counter() - began
+    writes = writer.written if mode == "write-behind" else edits
+
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    expected = playlists_data(snapshot_playlists(playlists, "pl00"))
+    assert saved == expected, f"{mode}: file does not hold the last edit"
+
+    blocked.sort()
+    print(
+        f"{mode:>12}: {edits / elapsed:8.0f} edits/s  "
+        f"blocks {statistics.median(blocked) * 1e3:7.3f} ms median, "
+        f"{blocked[int(len(blocked) * 0.99)] * 1e3:7.3f} ms p99  "
+        f"{writes:>4} writes  close {flush * 1e3:6.1f} ms"
+    )
+
+
+def crashes(mode: str, kills: int, tmp: Path) -> int:
+    """Kill a saving process ``kills`` times; count unreadable files."""
+    path = tmp / f"crash-{mode}.json"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    bad = 0
+    for _ in range(kills):
+        proc = subprocess.Popen(
+            [sys.executable, "-c", _WRITER, str(path), mode],
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        proc.stdout.readline()
+        time.sleep(random.uniform(0.05, 0.3))
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+        proc.stdout.close()
+        try:
+            with open(path, encoding="utf-8") as f:
+                json.load(f)
+        except (OSError, ValueError):
+            bad += 1
+    return bad
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=5_000)
+    parser.add_argument("--edits", type=int, default=300)
+    parser.add_argument("--kills", type=int, default=20)
+    args = parser.parse_args()
+    random.seed(0)
+    tmp = Path(tempfile.mkdtemp(prefix="ytmusic-persist-"))
+
+    print(f"{args.edits} edits to {args.tracks} tracks in {PLAYLISTS} playlists")
+    for mode in ("in-place", "atomic", "write-behind"):
+        run(mode, args.tracks, args.edits, tmp)
+
+    if args.kills:
+        print(f"\nkilled mid-save {args.kills} times:")
+        for mode in ("in-place", "atomic"):
+            bad = crashes(mode, args.kills, tmp)
+            print(f"{mode:>12}: {bad}/{args.kills} files unreadable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Spectrum visualizer accuracy and CPU cost, from a local WAV file.
+
+Plays a generated WAV of three tones (200 Hz, 1 kHz, 5 kHz, four seconds
+each) through ``Player`` and ``Visualizer`` with ``fake_mpv.py`` standing
+in for both mpv instances, so it needs neither mpv nor a network. Reports
+which band peaked during each tone, the frame rate, the visualizer
+thread's CPU time per second of playback, and that time while paused.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_spectrum.py``.
+"""
+
+import os
+import tempfile
+import time
+import wave
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+import ytmusic.player as player_module
+import ytmusic.spectrum as spectrum_module
+from ytmusic.config import SPECTRUM_RATE
+from ytmusic.models import Track
+from ytmusic.player import Player
+from ytmusic.spectrum import SpectrumAnalyzer, Visualizer
+
+TONES = (200.0, 1000.0, 5000.0)
+TONE_SECS = 4.0
+PAUSE_SECS = 2.0
+
+FAKE_MPV = str(Path(__file__).with_name("fake_mpv.py"))
+player_module.MPV_BINARY = spectrum_module.MPV_BINARY = FAKE_MPV
+
+
+def write_wav(path: Path) -> None:
+    t = np.arange(int(SPECTRUM_RATE * TONE_SECS)) / SPECTRUM_RATE
+    x = np.concatenate([0.5 * np.sin(2 * np.pi * f * t) for f in TONES])
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SPECTRUM_RATE)
+        w.writeframes((x * 32767).astype("<i2").tobytes())
+
+
+def main() -> None:
+    edges = SpectrumAnalyzer().edges
+    peaks: list[tuple[float, int]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = Path(tmp) / "tones.wav"
+        write_wav(wav)
+        os.environ["FAKE_MPV_DURATION"] = str(TONE_SECS * len(TONES))
+        player_module.local_path = lambda video_id: wav
+        player = Player()
+        vis = Visualizer(
+            player,
+            lambda levels, db: peaks.append((player.position, int(levels.argmax()))),
+        )
+        player.play(Track("Tones", "tones000000"))
+        vis.start()
+        time.sleep(TONE_SECS * 1.5)
+        player.toggle_pause()
+        time.sleep(0.3)
+        before = vis.cpu_time, vis.frames
+        time.sleep(PAUSE_SECS)
+        paused_cpu = vis.cpu_time - before[0]
+        paused_frames = vis.frames - before[1]
+        player.toggle_pause()
+        while player.is_playing:
+            time.sleep(0.1)
+        vis.stop()
+        played = TONE_SECS * len(TONES)
+
+    for i, tone in enumerate(TONES):
+        # Skip the first and last half second of each tone: the position is
+        # polled twice a second.
+        lo, hi = i * TONE_SECS + 0.5, (i + 1) * TONE_SECS - 0.5
+        bands = Counter(b for pos, b in peaks if lo <= pos < hi)
+        band = bands.most_common(1)[0][0] if bands else None
+        span = (
+            f"{edges[band]:.0f}-{edges[band + 1]:.0f} Hz" if band is not None else "-"
+        )
+        print(f"{tone:>6.0f} Hz tone: peak band {span}")
+    print(f"frames: {vis.frames} ({vis.frames / played:.1f}/s)")
+    print(f"CPU: {vis.cpu_time / played * 1000:.1f} ms per second played")
+    print(
+        f"paused {PAUSE_SECS:.0f}s: {paused_frames} frames, {paused_cpu * 1000:.1f} ms CPU"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Cost of the now-playing status export.
+
+Starts a ``StatusPublisher`` on a temporary socket with a number of
+subscribers, then reports the cost of ``publish`` when nothing worth
+reporting changed (the app calls it every ``STATUS_INTERVAL``), the cost
+of a change fanned out to every subscriber, the delay until a subscriber
+has the line, and that a subscriber which stops reading is dropped
+instead of stalling the publisher.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_status.py [--subscribers N]``.
+"""
+
+import argparse
+import socket
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from ytmusic.status import Status, StatusPublisher
+
+CALLS = 100_000
+CHANGES = 2_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="ytmusic-status-"))
+    path = str(tmp / "status.sock")
+    publisher = StatusPublisher(path, file_path=None, step=10.0)
+    assert publisher.start()
+    status = Status("playing", "Some Artist - Some Song", "abcdefghijk", 0.0, 215.0, 12)
+    publisher.publish(status)
+
+    clients = []
+    for _ in range(args.subscribers):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(path)
+        clients.append(s)
+    readers = [s.makefile("rb") for s in clients]
+    for r in readers:
+        r.readline()
+
+    # Position moves within one step: nothing is sent.
+    start = time.perf_counter()
+    for i in range(CALLS):
+        publisher.publish(
+            Status("playing", status.title, status.video_id, 20 + i * 1e-5, 215.0, 12)
+        )
+    quiet = (time.perf_counter() - start) / CALLS
+    print(f"publish without a change: {quiet * 1e6:.2f} µs per call")
+
+    sends, delays = [], []
+    for i in range(CHANGES):
+        changed = Status("playing", status.title, status.video_id, 0.0, 215.0, i)
+        start = time.perf_counter()
+        publisher.publish(changed)
+        sent = time.perf_counter()
+        sends.append(sent - start)
+        readers[i % len(readers)].readline()
+        delays.append(time.perf_counter() - start)
+        for j, r in enumerate(readers):
+            if j != i % len(readers):
+                r.readline()
+    print(
+        f"change to {args.subscribers} subscribers: median "
+        f"{statistics.median(sends) * 1e6:.0f} µs to send, "
+        f"{statistics.median(delays) * 1e6:.0f} µs until a subscriber has it"
+    )
+
+    with_file = StatusPublisher(None, file_path=tmp / "status.json")
+    start = time.perf_counter()
+    for i in range(200):
+        with_file.publish(Status("playing", status.title, status.video_id, 0, 215, i))
+    print(
+        f"change with STATUS_FILE: {(time.perf_counter() - start) / 200 * 1e3:.2f} ms"
+    )
+
+    # A subscriber that never reads fills its socket buffer and is dropped.
+    before = len(publisher._clients)
+    start = time.perf_counter()
+    for i in range(CHANGES, CHANGES + 20_000):
+        publisher.publish(Status("playing", "x" * 200, status.video_id, 0, 215, i))
+        if len(publisher._clients) < before:
+            break
+    print(
+        f"subscribers that stopped reading dropped after {i - CHANGES + 1} "
+        f"changes ({(time.perf_counter() - start) * 1e3:.0f} ms in all); "
+        f"{len(publisher._clients)} left"
+    )
+    for r, s in zip(readers, clients):
+        r.close()
+        s.close()
+    publisher.close()
+
+
+if __name__ == "__main__":
+    main()
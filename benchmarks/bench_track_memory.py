@@ -0,0 +1,68 @@
+"""Resident memory of a 100k-track library, plain vs. interned tracks.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_track_memory.py``.
+"""
+
+import json
+import tracemalloc
+from dataclasses import dataclass
+
+from ytmusic.models import intern_track
+
+LIBRARY_SIZE = 100_000
+PLAYLISTS = 5
+
+
+@dataclass
+class PlainTrack:
+    """The pre-interning Track layout."""
+
+    title: str
+    video_id: str
+
+
+def _library_json() -> str:
+    # Every song appears in PLAYLISTS playlists, as in a real library where
+    # favourites get saved over and over.
+    unique = LIBRARY_SIZE // PLAYLISTS
+    tracks = [
+        {"title": f"Artist {i % 997} - Song Title Number {i}", "video_id": f"{i:011d}"}
+        for i in range(unique)
+    ]
+    return json.dumps({str(p): tracks for p in range(PLAYLISTS)})
+
+
+def _measure(build) -> tuple[int, object]:
+    raw = _library_json()
+    tracemalloc.start()
+    data = json.loads(raw)
+    library = build(data)
+    del data
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, library
+
+
+def main():
+    plain, keep_plain = _measure(
+        lambda data: {
+            p: [PlainTrack(t["title"], t["video_id"]) for t in tracks]
+            for p, tracks in data.items()
+        }
+    )
+    interned, keep_interned = _measure(
+        lambda data: {
+            p: [intern_track(t["title"], t["video_id"]) for t in tracks]
+            for p, tracks in data.items()
+        }
+    )
+    n = LIBRARY_SIZE
+    print(f"plain dataclass : {plain / 2**20:7.2f} MiB  ({plain / n:.0f} B/track)")
+    print(
+        f"interned slotted: {interned / 2**20:7.2f} MiB  ({interned / n:.0f} B/track)"
+    )
+    print(f"saving          : {1 - interned / plain:.0%}")
+
+
+if __name__ == "__main__":
+    main()
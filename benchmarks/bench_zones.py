@@ -0,0 +1,66 @@
+"""Cost of each extra playback zone, from 1 to 8 zones.
+
+Uses ``fake_mpv.py`` in place of mpv. For every zone count it reports the
+time to start all zones, this process's threads and resident memory, and
+how far the polled playback positions lag behind the wall clock.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_zones.py``.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import ytmusic.player as player_module
+from ytmusic.models import Track
+from ytmusic.zones import ZoneManager
+
+ZONE_COUNTS = (1, 2, 4, 8)
+SETTLE = 3.0
+
+player_module.MPV_BINARY = str(Path(__file__).with_name("fake_mpv.py"))
+os.environ.setdefault("FAKE_MPV_DURATION", "60")
+
+
+def _rss_kib() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def run(zones: int) -> None:
+    manager = ZoneManager()
+    start = time.perf_counter()
+    for z in range(zones):
+        name = f"zone{z}"
+        manager.add(name)
+        manager.enqueue(name, [Track(f"Song {z}", f"zone{z:07d}")])
+        manager.play(name)
+    started = time.perf_counter() - start
+    time.sleep(SETTLE)
+    lags = [SETTLE - z.player.position for z in manager.zones.values()]
+    threads = threading.active_count()
+    rss = _rss_kib()
+    manager.stop_all()
+    print(
+        f"{zones:>5}  {started * 1000:>9.1f}ms  {threads:>7}  {rss / 1024:>7.1f}MiB"
+        f"  {max(lags):>8.2f}s"
+    )
+
+
+def main() -> None:
+    if not os.path.exists("/proc/self/status"):
+        sys.exit("needs /proc")
+    print(
+        f"{'zones':>5}  {'start all':>11}  {'threads':>7}  {'rss':>10}  {'max lag':>9}"
+    )
+    for n in ZONE_COUNTS:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Stand-in for mpv that answers the JSON IPC the player uses.
+
+It plays nothing: ``time-pos`` advances with the wall clock while unpaused
+and the process exits when it reaches ``FAKE_MPV_DURATION`` seconds
+(default 30). Point ``ytmusic.player.MPV_BINARY`` at this file to run the
+player without audio, a network or mpv itself.
+
+With ``--ao=pcm`` it instead writes the PCM frames of its input, which
+must be a WAV file already in the requested ``--audio-samplerate``,
+``--audio-channels=mono`` and 16-bit format, to ``--ao-pcm-file`` and
+exits at the end, as the spectrum tap expects.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import wave
+
+
+def write_pcm(opts: dict, source: str) -> None:
+    with wave.open(source, "rb") as w:
+        rate = w.getframerate()
+        if (
+            w.getsampwidth() != 2
+            or w.getnchannels() != 1
+            or rate != int(opts.get("audio-samplerate") or rate)
+        ):
+            sys.exit(f"fake mpv cannot convert {source}")
+        w.setpos(min(w.getnframes(), int(float(opts.get("start") or 0) * rate)))
+        try:
+            with open(opts["ao-pcm-file"], "wb") as out:
+                while frames := w.readframes(1024):
+                    out.write(frames)
+        except BrokenPipeError:
+            pass
+
+
+def main() -> None:
+    opts = {}
+    args = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            opts[key] = value
+        else:
+            args.append(arg)
+    if opts.get("ao") == "pcm":
+        write_pcm(opts, args[-1])
+        return
+    sock_path = opts["input-ipc-server"]
+    duration = float(os.environ.get("FAKE_MPV_DURATION", "30"))
+    props = {
+        "volume": float(opts.get("volume") or 100),
+        "pause": "pause" in opts,
+        "duration": duration,
+        "demuxer-cache-duration": 10.0,
+        "cache-buffering-state": 100,
+        "paused-for-cache": False,
+        "cache-speed": 0,
+    }
+    lock = threading.Lock()
+    clock = {"played": float(opts.get("start") or 0), "at": time.monotonic()}
+
+    def position() -> float:
+        with lock:
+            now = time.monotonic()
+            if not props["pause"]:
+                clock["played"] += now - clock["at"]
+            clock["at"] = now
+            return clock["played"]
+
+    def serve(conn: socket.socket) -> None:
+        with conn:
+            for line in conn.makefile("rb"):
+                req = json.loads(line)
+                cmd = req["command"]
+                if cmd[0] == "get_property":
+                    data = position() if cmd[1] == "time-pos" else props.get(cmd[1])
+                    out = {"data": data, "error": "success"}
+                else:
+                    position()
+                    props[cmd[1]] = cmd[2]
+                    out = {"error": "success"}
+                if "request_id" in req:
+                    out["request_id"] = req["request_id"]
+                conn.sendall((json.dumps(out) + "\n").encode())
+
+    def accept(server: socket.socket) -> None:
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(sock_path)
+    server.listen()
+    threading.Thread(target=accept, args=(server,), daemon=True).start()
+    try:
+        while position() < duration:
+            time.sleep(0.05)
+    finally:
+        os.unlink(sock_path)
+
+
+if __name__ == "__main__":
+    main()
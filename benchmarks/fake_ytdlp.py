@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Stand-in for yt-dlp that fails the way YouTube does.
+
+The outcome depends on the first letters of the video id in the URL:
+
+- ``priv``: "Private video" (the track is dead)
+- ``gone``: "Video unavailable" (dead)
+- ``flak``: a DNS failure (transient, no verdict)
+- ``rate``: HTTP 429 (transient, the scheduler backs off)
+
+Any other id succeeds: ``--print id`` prints the id and ``-g`` a made-up
+stream URL. A ``ytsearchN:ARTIST - TITLE`` search prints the uploads a
+real search tends to return: the song itself, a live take, the bare title
+on the artist's "Topic" channel and another artist's song of the same
+name; a query with "nomatch" in it finds nothing. With ``--print`` it
+prints "id, channel, title" lines instead of titles and ids. Each call sleeps ``FAKE_YTDLP_DELAY`` seconds (default
+0.05) first, standing in for the page fetch. Point
+``ytmusic.health.YTDLP_BINARY`` (or the resolver's or search's) at this
+file.
+"""
+
+import base64
+import hashlib
+import os
+import re
+import sys
+import time
+
+ERRORS = {
+    "priv": "ERROR: [youtube] {id}: Private video. Sign in if you've been "
+    "granted access to this video",
+    "gone": "ERROR: [youtube] {id}: Video unavailable. This video has been "
+    "removed by the uploader",
+    "flak": "ERROR: [youtube] {id}: Unable to download webpage: <urlopen error "
+    "[Errno -3] Temporary failure in name resolution>",
+    "rate": "ERROR: [youtube] {id}: Unable to download webpage: HTTP Error 429: "
+    "Too Many Requests",
+}
+
+
+def fake_id(title: str) -> str:
+    digest = hashlib.sha1(title.encode()).digest()
+    return base64.urlsafe_b64encode(digest).decode()[:11]
+
+
+def search(count: int, query: str, channels: bool) -> int:
+    if "nomatch" in query:
+        return 0
+    artist, _, title = query.rpartition(" - ")
+    artist = artist or "Some Band"
+    uploads = [
+        (f"{artist} - {title} (Official Video)", f"{artist}VEVO"),
+        (f"{artist} - {title} (Live)", "Concert Archive"),
+        (title, f"{artist} - Topic"),
+        (f"Other Artist - {title}", "Other Artist"),
+        (f"{artist} - Another Song", artist),
+    ]
+    for t, channel in uploads[:count]:
+        if channels:
+            print(f"{fake_id(t)}\t{channel}\t{t}")
+        else:
+            print(t)
+            print(fake_id(t))
+    return 0
+
+
+def main() -> int:
+    time.sleep(float(os.environ.get("FAKE_YTDLP_DELAY", "0.05")))
+    args = sys.argv[1:]
+    m = re.match(r"ytsearch(\d*):(.*)", args[0] if args else "", re.S)
+    if m is not None:
+        return search(int(m.group(1) or 1), m.group(2), "--print" in args)
+    m = re.search(r"v=([\w-]{11})", " ".join(args))
+    if m is None:
+        print("ERROR: no video URL", file=sys.stderr)
+        return 2
+    vid = m.group(1)
+    error = ERRORS.get(vid[:4])
+    if error is not None:
+        print(error.format(id=vid), file=sys.stderr)
+        return 1
+    if "-g" in args:
+        print(f"https://example.invalid/videoplayback?id={vid}&itag=251")
+    elif "--print" in args:
+        print(vid)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Soak test: days of track switching in the real app, checked for leaks.
+
+Runs ``YTMusicApp`` headless with ``fake_mpv.py`` as mpv and yt-dlp
+disabled, so it needs neither a network nor audio. Each cycle redraws the
+results list with a new page of tracks, queues it, plays one track and
+either skips it or lets it finish (so the finish callback advances the
+queue), and every tenth cycle opens and closes the playlist panel. A
+cycle stands for one ~3.5 minute track.
+
+A ``Watchdog`` samples RSS, descriptors, threads, child processes and
+live widgets as it goes. After the warm-up tenth of the run, growth of
+each must stay within ``LIMITS`` or the script exits with status 1.
+``--trace`` also lists the allocation sites that grew most.
+
+Run with ``PYTHONPATH=src python benchmarks/soak.py [--cycles N]``.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="ytmusic-soak-")
+os.environ.setdefault("FAKE_MPV_DURATION", "0.4")
+
+import ytmusic.app as app_module  # noqa: E402
+import ytmusic.player as player_module  # noqa: E402
+import ytmusic.resolver as resolver_module  # noqa: E402
+import ytmusic.search as search_module  # noqa: E402
+from ytmusic.models import Track  # noqa: E402
+from ytmusic.watchdog import Watchdog  # noqa: E402
+
+player_module.MPV_BINARY = str(Path(__file__).with_name("fake_mpv.py"))
+resolver_module.YTDLP_BINARY = search_module.YTDLP_BINARY = "false"
+app_module.SHOW_ALBUM_ART = False
+app_module.WATCHDOG_INTERVAL = 0
+app_module.WATCHDOG_LIVE_WIDGETS = True
+
+TRACK_MINUTES = 3.5
+POOL = 300
+PAGE = 10
+# Allowed growth after warm-up; zombies must stay at zero.
+LIMITS = {
+    "rss_mib": 40.0,
+    "fds": 8,
+    "threads": 4,
+    "children": 2,
+    "live_widgets": 100,
+}
+
+
+async def soak(cycles: int, trace: bool) -> int:
+    pool = [Track(f"Soak Song {i}", f"soak{i:07d}") for i in range(POOL)]
+    app = app_module.YTMusicApp()
+    log = Path(os.environ["HOME"]) / "soak.log"
+    watchdog = Watchdog(log_path=log, extra=app._resource_counts, trace=trace)
+    every = max(1, cycles // 20)
+    warm = None
+    async with app.run_test() as pilot:
+        await pilot.pause(0.5)
+        for cycle in range(cycles):
+            page = [pool[(cycle * PAGE + i) % POOL] for i in range(PAGE)]
+            app._show_results(page)
+            app.queue = list(page)
+            app.queue_index = 0
+            app._redraw_queue()
+            app._play(page[0])
+            if cycle % 10 == 0:
+                app.action_toggle_lists()
+                await pilot.pause(0.02)
+                app.action_toggle_lists()
+            if cycle % 2:
+                await pilot.pause(0.05)
+                app.action_next_track()
+                await pilot.pause(0.05)
+            else:
+                # Long enough for the fake to finish and the queue to advance.
+                await pilot.pause(float(os.environ["FAKE_MPV_DURATION"]) + 0.4)
+            if cycle % every == every - 1:
+                s = watchdog.check()
+                if warm is None and cycle >= cycles // 10:
+                    warm = s
+                hours = (cycle + 1) * TRACK_MINUTES / 60
+                print(f"{cycle + 1:>5} tracks (~{hours:5.1f}h)  {watchdog.describe(s)}")
+        app.player.stop()
+        await pilot.pause(0.5)
+        final = watchdog.check()
+    if trace:
+        with open(log, encoding="utf-8") as f:
+            print("".join(line for line in f if "alloc" in line)[-2000:])
+
+    failed = []
+    if final.zombies > 0:
+        failed.append(f"zombies={final.zombies}")
+    base, last = (warm or watchdog.first).metrics(), final.metrics()
+    for key, limit in LIMITS.items():
+        if key in base and key in last and last[key] - base[key] > limit:
+            failed.append(f"{key} grew {last[key] - base[key]:+.1f} (limit {limit})")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        return 1
+    print(f"OK: bounded over {cycles} tracks (~{cycles * TRACK_MINUTES / 60:.0f}h)")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cycles", type=int, default=400)
+    parser.add_argument("--trace", action="store_true", help="run tracemalloc")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(soak(args.cycles, args.trace)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """YT Music TUI - Terminal-based YouTube Music Player."""
 
-from .app import YTMusicApp, main
+import importlib
+
 from .config import (
     CONFIG_DIR,
     PLAYLISTS_FILE,
@@ -14,19 +15,50 @@ from .config import (
     SEARCH_RESULTS,
     KEY_BINDINGS,
 )
-from .models import Track, Playlist
-from .player import Player
-from .storage import load_playlists, save_playlists
-from .ui import (
-    TrackListItem,
-    PlaylistListItem,
-    PlaylistTrackItem,
-    QueueItem,
-    NowPlayingBar,
-    KeyBar,
-)
+from .models import Track, Playlist, intern_track
 from .utils import format_time
 
+# Everything below is imported on first access, so scripts and the
+# command-line mode never pay for Textual or the UI package.
+_LAZY = {
+    "YTMusicApp": ".app",
+    "main": ".app",
+    "PlayHistory": ".history",
+    "Player": ".player",
+    "StreamResolver": ".resolver",
+    "Zone": ".zones",
+    "ZoneManager": ".zones",
+    "CancelToken": ".scheduler",
+    "Priority": ".scheduler",
+    "Scheduler": ".scheduler",
+    "scheduler": ".scheduler",
+    "search_tracks": ".search",
+    "search_variants": ".search",
+    "Session": ".session",
+    "load_session": ".session",
+    "save_session": ".session",
+    "ThumbnailCache": ".thumbnails",
+    "load_playlists": ".storage",
+    "save_playlists": ".storage",
+    "WriteBehind": ".storage",
+    "TrackListItem": ".ui",
+    "PlaylistListItem": ".ui",
+    "PlaylistTrackItem": ".ui",
+    "QueueItem": ".ui",
+    "NowPlayingBar": ".ui",
+    "KeyBar": ".ui",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     # App
     "YTMusicApp",
@@ -43,14 +75,35 @@ __all__ = [
     "COLORS",
     "SEARCH_RESULTS",
     "KEY_BINDINGS",
+    # History
+    "PlayHistory",
     # Models
     "Track",
     "Playlist",
+    "intern_track",
     # Player
     "Player",
+    "StreamResolver",
+    "Zone",
+    "ZoneManager",
+    # Scheduler
+    "CancelToken",
+    "Priority",
+    "Scheduler",
+    "scheduler",
+    # Search
+    "search_tracks",
+    "search_variants",
+    # Session
+    "Session",
+    "load_session",
+    "save_session",
+    # Thumbnails
+    "ThumbnailCache",
     # Storage
     "load_playlists",
     "save_playlists",
+    "WriteBehind",
     # UI
     "TrackListItem",
     "PlaylistListItem",
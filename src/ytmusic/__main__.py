@@ -1,9 +1,7 @@
-from ytmusic.app import YTMusicApp
+import sys
 
-
-def main():
-    YTMusicApp().run()
+from ytmusic.cli import main
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
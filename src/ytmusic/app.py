@@ -1,22 +1,61 @@
-import asyncio
+import gc
+import threading
 import uuid
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical
 from textual import work, on
+from textual.worker import get_current_worker
+from textual.widget import Widget
 from textual.widgets import Input, Label, ListView, Static, Button
 
-from .config import SEARCH_RESULTS
+from .config import (
+    DEDUPE_WARN,
+    HEALTH_SKIP_DEAD,
+    SEARCH_FANOUT,
+    SESSION_AUTOPLAY,
+    SESSION_FILE,
+    SESSION_SNAPSHOT_INTERVAL,
+    SHOW_ALBUM_ART,
+    SPECULATE_DWELL,
+    STATUS_INTERVAL,
+    WATCHDOG_INTERVAL,
+    WATCHDOG_LIVE_WIDGETS,
+    WATCHDOG_TRACE,
+)
+from .dedupe import DuplicateIndex
+from .health import HealthChecker, Verdict
+from .filter import FuzzyIndex
+from .formats import FORMAT_LADDERS, format_policy
+from .history import PlayHistory
+from .library import LibraryIndex
+from .loudness import LoudnessStore
+from .offline import OfflineSync
 from .models import Playlist, Track
 from .player import Player
-from .storage import load_playlists, save_playlists
+from .resolver import StreamResolver
+from .scheduler import CancelToken, scheduler
+from .search import merge_results, search_tracks, search_variants
+from .session import Session, load_session, save_session
+from .spectrum import Visualizer
+from .thumbnails import ThumbnailCache
+from .status import Status, StatusPublisher
+from .watchdog import Watchdog
+from .storage import (
+    PLAYLISTS_FILE,
+    WriteBehind,
+    load_playlists,
+    playlists_data,
+    snapshot_playlists,
+)
 from .ui import (
     PlaylistListItem,
     PlaylistTrackItem,
     TrackListItem,
     QueueItem,
     NowPlayingBar,
+    SpectrumPanel,
     KeyBar,
 )
 
@@ -36,23 +75,60 @@ class YTMusicApp(App):
         Binding("e", "add_to_default", "AddDef", show=False),
         Binding("y", "add_to_playlist", "AddList", show=False),
         Binding("x", "delete_playlist", "Delete", show=False),
+        Binding("m", "cycle_quality", "Quality", show=False),
+        Binding("v", "toggle_spectrum", "Spectrum", show=False),
+        Binding("i", "show_stats", "Stats", show=False),
+        Binding("s", "sync_playlist", "Sync", show=False),
+        Binding("c", "check_health", "Check", show=False),
+        Binding("f", "filter", "Filter", show=False),
         Binding("escape", "handle_escape", "Back", show=False),
         Binding("q", "quit", "Quit", show=False),
     ]
 
     def __init__(self):
         super().__init__()
-        self.player: Player = Player()
+        self.resolver: StreamResolver = StreamResolver()
+        self.loudness: LoudnessStore = LoudnessStore()
+        self.player: Player = Player(self.resolver, loudness=self.loudness)
+        self.loudness.on_measured = self.player.apply_gain
+        self.visualizer: Visualizer = Visualizer(self.player, self._on_spectrum)
+        self._spectrum_frame = None
+        self._speculate_timer = None
+        self.thumbnails: ThumbnailCache = ThumbnailCache()
+        self.offline: OfflineSync = OfflineSync(self.resolver)
+        self._sync_token: CancelToken | None = None
+        self.health: HealthChecker = HealthChecker()
+        self.health.on_verdict = self._on_verdict
+        self._health_token: CancelToken | None = None
         self.player.on_finish = self._on_track_finish
+        self.player.peek_next = self._peek_next
         self.results: list[Track] = []
         self.queue: list[Track] = []
         self.queue_index: int = 0
         self._finishing: bool = False
 
         self.playlists: dict[str, Playlist] = load_playlists()
+        self._playlist_writer = WriteBehind(PLAYLISTS_FILE, playlists_data, indent=2)
+        self._session_writer = WriteBehind(SESSION_FILE)
+        self.history: PlayHistory = PlayHistory()
+        self.library: LibraryIndex | None = None
+        # Seen while the library is still loading.
+        self._library_pending: list[Track] = []
+        self._duplicates: DuplicateIndex | None = None
+        # Added while the index is still being built.
+        self._duplicates_pending: list[Track] = []
+        self.watchdog: Watchdog = Watchdog(
+            extra=self._resource_counts, trace=WATCHDOG_TRACE
+        )
+        self.status: StatusPublisher = StatusPublisher()
+        self._virtual_playlists: dict[str, Playlist] = {}
         self._list_mode: str = "normal"
         self._current_playlist_id: str | None = None
         self._pending_delete_id: str | None = None
+        self._filter_target: str | None = None
+        self._filter_key: str | None = None
+        # Dropped whenever its collection is edited in place.
+        self._filter_indexes: dict[str, FuzzyIndex] = {}
 
     def compose(self) -> ComposeResult:
         with Vertical(id="root"):
@@ -62,6 +138,10 @@ class YTMusicApp(App):
                     placeholder="  Search for a song, artist or album...",
                     id="search-input",
                 )
+                yield Static("", id="sync-status")
+            with Horizontal(id="filter-bar"):
+                yield Input(placeholder="  Filter...", id="filter-input")
+                yield Static("", id="filter-count")
             with Horizontal(id="main"):
                 with Vertical(id="results-panel"):
                     yield Static("  Results", id="results-header")
@@ -90,6 +170,106 @@ class YTMusicApp(App):
         self._show_playlist_panel(False)
         self._redraw_playlists()
         self.query_one("#playlist-input-container").display = False
+        self.call_after_refresh(self._restore_session)
+        self.set_interval(SESSION_SNAPSHOT_INTERVAL, self._save_session)
+        self._spectrum_timer = self.set_interval(
+            self.visualizer.interval, self._draw_spectrum, pause=True
+        )
+        self.loudness.scan()
+        self._load_library([t for pl in self.playlists.values() for t in pl.tracks])
+        if DEDUPE_WARN:
+            self._build_duplicates(
+                [t for pl in self.playlists.values() for t in pl.tracks]
+            )
+        if WATCHDOG_INTERVAL > 0:
+            self.watchdog.start()
+        self.status.start()
+        self._publish_status()
+        self.set_interval(STATUS_INTERVAL, self._publish_status)
+
+    # ── Session ──────────────────────────────────
+
+    def _snapshot(self) -> Session:
+        return Session(
+            queue=list(self.queue),
+            queue_index=self.queue_index,
+            current=self.player.current,
+            position=self.player.position,
+            paused=self.player.is_paused,
+            list_mode=self._list_mode,
+            playlist_id=self._current_playlist_id,
+            results=list(self.results),
+            quality=format_policy.mode,
+        )
+
+    def _publish_status(self, stopped: bool = False):
+        track = self.player.current
+        if stopped or track is None:
+            state = "stopped"
+        elif self.player.is_paused:
+            state = "paused"
+        else:
+            state = "playing" if self.player.is_playing else "stopped"
+        self.status.publish(
+            Status(
+                state=state,
+                title=track.title if track else "",
+                video_id=track.video_id if track else "",
+                position=self.player.position,
+                duration=self.player.duration,
+                queue_length=len(self.queue),
+            )
+        )
+
+    def _save_session(self):
+        try:
+            save_session(self._snapshot(), writer=self._session_writer)
+        except OSError:
+            pass
+
+    def _save_playlists(self):
+        """Queue a write of every playlist; it happens off the UI thread."""
+        for key in [k for k in self._filter_indexes if k.startswith("playlist:")]:
+            del self._filter_indexes[key]
+        self._playlist_writer.submit(
+            snapshot_playlists(self.playlists, self._get_default_id())
+        )
+
+    def _restore_session(self):
+        session = load_session()
+        if session is None:
+            return
+        if session.quality in FORMAT_LADDERS:
+            format_policy.mode = session.quality
+        self.queue = session.queue
+        if session.results:
+            self._show_results(session.results)
+            self.query_one("#search-input").focus()
+        self._redraw_queue()
+        from_playlist = False
+        if session.list_mode != "normal":
+            self._list_mode = "playlists"
+            self._show_playlist_panel(True)
+            self._hide_results_queue(True)
+            playlist = self._get_playlist(session.playlist_id or "")
+            if session.list_mode == "playlist_tracks" and playlist:
+                self._list_mode = "playlist_tracks"
+                self._current_playlist_id = playlist.id
+                self._redraw_playlist_tracks(playlist.id)
+                header = f"  🎵  {playlist.name}"
+                from_playlist = True
+            else:
+                header = "  🎵  Listeler"
+            self.query_one("#playlist-header", Static).update(header)
+            self.query_one("#playlist-list", ListView).focus()
+            self._update_keybar()
+        # In a playlist the index points into it, not into the queue.
+        tracks = playlist.tracks if from_playlist else self.queue
+        self.queue_index = min(session.queue_index, max(0, len(tracks) - 1))
+        if session.current and SESSION_AUTOPLAY:
+            self._play(session.current, from_playlist, start=session.position)
+            if session.paused:
+                self.action_toggle_pause()
 
     # ── Playlist ─────────────────────────────────
 
@@ -98,21 +278,41 @@ class YTMusicApp(App):
         panel.display = show
 
     def _redraw_playlists(self):
+        self._virtual_playlists = {
+            p.id: p for p in self.history.virtual_playlists() if p.tracks
+        }
+        if self._refilter("#playlist-list"):
+            return
         pl = self.query_one("#playlist-list", ListView)
         pl.clear()
         for playlist in self.playlists.values():
             pl.append(PlaylistListItem(playlist))
+        for playlist in self._virtual_playlists.values():
+            pl.append(PlaylistListItem(playlist))
+
+    def _get_playlist(self, playlist_id: str) -> Playlist | None:
+        return self.playlists.get(playlist_id) or self._virtual_playlists.get(
+            playlist_id
+        )
 
     def _redraw_playlist_tracks(self, playlist_id: str):
         pl = self.query_one("#playlist-list", ListView)
-        playlist = self.playlists.get(playlist_id)
+        playlist = self._get_playlist(playlist_id)
         if not playlist:
             return
+        self._filter_indexes.pop(f"playlist:{playlist_id}", None)
+        if self._refilter("#playlist-list"):
+            return
         pl.clear()
         current_id = self.player.current.video_id if self.player.current else None
         for i, track in enumerate(playlist.tracks):
             pl.append(
-                PlaylistTrackItem(track, i, playing=(track.video_id == current_id))
+                PlaylistTrackItem(
+                    track,
+                    i,
+                    playing=(track.video_id == current_id),
+                    dead=self.health.is_dead(track.video_id),
+                )
             )
 
     def action_toggle_lists(self):
@@ -163,7 +363,9 @@ class YTMusicApp(App):
         self.query_one("#queue-panel").display = not hide
 
     def action_handle_escape(self):
-        if self._list_mode != "normal":
+        if self._filter_target is not None:
+            self._clear_filter()
+        elif self._list_mode != "normal":
             self.action_toggle_lists()
         else:
             self.action_focus_results()
@@ -215,7 +417,7 @@ class YTMusicApp(App):
         if name:
             new_id = str(uuid.uuid4())[:8]
             self.playlists[new_id] = Playlist(id=new_id, name=name, tracks=[])
-            save_playlists(self.playlists, self._get_default_id())
+            self._save_playlists()
             self._redraw_playlists()
             self.notify(f"Created: {name}", timeout=2)
         self._hide_playlist_input()
@@ -231,7 +433,7 @@ class YTMusicApp(App):
         if name:
             new_id = str(uuid.uuid4())[:8]
             self.playlists[new_id] = Playlist(id=new_id, name=name, tracks=[])
-            save_playlists(self.playlists, self._get_default_id())
+            self._save_playlists()
             self._redraw_playlists()
             self.notify(f"Created: {name}", timeout=2)
         self._hide_playlist_input()
@@ -249,6 +451,8 @@ class YTMusicApp(App):
         if not isinstance(item, PlaylistListItem):
             return
         playlist = item.playlist
+        if playlist.is_virtual:
+            return
         if playlist.is_default:
             self.notify(
                 "Cannot delete default playlist!", severity="warning", timeout=2
@@ -256,7 +460,7 @@ class YTMusicApp(App):
             return
         if self._pending_delete_id == playlist.id:
             del self.playlists[playlist.id]
-            save_playlists(self.playlists, self._get_default_id())
+            self._save_playlists()
             self._redraw_playlists()
             self._pending_delete_id = None
             self.notify(f"'{playlist.name}' deleted", timeout=2)
@@ -284,9 +488,164 @@ class YTMusicApp(App):
         if any(t.video_id == track.video_id for t in playlist.tracks):
             self.notify("Already in playlist", severity="warning", timeout=2)
             return
+        similar = self._near_duplicate(track, playlist) if DEDUPE_WARN else None
         playlist.tracks.append(track)
-        save_playlists(self.playlists, self._get_default_id())
-        self.notify(f"Added: {track.title[:30]}", timeout=2)
+        self._library_add([track])
+        self._save_playlists()
+        if similar is not None:
+            self.notify(
+                f"Added: {track.title[:30]} — looks like '{similar.title[:30]}'",
+                severity="warning",
+                timeout=3,
+            )
+        else:
+            self.notify(f"Added: {track.title[:30]}", timeout=2)
+
+    def _near_duplicate(self, track: Track, playlist: Playlist) -> Track | None:
+        """A track in the playlist that is probably the same song."""
+        if self._duplicates is None:
+            # Still building; no warning until it is ready.
+            self._duplicates_pending.append(track)
+            return None
+        ids = {t.video_id for t in playlist.tracks}
+        match = next(
+            (t for t in self._duplicates.similar(track) if t.video_id in ids), None
+        )
+        self._duplicates.add([track])
+        return match
+
+    @work(thread=True, group="dedupe")
+    def _build_duplicates(self, tracks: list[Track]):
+        """Index every saved track once, then keep it up to date per add."""
+        index = DuplicateIndex()
+        index.add(tracks)
+        if not get_current_worker().is_cancelled:
+            self.call_from_thread(self._duplicates_ready, index)
+
+    def _duplicates_ready(self, index: DuplicateIndex):
+        index.add(self._duplicates_pending)
+        self._duplicates_pending.clear()
+        self._duplicates = index
+
+    @work(thread=True, group="library")
+    def _load_library(self, tracks: list[Track]):
+        """Read the library file and index saved tracks off the UI thread."""
+        library = LibraryIndex()
+        library.add(tracks)
+        if get_current_worker().is_cancelled:
+            library.close()
+        else:
+            self.call_from_thread(self._library_ready, library)
+
+    def _library_ready(self, library: LibraryIndex):
+        library.add(self._library_pending)
+        self._library_pending.clear()
+        self.library = library
+
+    def _library_add(self, tracks: list[Track]):
+        if self.library is None:
+            self._library_pending.extend(tracks)
+        else:
+            self.library.add(tracks)
+
+    # ── Offline sync ─────────────────────────────
+
+    def action_sync_playlist(self):
+        if self._list_mode == "playlist_tracks" and self._current_playlist_id:
+            playlist = self._get_playlist(self._current_playlist_id)
+        elif self._list_mode == "playlists":
+            item = self.query_one("#playlist-list", ListView).highlighted_child
+            playlist = item.playlist if isinstance(item, PlaylistListItem) else None
+        else:
+            return
+        if playlist is None or not playlist.tracks:
+            return
+        if self._sync_token is not None:
+            self.notify("A sync is already running", severity="warning", timeout=2)
+            return
+        self._sync_token = CancelToken()
+        self._sync_worker(playlist, self._sync_token)
+
+    @work(thread=True, group="sync")
+    def _sync_worker(self, playlist: Playlist, token: CancelToken):
+        def show(progress):
+            self.call_from_thread(self._set_sync_status, f"⇣ {progress.summary()}")
+
+        try:
+            progress = self.offline.sync(playlist.tracks, on_progress=show, token=token)
+        finally:
+            self._sync_token = None
+        if token.cancelled:
+            return
+        self.loudness.scan()
+        self.call_from_thread(self._set_sync_status, "")
+        self.call_from_thread(
+            self.notify,
+            f"'{playlist.name}' offline: {progress.done} downloaded, "
+            f"{progress.skipped} already there, {progress.failed} failed",
+            severity="warning" if progress.failed else "information",
+            timeout=4,
+        )
+
+    # ── Health check ─────────────────────────────
+
+    def action_check_health(self):
+        if self._list_mode == "playlist_tracks" and self._current_playlist_id:
+            playlist = self._get_playlist(self._current_playlist_id)
+        elif self._list_mode == "playlists":
+            item = self.query_one("#playlist-list", ListView).highlighted_child
+            playlist = item.playlist if isinstance(item, PlaylistListItem) else None
+        else:
+            return
+        if playlist is None or not playlist.tracks:
+            return
+        if self._health_token is not None:
+            self.notify("A check is already running", severity="warning", timeout=2)
+            return
+        self._health_token = CancelToken()
+        self._health_worker(playlist, self._health_token)
+
+    @work(thread=True, group="health")
+    def _health_worker(self, playlist: Playlist, token: CancelToken):
+        def show(progress):
+            self.call_from_thread(self._set_sync_status, f"✚ {progress.summary()}")
+
+        try:
+            progress = self.health.check(playlist.tracks, on_progress=show, token=token)
+        finally:
+            self._health_token = None
+        if token.cancelled:
+            return
+        unknown = f", {progress.unknown} not reachable" if progress.unknown else ""
+        self.call_from_thread(self._set_sync_status, "")
+        self.call_from_thread(
+            self.notify,
+            f"'{playlist.name}': {progress.dead} unavailable{unknown}",
+            severity="warning" if progress.dead else "information",
+            timeout=4,
+        )
+
+    def _on_verdict(self, video_id: str, verdict: Verdict):
+        """Runs on a scheduler thread; redraws the open playlist for a dead track."""
+        if verdict.ok or self._current_playlist_id is None:
+            return
+        try:
+            self.call_from_thread(self._mark_dead, video_id)
+        except RuntimeError:
+            pass
+
+    def _mark_dead(self, video_id: str):
+        if self._list_mode != "playlist_tracks" or not self._current_playlist_id:
+            return
+        for item in self.query_one("#playlist-list", ListView).children:
+            if isinstance(item, PlaylistTrackItem) and item.track.video_id == video_id:
+                item.dead = True
+                item.watch_highlighted(item.highlighted)
+
+    def _set_sync_status(self, text: str):
+        status = self.query_one("#sync-status", Static)
+        status.update(text)
+        status.display = bool(text)
 
     def _get_default_id(self) -> str:
         for pid, pl in self.playlists.items():
@@ -311,26 +670,20 @@ class YTMusicApp(App):
             await self._do_search(query)
 
     @work(exclusive=True)
-    async def _search_worker(self, query: str):
+    async def _search_worker(self, query: str, local: list[Track]):
+        def show(tracks: list[Track], final: bool = True):
+            if local:
+                tracks = merge_results([tracks, local])
+            self._show_results(tracks, final)
+
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "yt-dlp",
-                f"ytsearch10:{query}",
-                "--get-title",
-                "--get-id",
-                "--flat-playlist",
-                "--no-warnings",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await proc.communicate()
-            output = stdout.decode()
-            lines = [line.strip() for line in output.splitlines() if line.strip()]
-            tracks = [
-                Track(lines[i], lines[i + 1]) for i in range(0, len(lines) - 1, 2)
-            ]
-            self._show_results(tracks)
+            if SEARCH_FANOUT:
+                await search_variants(query, on_update=show)
+            else:
+                show(await search_tracks(query))
         except Exception as e:
+            if local:
+                show([])
             self._show_error(str(e))
 
     async def _do_search(self, query: str):
@@ -340,24 +693,47 @@ class YTMusicApp(App):
         loading.add_class("visible")
         rl.clear()
         rl.display = False
-        self._search_worker(query)
+        # Local hits are shown straight away; remote ones merge in later.
+        local = self.library.search(query) if self.library is not None else []
+        if local:
+            self._show_results(local, final=False)
+        self._search_worker(query, local)
         self.query_one("#results-header", Static).update(
             f"  Results  [dim]— {query}[/dim]"
         )
 
-    def _show_results(self, tracks: list[Track]):
+    def _show_results(self, tracks: list[Track], final: bool = True):
+        rl = self.query_one("#results-list", ListView)
+        first = rl.display is False
+        if not tracks and not final:
+            return
+        highlighted = rl.highlighted_child
+        keep_id = (
+            highlighted.track.video_id
+            if not first and isinstance(highlighted, TrackListItem)
+            else None
+        )
         self.results = tracks
+        self._library_add(tracks)
         loading = self.query_one("#loading", Static)
-        rl = self.query_one("#results-list", ListView)
         loading.remove_class("visible")
         rl.display = True
-        rl.clear()
-        for i, t in enumerate(tracks):
-            rl.append(TrackListItem(t, i))
+        filtering = self._refilter("#results-list")
+        if not filtering:
+            rl.clear()
+            for i, t in enumerate(tracks):
+                rl.append(TrackListItem(t, i))
         if tracks:
-            rl.focus()
+            if keep_id is not None and not filtering:
+                for i, t in enumerate(tracks):
+                    if t.video_id == keep_id:
+                        rl.index = i
+                        break
+            if first:
+                rl.focus()
             self.query_one("#results-header", Static).update(
-                f"  Results  [dim]— {len(tracks)} found[/dim]"
+                f"  Results  [dim]— {len(tracks)} found"
+                f"{'' if final else ', searching...'}[/dim]"
             )
         else:
             loading.update("  No results found.")
@@ -375,58 +751,170 @@ class YTMusicApp(App):
         if isinstance(event.item, TrackListItem):
             self._play(event.item.track)
 
+    @on(ListView.Highlighted, "#results-list")
+    def on_result_highlighted(self, event: ListView.Highlighted):
+        if self._speculate_timer is not None:
+            self._speculate_timer.stop()
+            self._speculate_timer = None
+        self.resolver.cancel_speculation()
+        if isinstance(event.item, TrackListItem):
+            track = event.item.track
+            self._speculate_timer = self.set_timer(
+                SPECULATE_DWELL, lambda: self.resolver.speculate(track)
+            )
+
+    def action_show_stats(self):
+        self.notify(
+            f"{self.resolver.summary()}\n{scheduler.summary()}\n"
+            f"{format_policy.summary()}\n{self.player.tuner.summary()}\n"
+            f"{self.loudness.summary()}\n{self.health.summary()}\n"
+            f"{self.watchdog.summary()}",
+            timeout=4,
+        )
+
+    def action_toggle_spectrum(self):
+        if not self.visualizer.available:
+            self.notify("The spectrum needs numpy", severity="warning", timeout=2)
+            return
+        panel = self.query_one("#np-spectrum", SpectrumPanel)
+        panel.display = not panel.display
+        # Hidden, nothing is decoded, analysed or drawn.
+        if panel.display:
+            self.visualizer.start()
+            self._spectrum_timer.resume()
+        else:
+            self._spectrum_timer.pause()
+            self.visualizer.stop()
+            self._spectrum_frame = None
+
+    def _on_spectrum(self, levels, level_db: float):
+        # Called on the visualizer thread; drawn by _draw_spectrum.
+        self._spectrum_frame = (levels.copy(), level_db)
+
+    def _draw_spectrum(self):
+        frame, self._spectrum_frame = self._spectrum_frame, None
+        if frame is not None:
+            self.query_one("#np-spectrum", SpectrumPanel).show(*frame)
+
+    def _resource_counts(self) -> dict[str, int]:
+        """App-level counters for the watchdog, usually called on its thread."""
+        if threading.get_ident() == self._thread_id:
+            counts = self._dom_counts()
+        else:
+            # The DOM may only be read on the event loop.
+            counts = self.call_from_thread(self._dom_counts)
+        if WATCHDOG_LIVE_WIDGETS or WATCHDOG_TRACE:
+            # Widgets still alive after leaving the DOM are the leak to catch;
+            # collect first so garbage awaiting the cycle collector is not counted.
+            gc.collect()
+            counts["live_widgets"] = sum(
+                1 for o in gc.get_objects() if isinstance(o, Widget)
+            )
+        return counts
+
+    def _dom_counts(self) -> dict[str, int]:
+        return {
+            "widgets": len(self.screen.walk_children(with_self=True)),
+            "queue": len(self.queue),
+        }
+
+    def action_cycle_quality(self):
+        format_policy.cycle_mode()
+        self.notify(format_policy.summary(), timeout=2)
+
     @on(ListView.Selected, "#queue-list")
     def on_queue_selected(self, event: ListView.Selected):
         if isinstance(event.item, QueueItem):
             self.queue_index = event.item.index
             self._play(self.queue[self.queue_index])
 
-    def _play(self, track: Track, from_playlist: bool = False):
+    def _play(self, track: Track, from_playlist: bool = False, start: float = 0.0):
         self._finishing = False
-        self.player.play(track)
+        self.player.play(track, start=start)
+        if not start:
+            self.history.record_play(track)
         bar = self.query_one("#now-playing", NowPlayingBar)
         bar.track = track
         bar.paused = False
+        bar.art = ""
+        if SHOW_ALBUM_ART:
+            self._art_worker(track)
         if not from_playlist:
             self._redraw_queue()
         if self._list_mode == "playlist_tracks" and self._current_playlist_id:
             self._redraw_playlist_tracks(self._current_playlist_id)
+        self._publish_status()
+
+    @work(thread=True, exclusive=True, group="art")
+    def _art_worker(self, track: Track):
+        art = self.thumbnails.get(track.video_id)
+        if art and self.player.current is track:
+            self.call_from_thread(self._set_art, art)
+
+    def _set_art(self, art: str):
+        self.query_one("#now-playing", NowPlayingBar).art = art
 
     def action_toggle_pause(self):
         if self.player.is_playing or self.player.is_paused:
             self.player.toggle_pause()
             bar = self.query_one("#now-playing", NowPlayingBar)
             bar.paused = self.player.is_paused
+            self._publish_status()
 
     def action_next_track(self):
         if self._list_mode == "playlists":
             self._show_playlist_input()
         elif self._list_mode == "playlist_tracks" and self._current_playlist_id:
-            playlist = self.playlists.get(self._current_playlist_id)
+            playlist = self._get_playlist(self._current_playlist_id)
             if not playlist or not playlist.tracks:
                 return
-            self.queue_index = (self.queue_index + 1) % len(playlist.tracks)
+            self.queue_index = self._next_index(playlist.tracks)
             self._play(playlist.tracks[self.queue_index], from_playlist=True)
         elif not self.queue:
             return
         else:
-            self.queue_index = (self.queue_index + 1) % len(self.queue)
+            self.queue_index = self._next_index(self.queue)
             self._play(self.queue[self.queue_index])
 
+    def _next_index(self, tracks: list[Track]) -> int:
+        """Index after queue_index, passing over tracks known to be dead."""
+        n = len(tracks)
+        for step in range(1, n + 1):
+            i = (self.queue_index + step) % n
+            if not HEALTH_SKIP_DEAD or not self.health.is_dead(tracks[i].video_id):
+                return i
+        return (self.queue_index + 1) % n
+
+    def _peek_next(self) -> Track | None:
+        """The track _on_track_finish would play next, without advancing."""
+        if self._list_mode == "playlist_tracks" and self._current_playlist_id:
+            playlist = self._get_playlist(self._current_playlist_id)
+            tracks = playlist.tracks if playlist else []
+        else:
+            tracks = self.queue
+        if not tracks:
+            return None
+        return tracks[self._next_index(tracks)]
+
     def _on_track_finish(self):
+        finished = self.player.current
+        if finished is not None:
+            self.history.record_finish(finished)
+            if self.player.duration <= 0:
+                # mpv quit before reporting a duration: maybe gone for good.
+                self.health.suspect(finished)
         if self._list_mode == "playlist_tracks" and self._current_playlist_id:
-            playlist = self.playlists.get(self._current_playlist_id)
+            playlist = self._get_playlist(self._current_playlist_id)
             if not playlist or not playlist.tracks or self._finishing:
                 return
             self._finishing = True
-            self.queue_index = (self.queue_index + 1) % len(playlist.tracks)
+            self.queue_index = self._next_index(playlist.tracks)
             self.call_from_thread(self._play, playlist.tracks[self.queue_index], True)
         elif not self.queue or self._finishing:
             return
         else:
             self._finishing = True
-            next_index = (self.queue_index + 1) % len(self.queue)
-            self.queue_index = next_index
+            self.queue_index = self._next_index(self.queue)
             self.call_from_thread(self._play, self.queue[self.queue_index])
 
     # ── Queue ────────────────────────────────────
@@ -444,6 +932,7 @@ class YTMusicApp(App):
             return
         self.queue.append(track)
         self._redraw_queue()
+        self._save_session()
         self.notify(f"Added: {track.title[:40]}", timeout=2)
 
     def action_remove_from_queue(self):
@@ -456,11 +945,12 @@ class YTMusicApp(App):
                 return
             playlist = self.playlists.get(self._current_playlist_id)
             if not playlist:
+                self.notify("History lists are read-only", timeout=2)
                 return
             idx = item.index
             if 0 <= idx < len(playlist.tracks):
                 del playlist.tracks[idx]
-                save_playlists(self.playlists, self._get_default_id())
+                self._save_playlists()
                 self._redraw_playlist_tracks(self._current_playlist_id)
                 self.notify("Track removed from playlist", timeout=2)
         else:
@@ -476,23 +966,189 @@ class YTMusicApp(App):
                 if self.queue_index >= len(self.queue):
                     self.queue_index = max(0, len(self.queue) - 1)
                 self._redraw_queue()
+                self._save_session()
 
     def _redraw_queue(self):
-        ql = self.query_one("#queue-list", ListView)
-        current_id = self.player.current.video_id if self.player.current else None
-        ql.clear()
-        for i, t in enumerate(self.queue):
-            ql.append(QueueItem(t, i, playing=(t.video_id == current_id)))
+        self._filter_indexes.pop("queue", None)
+        if not self._refilter("#queue-list"):
+            ql = self.query_one("#queue-list", ListView)
+            current_id = self.player.current.video_id if self.player.current else None
+            ql.clear()
+            for i, t in enumerate(self.queue):
+                ql.append(QueueItem(t, i, playing=(t.video_id == current_id)))
         n = len(self.queue)
         self.query_one("#queue-header", Static).update(
             f"  ♫  Queue  [dim]— {n} track{'s' if n != 1 else ''}[/dim]"
             if n
             else "  ♫  Queue"
         )
+        self._publish_status()
+
+    # ── Filter ───────────────────────────────────
+
+    def action_filter(self):
+        focused = self.focused
+        if isinstance(focused, ListView) and focused.id in (
+            "results-list",
+            "queue-list",
+            "playlist-list",
+        ):
+            target = f"#{focused.id}"
+        elif self._list_mode != "normal":
+            target = "#playlist-list"
+        else:
+            target = "#results-list"
+        if self._filter_target is not None and self._filter_target != target:
+            self._clear_filter()
+        self._filter_target = target
+        self._filter_key = self._filter_items(target)[0]
+        self.query_one("#filter-bar").add_class("visible")
+        self.query_one("#filter-input", Input).focus()
+
+    def _filter_items(self, target: str) -> tuple[str, list]:
+        if target == "#results-list":
+            return "results", self.results
+        if target == "#queue-list":
+            return "queue", self.queue
+        if self._list_mode == "playlist_tracks" and self._current_playlist_id:
+            playlist = self._get_playlist(self._current_playlist_id)
+            if playlist:
+                return f"playlist:{playlist.id}", playlist.tracks
+        return "playlists", [
+            *self.playlists.values(),
+            *self._virtual_playlists.values(),
+        ]
+
+    def _make_item(self, target: str, item, i: int):
+        current_id = self.player.current.video_id if self.player.current else None
+        if isinstance(item, Playlist):
+            return PlaylistListItem(item)
+        if target == "#results-list":
+            return TrackListItem(item, i)
+        if target == "#queue-list":
+            return QueueItem(item, i, playing=(item.video_id == current_id))
+        return PlaylistTrackItem(
+            item,
+            i,
+            playing=(item.video_id == current_id),
+            dead=self.health.is_dead(item.video_id),
+        )
+
+    @on(Input.Changed, "#filter-input")
+    def _on_filter_changed(self, event: Input.Changed):
+        self._run_filter(event.value)
+
+    def _run_filter(self, query: str):
+        target = self._filter_target
+        if target is None:
+            return
+        key, items = self._filter_items(target)
+        index = self._filter_indexes.get(key)
+        if index is not None and not index.is_current(items):
+            index = None
+        self._filter_worker(target, key, items, list(items), index, query)
+
+    def _refilter(self, target: str) -> bool:
+        """Re-run an open filter on a list that changed; False if none is open."""
+        if self._filter_target != target:
+            return False
+        if self._filter_items(target)[0] != self._filter_key:
+            # The panel now shows another collection than was filtered.
+            self._clear_filter()
+        else:
+            self._run_filter(self.query_one("#filter-input", Input).value)
+        return True
+
+    @work(thread=True, exclusive=True, group="filter")
+    def _filter_worker(
+        self,
+        target: str,
+        key: str,
+        source: list,
+        items: list,
+        index: FuzzyIndex | None,
+        query: str,
+    ):
+        """Build the index if needed and filter it off the UI thread."""
+        if index is None:
+            titles = [i.name if isinstance(i, Playlist) else i.title for i in items]
+            index = FuzzyIndex(titles, source)
+        with index.lock:
+            indices = index.filter(query)
+            count, exact = index.count, index.count_exact
+        worker = get_current_worker()
+        if not worker.is_cancelled:
+            self.call_from_thread(
+                self._show_filtered,
+                worker,
+                target,
+                key,
+                index,
+                items,
+                indices,
+                count,
+                exact,
+            )
+
+    def _show_filtered(self, worker, target, key, index, items, indices, count, exact):
+        # A newer keystroke or a closed filter makes this result stale.
+        if worker.is_cancelled or self._filter_target != target:
+            return
+        self._filter_indexes[key] = index
+        lst = self.query_one(target, ListView)
+        lst.clear()
+        lst.extend(self._make_item(target, items[i], i) for i in indices)
+        more = "" if exact else "+"
+        self.query_one("#filter-count", Static).update(
+            f"[dim]{count}{more} match{'es' if count != 1 else ''}[/dim]"
+        )
+
+    @on(Input.Submitted, "#filter-input")
+    def _on_filter_submit(self, event: Input.Submitted):
+        if self._filter_target is not None:
+            self.query_one(self._filter_target, ListView).focus()
+
+    def _clear_filter(self):
+        target = self._filter_target
+        if target is None:
+            return
+        self._filter_target = None
+        self.workers.cancel_group(self, "filter")
+        filter_input = self.query_one("#filter-input", Input)
+        with filter_input.prevent(Input.Changed):
+            filter_input.value = ""
+        self.query_one("#filter-bar").remove_class("visible")
+        lst = self.query_one(target, ListView)
+        highlighted = lst.highlighted_child
+        key, items = self._filter_items(target)
+        lst.clear()
+        lst.extend(self._make_item(target, item, i) for i, item in enumerate(items))
+        if highlighted is not None and key == self._filter_key:
+            pos = getattr(highlighted, "index", None)
+            if pos is None and isinstance(highlighted, PlaylistListItem):
+                pos = items.index(highlighted.playlist)
+            lst.index = pos
+        lst.focus()
 
     def on_unmount(self):
-        save_playlists(self.playlists, self._get_default_id())
+        if self._sync_token is not None:
+            self._sync_token.cancel()
+        if self._health_token is not None:
+            self._health_token.cancel()
+        self._save_session()
+        self._save_playlists()
+        self._session_writer.close()
+        self._playlist_writer.close()
+        self.visualizer.stop()
+        self.watchdog.stop()
         self.player.stop()
+        self._publish_status(stopped=True)
+        self.status.close()
+        self.history.close()
+        self.workers.cancel_group(self, "library")
+        if self.library is not None:
+            self.library.close()
+        self.loudness.close()
 
 
 def main():
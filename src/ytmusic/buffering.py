@@ -0,0 +1,88 @@
+"""Buffer health tracking and adaptive mpv readahead."""
+
+from dataclasses import dataclass
+
+from .config import (
+    BUFFER_CLEAN_SECS,
+    MPV_CACHE_SECS,
+    MPV_CACHE_SECS_MAX,
+    MPV_DEMUXER_MAX_BYTES,
+    MPV_DEMUXER_MAX_BYTES_LIMIT,
+)
+
+MIB = 1024 * 1024
+
+
+@dataclass(slots=True)
+class BufferState:
+    """Latest buffer properties reported by mpv."""
+
+    cache_duration: float = 0.0
+    buffering_pct: int = 100
+    stalled: bool = False
+    # Playback has run since the instance started; until then a stall is
+    # the initial fill, whatever position it started from.
+    played: bool = False
+
+
+class CacheTuner:
+    """Sizes mpv's readahead from observed stalls.
+
+    Every rebuffer doubles ``cache-secs`` and ``demuxer-max-bytes`` up to
+    ``MPV_CACHE_SECS_MAX`` and ``MPV_DEMUXER_MAX_BYTES_LIMIT``. After
+    ``BUFFER_CLEAN_SECS`` of stall-free playback both step halfway back
+    towards their starting sizes, so a flaky hour does not pin memory for
+    the rest of the session.
+    """
+
+    def __init__(self):
+        self.cache_secs = MPV_CACHE_SECS
+        self.max_bytes = MPV_DEMUXER_MAX_BYTES
+        self.rebuffers = 0
+        self.stall_time = 0.0
+        self._clean = 0.0
+
+    def args(self) -> list[str]:
+        return [
+            "--cache=yes",
+            f"--cache-secs={self.cache_secs:.0f}",
+            f"--demuxer-max-bytes={self.max_bytes}",
+        ]
+
+    def properties(self) -> dict:
+        return {"cache-secs": self.cache_secs, "demuxer-max-bytes": self.max_bytes}
+
+    def on_stall(self) -> bool:
+        """Record a rebuffer; True if the sizes grew."""
+        self.rebuffers += 1
+        self._clean = 0.0
+        grown = (
+            min(MPV_CACHE_SECS_MAX, self.cache_secs * 2),
+            min(MPV_DEMUXER_MAX_BYTES_LIMIT, self.max_bytes * 2),
+        )
+        return self._set(*grown)
+
+    def on_stalled(self, seconds: float) -> None:
+        self.stall_time += seconds
+
+    def on_playing(self, seconds: float) -> bool:
+        """Count stall-free playback; True if the sizes shrank."""
+        self._clean += seconds
+        if self._clean < BUFFER_CLEAN_SECS:
+            return False
+        self._clean = 0.0
+        return self._set(
+            max(MPV_CACHE_SECS, (self.cache_secs + MPV_CACHE_SECS) / 2),
+            max(MPV_DEMUXER_MAX_BYTES, (self.max_bytes + MPV_DEMUXER_MAX_BYTES) // 2),
+        )
+
+    def _set(self, cache_secs: float, max_bytes: int) -> bool:
+        changed = (cache_secs, max_bytes) != (self.cache_secs, self.max_bytes)
+        self.cache_secs, self.max_bytes = cache_secs, max_bytes
+        return changed
+
+    def summary(self) -> str:
+        return (
+            f"Rebuffers {self.rebuffers} ({self.stall_time:.1f}s stalled), "
+            f"readahead {self.cache_secs:.0f}s / {self.max_bytes // MIB} MiB"
+        )
@@ -0,0 +1,592 @@
+"""Command-line mode for scripting: search, play and playlist edits.
+
+Nothing here imports Textual or ``ytmusic.ui``; heavier modules are imported
+inside the command that needs them.
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+from typing import Optional
+
+from .config import (
+    FORMAT_MODES,
+    HEALTH_CONCURRENCY,
+    IMPORT_CONCURRENCY,
+    SEARCH_FANOUT,
+    SEARCH_RESULTS,
+    STATUS_SOCKET,
+    SYNC_WORKERS,
+)
+from .models import Track, intern_track
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_WATCH_URL = re.compile(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})")
+
+
+def _track_json(track: Track) -> dict:
+    return {"title": track.title, "video_id": track.video_id, "url": track.url}
+
+
+def _print_tracks(tracks: list[Track], as_json: bool) -> None:
+    if as_json:
+        json.dump([_track_json(t) for t in tracks], sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        for t in tracks:
+            print(f"{t.video_id}\t{t.title}")
+
+
+def _search(query: str, fanout: bool, limit: int) -> list[Track]:
+    import asyncio
+
+    from .search import search_tracks, search_variants
+
+    if fanout:
+        tracks = asyncio.run(search_variants(query))
+    else:
+        tracks = asyncio.run(search_tracks(query))
+    return tracks[:limit]
+
+
+def _known_title(video_id: str) -> str:
+    """Title of video_id from history, library or playlists, or ""."""
+    from .history import PlayHistory
+    from .library import LibraryIndex
+    from .storage import load_playlists
+
+    history = PlayHistory()
+    title = history.title(video_id)
+    history.close()
+    if title and title != video_id:
+        return title
+    library = LibraryIndex()
+    track = library.get(video_id)
+    library.close()
+    if track is not None and track.title != video_id:
+        return track.title
+    for pl in load_playlists().values():
+        for t in pl.tracks:
+            if t.video_id == video_id and t.title != video_id:
+                return t.title
+    return ""
+
+
+def _resolve_arg(value: str, fanout: bool) -> Optional[Track]:
+    """Turn a video id, watch URL or free-text query into a track.
+
+    A bare id or URL takes its title from what has been seen before; if
+    nothing is known the title is the id itself.
+    """
+    m = _WATCH_URL.search(value)
+    vid = m.group(1) if m else value if _VIDEO_ID.match(value) else None
+    if vid is not None:
+        return intern_track(_known_title(vid) or vid, vid)
+    tracks = _search(value, fanout, 1)
+    return tracks[0] if tracks else None
+
+
+def _find_playlist(playlists: dict, name: str):
+    if name in playlists:
+        return playlists[name]
+    for pl in playlists.values():
+        if pl.name.casefold() == name.casefold():
+            return pl
+    return None
+
+
+def _default_id(playlists: dict) -> str:
+    for pid, pl in playlists.items():
+        if pl.is_default:
+            return pid
+    return "default"
+
+
+# ── Commands ─────────────────────────────────────
+
+
+def cmd_search(args) -> int:
+    tracks = _search(args.query, args.fanout, args.limit)
+    _print_tracks(tracks, args.json)
+    return 0 if tracks else 1
+
+
+def cmd_play(args) -> int:
+    from .formats import format_policy
+    from .history import PlayHistory
+    from .player import Player
+
+    if args.quality:
+        format_policy.mode = args.quality
+
+    track = _resolve_arg(args.target, args.fanout)
+    if track is None:
+        print(f"No results for {args.target!r}", file=sys.stderr)
+        return 1
+    if args.json:
+        _print_tracks([track], True)
+    else:
+        print(f"▶ {track.title}", file=sys.stderr)
+    done = threading.Event()
+    player = Player()
+    player.on_finish = done.set
+    history = PlayHistory()
+    player.play(track)
+    history.record_play(track)
+    try:
+        done.wait()
+        history.record_finish(track)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.stop()
+        history.close()
+    return 0
+
+
+def cmd_playlist_export(args) -> int:
+    from .storage import load_playlists
+
+    playlists = load_playlists()
+    if args.name:
+        pl = _find_playlist(playlists, args.name)
+        if pl is None:
+            print(f"No playlist named {args.name!r}", file=sys.stderr)
+            return 1
+        selected = [pl]
+    else:
+        selected = list(playlists.values())
+    if args.json:
+        data = [
+            {
+                "id": pl.id,
+                "name": pl.name,
+                "default": pl.is_default,
+                "tracks": [_track_json(t) for t in pl.tracks],
+            }
+            for pl in selected
+        ]
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for pl in selected:
+            print(f"# {pl.name}")
+            _print_tracks(pl.tracks, False)
+    return 0
+
+
+def cmd_playlist_add(args) -> int:
+    from .storage import load_playlists, save_playlists
+
+    playlists = load_playlists()
+    pl = _find_playlist(playlists, args.name)
+    if pl is None:
+        print(f"No playlist named {args.name!r}", file=sys.stderr)
+        return 1
+    track = _resolve_arg(args.target, args.fanout)
+    if track is None:
+        print(f"No results for {args.target!r}", file=sys.stderr)
+        return 1
+    if args.title:
+        track = Track(args.title, track.video_id)
+    elif track.title == track.video_id:
+        print(
+            f"No known title for {track.video_id}; pass --title", file=sys.stderr
+        )
+        return 1
+    if any(t.video_id == track.video_id for t in pl.tracks):
+        print("Already in playlist", file=sys.stderr)
+        return 0
+    pl.tracks.append(track)
+    save_playlists(playlists, _default_id(playlists))
+    print(f"Added: {track.title}", file=sys.stderr)
+    return 0
+
+
+def cmd_playlist_sync(args) -> int:
+    from .offline import OfflineSync, parse_rate
+    from .resolver import StreamResolver
+    from .storage import load_playlists
+
+    playlists = load_playlists()
+    if args.name:
+        pl = _find_playlist(playlists, args.name)
+        if pl is None:
+            print(f"No playlist named {args.name!r}", file=sys.stderr)
+            return 1
+        selected = [pl]
+    else:
+        selected = list(playlists.values())
+    try:
+        rate = parse_rate(args.limit_rate) if args.limit_rate else None
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    sync = OfflineSync(StreamResolver(), workers=args.workers)
+    if rate is not None:
+        sync.bucket.rate = rate
+    tracks = [t for pl in selected for t in pl.tracks]
+
+    def show(progress) -> None:
+        print(f"\r⇣ {progress.summary()}\033[K", end="", file=sys.stderr, flush=True)
+
+    try:
+        progress = sync.sync(tracks, on_progress=show)
+    except KeyboardInterrupt:
+        print(file=sys.stderr)
+        return 130
+    print(
+        f"\n{progress.done} downloaded, {progress.skipped} already offline, "
+        f"{progress.failed} failed",
+        file=sys.stderr,
+    )
+    return 1 if progress.failed else 0
+
+
+def cmd_playlist_import(args) -> int:
+    import uuid
+    from pathlib import Path
+
+    from .config import IMPORT_DIR
+    from .importer import TracklistImporter, state_path
+    from .models import Playlist
+    from .scheduler import CancelToken
+    from .storage import load_playlists, save_playlists
+
+    playlists = load_playlists()
+    pl = _find_playlist(playlists, args.name)
+    if pl is None:
+        pid = str(uuid.uuid4())[:8]
+        pl = playlists[pid] = Playlist(id=pid, name=args.name)
+    stdin = args.file == "-"
+    source = None if stdin else Path(args.file)
+    if args.review:
+        review = Path(args.review)
+    elif stdin:
+        review = IMPORT_DIR / f"{pl.id}.review.tsv"
+    else:
+        review = source.with_name(source.name + ".review.tsv")
+    state = None if stdin else state_path(source, pl.id)
+    if args.restart and state is not None:
+        state.unlink(missing_ok=True)
+        review.unlink(missing_ok=True)
+    importer = TracklistImporter(
+        pl,
+        lambda: save_playlists(playlists, _default_id(playlists)),
+        review,
+        state=state,
+        concurrency=args.workers,
+    )
+
+    def show(progress) -> None:
+        print(f"\r⇣ {progress.summary()}\033[K", end="", file=sys.stderr, flush=True)
+
+    token = CancelToken()
+    try:
+        if stdin:
+            progress = importer.run(sys.stdin, on_progress=show, token=token)
+        else:
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                progress = importer.run(f, on_progress=show, token=token)
+    except OSError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        token.cancel()
+        print("\nStopped; run the same command again to resume", file=sys.stderr)
+        return 130
+    print(file=sys.stderr)
+    if progress.resumed:
+        print(f"Resumed after line {progress.resumed}", file=sys.stderr)
+    print(
+        f"{progress.matched - progress.duplicates} added to '{pl.name}'"
+        + (f", {progress.duplicates} already there" if progress.duplicates else "")
+        + (
+            f"; {progress.review + progress.failed} lines to review in {review}"
+            if progress.review + progress.failed
+            else ""
+        ),
+        file=sys.stderr,
+    )
+    return 0
+
+
+def cmd_playlist_check(args) -> int:
+    from .health import HealthChecker
+    from .storage import load_playlists
+
+    playlists = load_playlists()
+    if args.name:
+        pl = _find_playlist(playlists, args.name)
+        if pl is None:
+            print(f"No playlist named {args.name!r}", file=sys.stderr)
+            return 1
+        selected = [pl]
+    else:
+        selected = list(playlists.values())
+    health = HealthChecker(concurrency=args.workers)
+    tracks = [t for pl in selected for t in pl.tracks]
+
+    def show(progress) -> None:
+        print(f"\r✚ {progress.summary()}\033[K", end="", file=sys.stderr, flush=True)
+
+    try:
+        progress = health.check(tracks, on_progress=show, force=args.force)
+    except KeyboardInterrupt:
+        print(file=sys.stderr)
+        return 130
+    print(file=sys.stderr)
+    dead = list({t.video_id: t for t in tracks if health.is_dead(t.video_id)}.values())
+    if args.json:
+        json.dump(
+            [
+                dict(_track_json(t), reason=health.verdict(t.video_id).reason)
+                for t in dead
+            ],
+            sys.stdout,
+            ensure_ascii=False,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+    else:
+        for t in dead:
+            print(f"{t.video_id}\t{t.title}\t{health.verdict(t.video_id).reason}")
+    print(
+        f"{len(dead)} unavailable, {progress.unknown} could not be checked "
+        f"({progress.cached} from cache)",
+        file=sys.stderr,
+    )
+    return 1 if dead else 0
+
+
+def cmd_playlist_dedupe(args) -> int:
+    from .dedupe import DuplicateIndex, merge_duplicates
+    from .storage import load_playlists, save_playlists
+
+    playlists = load_playlists()
+    if args.name:
+        pl = _find_playlist(playlists, args.name)
+        if pl is None:
+            print(f"No playlist named {args.name!r}", file=sys.stderr)
+            return 1
+        selected = [pl]
+    else:
+        selected = list(playlists.values())
+    index = DuplicateIndex()
+    if not index.available:
+        print("Duplicate detection needs numpy", file=sys.stderr)
+        return 1
+    index.add(t for pl in selected for t in pl.tracks)
+    clusters = index.clusters()
+    if args.json:
+        json.dump(
+            [[_track_json(t) for t in c] for c in clusters],
+            sys.stdout,
+            ensure_ascii=False,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+    else:
+        for c in clusters:
+            _print_tracks(c, False)
+            print()
+    if args.merge and clusters:
+        removed = merge_duplicates(selected, clusters)
+        save_playlists(playlists, _default_id(playlists))
+        print(f"Removed {removed} duplicate entries", file=sys.stderr)
+    else:
+        print(f"{len(clusters)} groups of near-duplicates", file=sys.stderr)
+    return 0
+
+
+def cmd_zones(args) -> int:
+    from .history import PlayHistory
+    from .storage import load_playlists
+    from .zones import ZoneManager
+
+    playlists = load_playlists()
+    specs = []
+    for spec in args.zones:
+        zone, sep, name = spec.partition("=")
+        zone, _, device = zone.partition("@")
+        pl = _find_playlist(playlists, name) if sep else None
+        if not zone or pl is None:
+            print(
+                f"Bad zone {spec!r}: expected ZONE[@DEVICE]=PLAYLIST", file=sys.stderr
+            )
+            return 2
+        specs.append((zone, device or None, pl))
+
+    def show(z) -> None:
+        title = z.current.title if z.current else "(stopped)"
+        print(f"[{z.name}] ▶ {title}", file=sys.stderr, flush=True)
+
+    history = PlayHistory()
+    manager = ZoneManager(history=history, on_change=show)
+    try:
+        for zone, device, pl in specs:
+            manager.add(zone, audio_device=device)
+            manager.enqueue(zone, pl.tracks)
+            manager.play(zone)
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop_all()
+        history.close()
+    return 0
+
+
+def _mmss(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def cmd_status(args) -> int:
+    import time
+
+    from .status import subscribe
+
+    try:
+        for status in subscribe(args.socket):
+            if args.format:
+                position = status["position"]
+                if status["state"] == "playing":
+                    # Updates come every few seconds; fill in the time since.
+                    position += time.time() - status["updated"]
+                    position = min(position, status["duration"] or position)
+                fields = dict(
+                    status,
+                    elapsed=_mmss(position),
+                    length=_mmss(status["duration"]),
+                )
+                try:
+                    print(args.format.format_map(fields), flush=True)
+                except (KeyError, ValueError) as e:
+                    print(f"Bad format: {e}", file=sys.stderr)
+                    return 2
+            else:
+                print(json.dumps(status, ensure_ascii=False), flush=True)
+            if not args.follow:
+                break
+    except OSError:
+        print("ytmusic is not running", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ytmusic",
+        description="Terminal YouTube Music player. Run without a command "
+        "to start the TUI.",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    fanout = argparse.ArgumentParser(add_help=False)
+    fanout.add_argument(
+        "--fanout",
+        action=argparse.BooleanOptionalAction,
+        default=SEARCH_FANOUT,
+        help="search query variants concurrently",
+    )
+
+    p = sub.add_parser("search", parents=[fanout], help="search and print results")
+    p.add_argument("query")
+    p.add_argument("--json", action="store_true", help="print JSON")
+    p.add_argument("-n", "--limit", type=int, default=SEARCH_RESULTS)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser(
+        "play", parents=[fanout], help="play a video id, URL or top search hit"
+    )
+    p.add_argument("target", help="video id, watch URL or search query")
+    p.add_argument("--json", action="store_true", help="print the track as JSON")
+    p.add_argument(
+        "--quality", choices=FORMAT_MODES, help="audio quality (default from config)"
+    )
+    p.set_defaults(func=cmd_play)
+
+    p = sub.add_parser("playlist", help="export or edit playlists")
+    psub = p.add_subparsers(dest="playlist_command", required=True)
+    e = psub.add_parser("export", help="print playlists")
+    e.add_argument("name", nargs="?", help="playlist id or name")
+    e.add_argument("--json", action="store_true", help="print JSON")
+    e.set_defaults(func=cmd_playlist_export)
+    a = psub.add_parser("add", parents=[fanout], help="add a track to a playlist")
+    a.add_argument("name", help="playlist id or name")
+    a.add_argument("target", help="video id, watch URL or search query")
+    a.add_argument("--title", help="title to store for a video id or URL")
+    a.set_defaults(func=cmd_playlist_add)
+    s = psub.add_parser("sync", help="download playlists for offline play")
+    s.add_argument("name", nargs="?", help="playlist id or name (default: all)")
+    s.add_argument("-j", "--workers", type=int, default=SYNC_WORKERS)
+    s.add_argument("--limit-rate", help="total bandwidth cap, e.g. 500K or 2M")
+    s.set_defaults(func=cmd_playlist_sync)
+    i = psub.add_parser(
+        "import", help="match an 'Artist - Title' tracklist into a playlist"
+    )
+    i.add_argument("file", help="tracklist, one song per line ('-' for stdin)")
+    i.add_argument("name", help="playlist id or name (created if missing)")
+    i.add_argument("-j", "--workers", type=int, default=IMPORT_CONCURRENCY)
+    i.add_argument("--review", help="where to list doubtful lines")
+    i.add_argument(
+        "--restart", action="store_true", help="start over instead of resuming"
+    )
+    i.set_defaults(func=cmd_playlist_import)
+    c = psub.add_parser("check", help="find tracks that are private or deleted")
+    c.add_argument("name", nargs="?", help="playlist id or name (default: all)")
+    c.add_argument("-j", "--workers", type=int, default=HEALTH_CONCURRENCY)
+    c.add_argument("--json", action="store_true", help="print JSON")
+    c.add_argument(
+        "--force", action="store_true", help="probe again even if recently checked"
+    )
+    c.set_defaults(func=cmd_playlist_check)
+    d = psub.add_parser("dedupe", help="find the same song under different uploads")
+    d.add_argument("name", nargs="?", help="playlist id or name (default: all)")
+    d.add_argument("--json", action="store_true", help="print JSON")
+    d.add_argument(
+        "--merge",
+        action="store_true",
+        help="keep only the first upload of each song in every playlist",
+    )
+    d.set_defaults(func=cmd_playlist_dedupe)
+
+    p = sub.add_parser("zones", help="play playlists on several outputs at once")
+    p.add_argument(
+        "zones",
+        nargs="+",
+        metavar="ZONE[@DEVICE]=PLAYLIST",
+        help="zone name, optional mpv --audio-device and playlist to loop",
+    )
+    p.set_defaults(func=cmd_zones)
+
+    p = sub.add_parser("status", help="print what the running app is playing")
+    p.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help="keep printing a line on every change (for status bars)",
+    )
+    p.add_argument(
+        "--format",
+        help="template such as '{title} {elapsed}/{length}' instead of JSON",
+    )
+    p.add_argument("--socket", default=STATUS_SOCKET, help=argparse.SUPPRESS)
+    p.set_defaults(func=cmd_status)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from .app import YTMusicApp
+
+        YTMusicApp().run()
+        return 0
+    return args.func(args)
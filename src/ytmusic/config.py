@@ -1,21 +1,113 @@
 """Application configuration and constants."""
 
+import os
 from pathlib import Path
 
 # Paths
 CONFIG_DIR = Path.home() / ".config" / "ytmusic"
 PLAYLISTS_FILE = CONFIG_DIR / "playlists.json"
+HISTORY_FILE = CONFIG_DIR / "history.log"
+HISTORY_INDEX_FILE = CONFIG_DIR / "history.json"
+SESSION_FILE = CONFIG_DIR / "session.json"
+THUMBNAIL_DIR = CONFIG_DIR / "thumbs"
+LIBRARY_FILE = CONFIG_DIR / "library.jsonl"
+OFFLINE_DIR = CONFIG_DIR / "offline"
+LOUDNESS_FILE = CONFIG_DIR / "loudness.json"
+LOUDNESS_DIR = CONFIG_DIR / "loudness"
+WATCHDOG_LOG = CONFIG_DIR / "watchdog.log"
+HEALTH_FILE = CONFIG_DIR / "health.json"
+IMPORT_DIR = CONFIG_DIR / "imports"
 
 # MPV settings
+MPV_BINARY = "mpv"
 MPV_SOCKET = "/tmp/ytmusic-mpv.sock"
 MPV_VOLUME = 80
 MPV_NO_VIDEO = True
 MPV_REALLY_QUIET = True
 MPV_TERM_OSD = "no"
 
+# mpv readahead, adapted to stalls within these limits
+MPV_CACHE_SECS = 20.0
+MPV_CACHE_SECS_MAX = 300.0
+MPV_DEMUXER_MAX_BYTES = 8 * 1024 * 1024
+MPV_DEMUXER_MAX_BYTES_LIMIT = 64 * 1024 * 1024
+BUFFER_CLEAN_SECS = 600.0
+BUFFER_LOW_SECS = 3.0
+
+# Loudness normalization (target in LUFS, gain limit in dB, 0 workers disables)
+LOUDNESS_TARGET = -14.0
+LOUDNESS_MAX_GAIN = 12.0
+LOUDNESS_WORKERS = 1
+LOUDNESS_DECODER = "ffmpeg"
+
+# Crossfade between tracks (0 disables)
+CROSSFADE_SECS = 0.0
+CROSSFADE_PRELOAD_SECS = 15.0
+
+# yt-dlp
+YTDLP_BINARY = "yt-dlp"
+
+# Stream resolution
+STREAM_URL_TTL = 4 * 3600
+STREAM_PRIME = False
+STREAM_PRIME_BYTES = 256 * 1024
+SPECULATE_DWELL = 0.4
+
+# Audio format
+FORMAT_MODES = ("low", "balanced", "max")
+FORMAT_MODE = "balanced"
+FORMAT_TARGET_START = 2.0
+FORMAT_START_BUFFER_SECS = 5.0
+THROUGHPUT_ALPHA = 0.3
+
+# Availability checks: verdicts are trusted for HEALTH_TTL seconds, at most
+# HEALTH_CONCURRENCY probes are in flight; the queue skips dead tracks
+HEALTH_TTL = 7 * 24 * 3600
+HEALTH_CONCURRENCY = 3
+HEALTH_SKIP_DEAD = True
+
+# Job scheduler
+SCHED_MAX_WORKERS = 4
+SCHED_RESERVED_INTERACTIVE = 1
+SCHED_HOST_INTERVAL = 0.2
+SCHED_BACKOFF_MIN = 2.0
+SCHED_BACKOFF_MAX = 60.0
+YOUTUBE_HOST = "youtube.com"
+
 # Socket settings
 SOCKET_TIMEOUT = 0.2
 
+# Player polling: exits and fades every tick, mpv properties every interval
+PLAYER_TICK = 0.1
+PLAYER_POLL_INTERVAL = 0.5
+# IPC one player may spend per tick; an unresponsive mpv then delays the
+# other zones by at most this much
+PLAYER_TICK_IPC_BUDGET = 0.05
+
+# Resource watchdog: sample every interval (0 disables), trends over the last
+# WATCHDOG_WINDOW samples; tracing lists the top growing allocation sites.
+# Counting widgets alive outside the DOM takes a full gc pass that pauses
+# every thread, so it only runs when asked for or while tracing
+WATCHDOG_INTERVAL = 300.0
+WATCHDOG_WINDOW = 12
+WATCHDOG_TRACE = False
+WATCHDOG_LIVE_WIDGETS = False
+WATCHDOG_TOP = 5
+WATCHDOG_LOG_BYTES = 1024 * 1024
+WATCHDOG_LOG_BACKUPS = 3
+
+# Now-playing status for status bars: subscribers of the socket, kept in
+# XDG_RUNTIME_DIR (else the config dir) and readable by this user only, get
+# a JSON line on each change ("" disables), position updates every
+# STATUS_POSITION_STEP seconds; STATUS_FILE (None for off) is replaced with
+# the same JSON. The app checks for changes every STATUS_INTERVAL seconds.
+STATUS_SOCKET = str(
+    Path(os.environ.get("XDG_RUNTIME_DIR") or CONFIG_DIR) / "ytmusic-status.sock"
+)
+STATUS_FILE = None
+STATUS_POSITION_STEP = 10.0
+STATUS_INTERVAL = 1.0
+
 # Thread pool
 THREAD_POOL_WORKERS = 4
 
@@ -23,6 +115,20 @@ THREAD_POOL_WORKERS = 4
 NOW_PLAYING_INTERVAL = 0.5
 PROGRESS_BAR_WIDTH = 50
 
+# Spectrum panel (needs numpy): rate and FFT size of the analysed PCM,
+# and at most SPECTRUM_MAX_WINDOWS FFTs per frame
+SPECTRUM_FPS = 15
+SPECTRUM_BANDS = 32
+SPECTRUM_RATE = 22050
+SPECTRUM_FFT_SIZE = 1024
+SPECTRUM_MAX_WINDOWS = 4
+
+# Album art
+SHOW_ALBUM_ART = True
+THUMBNAIL_URL = "https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+THUMBNAIL_CELLS = (14, 4)
+THUMBNAIL_CACHE_BYTES = 4 * 1024 * 1024
+
 # Colors (hex)
 COLORS = {
     "screen_bg": "#06060f",
@@ -40,8 +146,50 @@ COLORS = {
     "queue_bg": "#050510",
 }
 
+# Session snapshot
+SESSION_SNAPSHOT_INTERVAL = 10.0
+# Playlist and queue edits are written this many seconds after the first
+# unsaved change, off the UI thread
+SAVE_WINDOW = 0.5
+SESSION_AUTOPLAY = True
+
+# Play history
+HISTORY_COMPACT_EVENTS = 5000
+HISTORY_RECENT_LIMIT = 500
+HISTORY_TOP_LIMIT = 50
+
+# Offline sync (rate limit in bytes per second, 0 for none)
+SYNC_WORKERS = 3
+SYNC_RATE_LIMIT = 0
+
+# Local library search
+LIBRARY_MAX_RESULTS = 10
+
+# Near-duplicate detection: estimated title similarity needed to match,
+# MinHash size and LSH bands (similarity ~ (1/bands)^(bands/perms) is the
+# point where half of the pairs become candidates)
+DEDUPE_THRESHOLD = 0.7
+DEDUPE_PERMUTATIONS = 64
+DEDUPE_BANDS = 16
+DEDUPE_WARN = True
+
+# Tracklist import: searches in flight, candidates per line and lines per
+# playlist write; a line goes to review when its best match scores below
+# IMPORT_ACCEPT or a different song scores within IMPORT_MARGIN of it
+IMPORT_CONCURRENCY = 3
+IMPORT_CANDIDATES = 5
+IMPORT_BATCH = 50
+IMPORT_ACCEPT = 0.75
+IMPORT_MARGIN = 0.1
+
+# List filter
+FILTER_MAX_RESULTS = 100
+
 # Search settings
 SEARCH_RESULTS = 10
+SEARCH_MAX_RESULTS = 20
+SEARCH_FANOUT = True
+SEARCH_VARIANTS = ("{query}", "{query} audio", "{query} topic")
 
 # Key bindings (mode-based)
 KEY_BINDINGS = {
@@ -54,6 +202,10 @@ KEY_BINDINGS = {
         ("d", "dequeue"),
         ("l", "lists"),
         ("e", "add_def"),
+        ("f", "filter"),
+        ("m", "quality"),
+        ("v", "spectrum"),
+        ("i", "stats"),
         ("q", "quit"),
     ],
     "playlists": [
@@ -61,6 +213,9 @@ KEY_BINDINGS = {
         ("enter", "open"),
         ("n", "new"),
         ("x", "delete"),
+        ("s", "sync"),
+        ("c", "check"),
+        ("f", "filter"),
         ("/", "search"),
         ("q", "quit"),
     ],
@@ -69,6 +224,9 @@ KEY_BINDINGS = {
         ("enter", "play"),
         ("n", "next"),
         ("d", "remove"),
+        ("s", "sync"),
+        ("c", "check"),
+        ("f", "filter"),
         ("/", "search"),
         ("q", "quit"),
     ],
@@ -0,0 +1,260 @@
+"""Near-duplicate tracks: the same song under different uploads."""
+
+import re
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it nothing is flagged.
+    np = None
+
+from .config import DEDUPE_BANDS, DEDUPE_PERMUTATIONS, DEDUPE_THRESHOLD
+from .filter import normalize
+from .models import Playlist, Track
+
+_BRACKETS = re.compile(r"[(\[【「]([^)\]】」]*)[)\]】」]")
+_WORDS = re.compile(r"[^\W_]+")
+# Words uploads add around a song that say nothing about which song it is.
+NOISE = frozenset(
+    "official lyric lyrics visualizer visualiser hd hq 4k topic mv oficial "
+    "videoclip ft feat featuring".split()
+)
+# Noise only in brackets or next to other noise ("Official Music Video"),
+# since songs are called "Music" or "Video Games" too.
+WEAK_NOISE = frozenset("audio video music clip explicit clean".split())
+# Bracketed words that make a different recording of the same song; tracks
+# only match when they share the same set.
+VARIANTS = frozenset(
+    "live remix mix acoustic cover instrumental karaoke demo edit remaster "
+    "remastered slowed reverb sped nightcore unplugged extended radio "
+    "version session".split()
+)
+_BATCH = 1024  # titles per MinHash batch
+
+
+def normalize_title(title: str) -> tuple[str, frozenset]:
+    """Words identifying the song, and the variant words it carries.
+
+    Noise words are dropped, and so are variant words in brackets, which
+    are returned separately. A title that is nothing but noise keeps its
+    words.
+    """
+    text = normalize(title)
+    words = _WORDS.findall(_BRACKETS.sub(" ", text))
+    drop = [w in NOISE for w in words]
+    # A weak noise word goes when a word next to it went.
+    for i in range(1, len(words)):
+        drop[i] = drop[i] or (words[i] in WEAK_NOISE and drop[i - 1])
+    for i in range(len(words) - 2, -1, -1):
+        drop[i] = drop[i] or (words[i] in WEAK_NOISE and drop[i + 1])
+    kept = [w for w, d in zip(words, drop) if not d]
+    bracketed = _WORDS.findall(" ".join(_BRACKETS.findall(text)))
+    kept += [
+        w
+        for w in bracketed
+        if w not in NOISE and w not in WEAK_NOISE and w not in VARIANTS
+    ]
+    variant = frozenset(w for w in bracketed if w in VARIANTS)
+    return " ".join(kept or words + bracketed), variant
+
+
+class DuplicateIndex:
+    """MinHash signatures of track titles with an LSH band index.
+
+    A title's shingles are the character trigrams of each normalized word
+    (padded with spaces, never spanning two words, so word order does not
+    matter). Each of ``DEDUPE_PERMUTATIONS`` multiply-shift hashes keeps
+    its minimum over them; two signatures agree in a position with
+    probability equal to the titles' Jaccard similarity. Signatures are
+    split into ``DEDUPE_BANDS`` bands and a band is reduced to one 64-bit
+    key, so candidate pairs are tracks sharing any band key. They only
+    count as duplicates when their estimated similarity reaches
+    ``DEDUPE_THRESHOLD`` and their variant words match.
+
+    Signatures for a batch of titles are computed together in NumPy.
+    ``add`` appends rows; nothing is rebuilt.
+    """
+
+    def __init__(
+        self,
+        permutations: int = DEDUPE_PERMUTATIONS,
+        bands: int = DEDUPE_BANDS,
+        threshold: float = DEDUPE_THRESHOLD,
+    ):
+        self.threshold = threshold
+        self.tracks: list[Track] = []
+        self._rows: dict[str, int] = {}
+        self._variants: dict[frozenset, int] = {}
+        if np is None:
+            return
+        rng = np.random.default_rng(0x5EED)
+        self._a = rng.integers(1, 2**63, permutations, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, permutations, dtype=np.uint64)
+        self._rows_per_band = permutations // bands
+        self._mix = rng.integers(1, 2**63, self._rows_per_band, dtype=np.uint64)
+        self._sigs = np.zeros((0, permutations), np.uint32)
+        self._keys = np.zeros((0, bands), np.uint64)
+        self._variant = np.zeros(0, np.int32)
+        self._size = 0
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def _signatures(self, titles: list[str]):
+        """MinHash rows for normalized titles; all-ones for empty ones."""
+        sigs = np.full((len(titles), len(self._a)), 0xFFFFFFFF, np.uint32)
+        for lo in range(0, len(titles), _BATCH):
+            batch = titles[lo : lo + _BATCH]
+            text = "\0".join(" " + t.replace(" ", "  ") + " " for t in batch)
+            codes = np.frombuffer(text.encode("utf-32-le"), np.uint32).astype(np.uint64)
+            doc = np.cumsum(codes == 0)
+            c0, c1, c2 = codes[:-2], codes[1:-1], codes[2:]
+            ok = (c0 != 0) & (c1 != 0) & (c2 != 0) & (c1 != 32)
+            # Code points fit in 21 bits, so a trigram packs into 63 exactly.
+            shingles = (c0[ok] << np.uint64(42)) | (c1[ok] << np.uint64(21)) | c2[ok]
+            owner = doc[:-2][ok]
+            if not len(shingles):
+                continue
+            starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+            hashed = (shingles[:, None] * self._a + self._b) >> np.uint64(32)
+            mins = np.minimum.reduceat(hashed, starts, axis=0)
+            sigs[lo + owner[starts]] = mins.astype(np.uint32)
+        return sigs
+
+    def _band_keys(self, sigs):
+        r = self._rows_per_band
+        bands = sigs[:, : r * (sigs.shape[1] // r)].reshape(len(sigs), -1, r)
+        return (bands.astype(np.uint64) * self._mix).sum(axis=2)
+
+    def _variant_id(self, variant: frozenset) -> int:
+        return self._variants.setdefault(variant, len(self._variants))
+
+    def add(self, tracks: Iterable[Track]) -> int:
+        """Index tracks not seen before; returns how many were added."""
+        new = []
+        for t in tracks:
+            if t.video_id not in self._rows:
+                self._rows[t.video_id] = len(self.tracks)
+                self.tracks.append(t)
+                new.append(t)
+        if not new or np is None:
+            return len(new)
+        norm = [normalize_title(t.title) for t in new]
+        sigs = self._signatures([n[0] for n in norm])
+        keys = self._band_keys(sigs)
+        variant = np.array([self._variant_id(n[1]) for n in norm], np.int32)
+        end = self._size + len(new)
+        if end > len(self._sigs):
+            cap = max(end, len(self._sigs) * 2, 64)
+            self._sigs = np.resize(self._sigs, (cap, self._sigs.shape[1]))
+            self._keys = np.resize(self._keys, (cap, self._keys.shape[1]))
+            self._variant = np.resize(self._variant, cap)
+        self._sigs[self._size : end] = sigs
+        self._keys[self._size : end] = keys
+        self._variant[self._size : end] = variant
+        self._size = end
+        return len(new)
+
+    def similar(self, track: Track) -> list[Track]:
+        """Indexed tracks that look like the same song as ``track``."""
+        if np is None or not self._size:
+            return []
+        title, variant = normalize_title(track.title)
+        sig = self._signatures([title])
+        if (sig == 0xFFFFFFFF).all():
+            return []
+        keys = self._keys[: self._size]
+        rows = np.flatnonzero((keys == self._band_keys(sig)).any(axis=1))
+        rows = rows[self._variant[rows] == self._variant_id(variant)]
+        score = (self._sigs[rows] == sig).mean(axis=1)
+        rows = rows[score >= self.threshold]
+        return [
+            self.tracks[i]
+            for i in rows[np.argsort(-score[score >= self.threshold], kind="stable")]
+            if self.tracks[i].video_id != track.video_id
+        ]
+
+    def clusters(self) -> list[list[Track]]:
+        """Groups of two or more tracks that are near-duplicates.
+
+        Within a band, tracks with equal keys are adjacent after sorting;
+        each is compared with the first of its run and the one before it,
+        so a large run costs linear work rather than every pair.
+        """
+        if np is None or self._size < 2:
+            return []
+        n = self._size
+        sigs, keys = self._sigs[:n], self._keys[:n]
+        empty = (sigs == 0xFFFFFFFF).all(axis=1)
+        pairs = []
+        for band in range(keys.shape[1]):
+            order = np.argsort(keys[:, band], kind="stable")
+            k = keys[order, band]
+            same = np.flatnonzero(k[1:] == k[:-1]) + 1
+            if not len(same):
+                continue
+            run_start = np.maximum.accumulate(
+                np.where(np.r_[True, k[1:] != k[:-1]], np.arange(n), 0)
+            )
+            pairs.append(np.stack([order[same - 1], order[same]], axis=1))
+            pairs.append(np.stack([order[run_start[same]], order[same]], axis=1))
+        if not pairs:
+            return []
+        pairs = np.sort(np.concatenate(pairs), axis=1).astype(np.int64)
+        # One int64 per pair makes deduplicating them a flat sort.
+        packed = np.unique(pairs[:, 0] * n + pairs[:, 1])
+        pairs = np.stack([packed // n, packed % n], axis=1)
+        p, q = pairs[:, 0], pairs[:, 1]
+        keep = (
+            (p != q)
+            & ~empty[p]
+            & (self._variant[p] == self._variant[q])
+            & ((sigs[p] == sigs[q]).mean(axis=1) >= self.threshold)
+        )
+        parent = list(range(n))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in pairs[keep].tolist():
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        groups: dict[int, list[Track]] = {}
+        for i in np.unique(pairs[keep]).tolist():
+            groups.setdefault(find(i), []).append(self.tracks[i])
+        return sorted(groups.values(), key=lambda g: self._rows[g[0].video_id])
+
+
+def merge_duplicates(playlists: Iterable[Playlist], clusters: list[list[Track]]) -> int:
+    """Keep the first member of each cluster in every playlist.
+
+    Returns the number of entries removed. Virtual playlists are skipped.
+    """
+    cluster_of: dict[str, int] = {}
+    for n, cluster in enumerate(clusters):
+        for t in cluster:
+            cluster_of[t.video_id] = n
+    removed = 0
+    for pl in playlists:
+        if pl.is_virtual:
+            continue
+        seen: set[int] = set()
+        kept = []
+        for t in pl.tracks:
+            n: Optional[int] = cluster_of.get(t.video_id)
+            if n is not None:
+                if n in seen:
+                    removed += 1
+                    continue
+                seen.add(n)
+            kept.append(t)
+        pl.tracks[:] = kept
+    return removed
@@ -0,0 +1,116 @@
+"""Incremental fuzzy filtering over list titles."""
+
+import re
+import threading
+import unicodedata
+from itertools import islice
+from typing import Optional, Sequence
+
+from .config import FILTER_MAX_RESULTS
+
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+class FuzzyIndex:
+    """Normalized titles of one collection, filtered as the user types.
+
+    Titles are normalized once up front. Matches rank in tiers (word-prefix,
+    substring, subsequence), each tier in the collection's original order,
+    and only the first ``limit`` ranked indices are produced.
+
+    Typing more characters narrows the previous match sets instead of
+    rescanning the collection. The subsequence tier is the expensive one, so
+    it is only computed when the substring tiers cannot fill ``limit`` rows;
+    otherwise the previous subsequence set is kept as a superset for the
+    next keystroke. Callers filtering from more than one thread hold
+    ``lock`` around ``filter`` and the counts.
+    """
+
+    def __init__(self, titles: Sequence[str], source: object = None):
+        self.source = source
+        self.size = len(titles)
+        # A leading space lets " " + query find word-prefix matches with a
+        # plain substring test.
+        self._norm = [" " + normalize(t) for t in titles]
+        self._query = ""
+        self._substring: Optional[list[int]] = None
+        self._fuzzy: Optional[list[int]] = None
+        self._fuzzy_exact = False
+        self.lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Number of matches known for the current query."""
+        if not self._query:
+            return self.size
+        if self._fuzzy_exact:
+            return len(self._fuzzy)
+        return len(self._substring)
+
+    @property
+    def count_exact(self) -> bool:
+        """False when ``count`` leaves out uncounted subsequence matches."""
+        return not self._query or self._fuzzy_exact
+
+    def is_current(self, source: Sequence) -> bool:
+        """True if the index was built from this collection object.
+
+        Edits in place that keep its length go unnoticed; whoever edits the
+        collection drops its index.
+        """
+        return self.source is source and self.size == len(source)
+
+    def filter(
+        self, query: str, limit: Optional[int] = FILTER_MAX_RESULTS
+    ) -> list[int]:
+        """Return original indices of titles matching query, best first."""
+        q = " ".join(normalize(query).split())
+        if limit is None:
+            limit = self.size
+        if not q:
+            self._query = ""
+            self._substring = self._fuzzy = None
+            self._fuzzy_exact = False
+            return list(range(min(limit, self.size)))
+
+        everything = range(self.size)
+        if self._query and q.startswith(self._query):
+            substring_from = self._substring
+            fuzzy_from = self._fuzzy if self._fuzzy is not None else everything
+        else:
+            substring_from = fuzzy_from = everything
+        norm = self._norm
+        substring = [i for i in substring_from if q in norm[i]]
+
+        word = " " + q
+        ranked = list(islice((i for i in substring if word in norm[i]), limit))
+        if len(ranked) < limit:
+            ranked.extend(
+                islice(
+                    (i for i in substring if word not in norm[i]), limit - len(ranked)
+                )
+            )
+        fuzzy: Optional[list[int]]
+        if len(ranked) < limit and len(q) > 1:
+            # "[^c]*c" per character matches a subsequence without the
+            # backtracking a ".*?" chain would do.
+            match = re.compile("".join(f"[^{c}]*{c}" for c in map(re.escape, q))).match
+            fuzzy = [i for i in fuzzy_from if match(norm[i])]
+            ranked.extend(
+                islice((i for i in fuzzy if q not in norm[i]), limit - len(ranked))
+            )
+            exact = True
+        elif len(q) == 1:
+            fuzzy, exact = substring, True
+        else:
+            fuzzy = None if fuzzy_from is everything else fuzzy_from
+            exact = False
+        self._query = q
+        self._substring, self._fuzzy, self._fuzzy_exact = substring, fuzzy, exact
+        return ranked
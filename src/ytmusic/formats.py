@@ -0,0 +1,142 @@
+"""Audio format policy driven by measured throughput."""
+
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import (
+    FORMAT_MODE,
+    FORMAT_MODES,
+    FORMAT_START_BUFFER_SECS,
+    FORMAT_TARGET_START,
+    THROUGHPUT_ALPHA,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AudioFormat:
+    """A yt-dlp format selector and its approximate bitrate."""
+
+    label: str
+    selector: str
+    kbps: int
+
+
+# Ladders run from best to cheapest and end in the cheapest audio-only
+# stream. "max" holds every rung of "balanced", so on a slow link it never
+# ends up below it. Selection walks down until a format is expected to start
+# within FORMAT_TARGET_START.
+FORMAT_LADDERS: dict[str, list[AudioFormat]] = {
+    "low": [
+        AudioFormat("opus 64k", "bestaudio[acodec=opus][abr<=64]", 64),
+        AudioFormat("m4a 48k", "bestaudio[ext=m4a][abr<=48]", 48),
+        AudioFormat("worst", "worstaudio", 32),
+    ],
+    "balanced": [
+        AudioFormat("opus 160k", "bestaudio[acodec=opus][abr<=160]", 160),
+        AudioFormat("m4a 128k", "bestaudio[ext=m4a][abr<=128]", 128),
+        AudioFormat("opus 64k", "bestaudio[acodec=opus][abr<=64]", 64),
+        AudioFormat("worst", "worstaudio", 32),
+    ],
+    "max": [
+        AudioFormat("best", "bestaudio/best", 256),
+        AudioFormat("opus 160k", "bestaudio[acodec=opus][abr<=160]", 160),
+        AudioFormat("m4a 128k", "bestaudio[ext=m4a][abr<=128]", 128),
+        AudioFormat("opus 64k", "bestaudio[acodec=opus][abr<=64]", 64),
+        AudioFormat("worst", "worstaudio", 32),
+    ],
+}
+
+
+class ThroughputEstimator:
+    """Exponentially weighted average of recent download rates."""
+
+    def __init__(self, alpha: float = THROUGHPUT_ALPHA):
+        self._alpha = alpha
+        self._lock = threading.Lock()
+        self._rate: Optional[float] = None
+        self.samples = 0
+
+    @property
+    def bytes_per_sec(self) -> Optional[float]:
+        return self._rate
+
+    def record(self, nbytes: int, seconds: float) -> None:
+        if nbytes <= 0 or seconds <= 0:
+            return
+        rate = nbytes / seconds
+        with self._lock:
+            if self._rate is None:
+                self._rate = rate
+            else:
+                self._rate += self._alpha * (rate - self._rate)
+            self.samples += 1
+
+
+class FormatPolicy:
+    """Picks the best format of the current mode that starts in time."""
+
+    def __init__(self, mode: str = FORMAT_MODE):
+        self.mode = mode if mode in FORMAT_LADDERS else "balanced"
+        self.throughput = ThroughputEstimator()
+
+    def start_time(self, fmt: AudioFormat) -> Optional[float]:
+        """Expected seconds to buffer enough of fmt to start playback."""
+        rate = self.throughput.bytes_per_sec
+        if rate is None:
+            return None
+        needed = fmt.kbps * 1000 / 8 * FORMAT_START_BUFFER_SECS
+        return needed / rate
+
+    def _choose_index(self) -> int:
+        ladder = FORMAT_LADDERS[self.mode]
+        for i, fmt in enumerate(ladder):
+            t = self.start_time(fmt)
+            if t is None or t <= FORMAT_TARGET_START:
+                return i
+        return len(ladder) - 1
+
+    def choose(self) -> AudioFormat:
+        return FORMAT_LADDERS[self.mode][self._choose_index()]
+
+    def selector(self) -> str:
+        """yt-dlp -f / mpv --ytdl-format value.
+
+        The chosen format is followed by the cheaper rungs, so a video that
+        lacks it falls back downwards rather than to the best stream.
+        """
+        ladder = FORMAT_LADDERS[self.mode]
+        return "/".join(f.selector for f in ladder[self._choose_index() :])
+
+    def cycle_mode(self) -> str:
+        i = FORMAT_MODES.index(self.mode)
+        self.mode = FORMAT_MODES[(i + 1) % len(FORMAT_MODES)]
+        return self.mode
+
+    def measure(self, url: str, nbytes: int, timeout: float = 10) -> Optional[float]:
+        """Download the first nbytes of url and record the rate."""
+        req = urllib.request.Request(url, headers={"Range": f"bytes=0-{nbytes - 1}"})
+        start = time.monotonic()
+        got = 0
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                while got < nbytes:
+                    chunk = resp.read(min(65536, nbytes - got))
+                    if not chunk:
+                        break
+                    got += len(chunk)
+        except Exception:
+            return None
+        elapsed = time.monotonic() - start
+        self.throughput.record(got, elapsed)
+        return got / elapsed if elapsed > 0 else None
+
+    def summary(self) -> str:
+        rate = self.throughput.bytes_per_sec
+        measured = f"{rate * 8 / 1000:.0f} kbit/s" if rate else "unmeasured"
+        return f"Quality {self.mode}: {self.choose().label} ({measured})"
+
+
+format_policy = FormatPolicy()
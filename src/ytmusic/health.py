@@ -0,0 +1,249 @@
+"""Availability checks for saved tracks, with cached verdicts."""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .config import (
+    HEALTH_CONCURRENCY,
+    HEALTH_FILE,
+    HEALTH_TTL,
+    YOUTUBE_HOST,
+    YTDLP_BINARY,
+)
+from .models import Track
+from .scheduler import CancelToken, JobCancelled, Priority, run_process, scheduler
+from .storage import write_json_atomic
+
+# Starts of yt-dlp error messages that mean the video is gone for good. Others,
+# like "Requested format is not available" or a region block, say nothing
+# about the video itself.
+_DEAD = re.compile(
+    r"(?!.*\bin your country\b)(?:private video|video unavailable"
+    r"|this video (?:is private|is unavailable|is not available"
+    r"|is no longer available|has been removed))\b",
+    re.I,
+)
+_ERROR_PREFIX = re.compile(r"^ERROR:\s*(?:\[[^\]]*\]\s*)?(?:[\w-]{11}:\s*)?")
+
+
+@dataclass(slots=True)
+class Verdict:
+    """Outcome of one probe; ``reason`` is yt-dlp's message when dead."""
+
+    ok: bool
+    reason: str = ""
+    at: float = 0.0
+
+
+def classify(code: int, stderr: bytes) -> Optional[Verdict]:
+    """Verdict for a probe's exit, or None if the failure may be transient."""
+    if code == 0:
+        return Verdict(True, at=time.time())
+    for line in stderr.decode(errors="replace").splitlines():
+        if not line.startswith("ERROR"):
+            continue
+        message = _ERROR_PREFIX.sub("", line).strip()
+        if _DEAD.match(message):
+            return Verdict(False, message, time.time())
+    return None
+
+
+@dataclass
+class HealthProgress:
+    """Counters for one health check."""
+
+    total: int = 0
+    cached: int = 0
+    alive: int = 0
+    dead: int = 0
+    unknown: int = 0
+    began: float = 0.0
+
+    @property
+    def finished(self) -> int:
+        return self.cached + self.alive + self.dead + self.unknown
+
+    @property
+    def rate(self) -> float:
+        """Probes per second, cached verdicts excluded."""
+        elapsed = time.monotonic() - self.began
+        probed = self.alive + self.dead + self.unknown
+        return probed / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.finished}/{self.total} checked"
+            + (f", {self.dead} dead" if self.dead else "")
+            + (f", {self.unknown} unknown" if self.unknown else "")
+            + (f", {self.cached} cached" if self.cached else "")
+        )
+
+
+class HealthChecker:
+    """Finds saved tracks that went private or were deleted.
+
+    Each track is probed with yt-dlp, without resolving a stream, as a
+    background job on the shared scheduler, so probes are paced per host
+    and never hold up playback; at most ``concurrency`` are queued or
+    running at once. Verdicts are kept in ``HEALTH_FILE`` and trusted for
+    ``HEALTH_TTL`` seconds. Failures that look transient (network errors,
+    rate limiting) leave no verdict and are retried on the next check.
+    """
+
+    def __init__(
+        self,
+        path: Path = HEALTH_FILE,
+        ttl: float = HEALTH_TTL,
+        concurrency: int = HEALTH_CONCURRENCY,
+    ):
+        self._path = path
+        self.ttl = ttl
+        self.concurrency = max(1, concurrency)
+        self._lock = threading.Lock()
+        self._verdicts: dict[str, Verdict] = {}
+        self.on_verdict: Optional[Callable[[str, Verdict], None]] = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for vid, v in json.load(f).items():
+                    self._verdicts[vid] = Verdict(bool(v["ok"]), v["reason"], v["at"])
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            pass
+
+    def verdict(self, video_id: str) -> Optional[Verdict]:
+        """The cached verdict, if it has not expired."""
+        v = self._verdicts.get(video_id)
+        if v is None or time.time() - v.at > self.ttl:
+            return None
+        return v
+
+    def is_dead(self, video_id: str) -> bool:
+        v = self.verdict(video_id)
+        return v is not None and not v.ok
+
+    def _probe_cmd(self, track: Track) -> list[str]:
+        return [
+            YTDLP_BINARY,
+            "--simulate",
+            "--no-playlist",
+            "--no-warnings",
+            "--print",
+            "id",
+            track.url,
+        ]
+
+    def probe(
+        self,
+        track: Track,
+        priority: Priority = Priority.BACKGROUND,
+        token: Optional[CancelToken] = None,
+    ) -> Future:
+        """Probe one track now, ignoring the cache; the Future is the verdict."""
+
+        def job(t: CancelToken) -> Optional[Verdict]:
+            code, _, stderr = run_process(self._probe_cmd(track), t)
+            verdict = classify(code, stderr)
+            if verdict is not None:
+                self._record(track.video_id, verdict)
+            return verdict
+
+        return scheduler.submit(
+            job,
+            priority,
+            key=f"probe:{track.video_id}",
+            host=YOUTUBE_HOST,
+            token=token,
+        )
+
+    def _record(self, video_id: str, verdict: Verdict) -> None:
+        with self._lock:
+            self._verdicts[video_id] = verdict
+        if self.on_verdict:
+            self.on_verdict(video_id, verdict)
+
+    def check(
+        self,
+        tracks: Iterable[Track],
+        on_progress: Optional[Callable[[HealthProgress], None]] = None,
+        token: Optional[CancelToken] = None,
+        force: bool = False,
+    ) -> HealthProgress:
+        """Probe every track without a fresh verdict, then save. Blocking."""
+        token = token or CancelToken()
+        unique = list({t.video_id: t for t in tracks}.values())
+        progress = HealthProgress(total=len(unique), began=time.monotonic())
+        slots = threading.Semaphore(self.concurrency)
+        lock = threading.Lock()
+        futures = []
+
+        def done(future: Future) -> None:
+            slots.release()
+            try:
+                verdict = future.result()
+            except JobCancelled:
+                return
+            except Exception:
+                verdict = None
+            with lock:
+                if verdict is None:
+                    progress.unknown += 1
+                elif verdict.ok:
+                    progress.alive += 1
+                else:
+                    progress.dead += 1
+            if on_progress:
+                on_progress(progress)
+
+        try:
+            for track in unique:
+                if not force and self.verdict(track.video_id) is not None:
+                    progress.cached += 1
+                    continue
+                while not slots.acquire(timeout=0.5):
+                    if token.cancelled:
+                        break
+                if token.cancelled:
+                    break
+                future = self.probe(track, token=token)
+                future.add_done_callback(done)
+                futures.append(future)
+            if on_progress:
+                on_progress(progress)
+            for future in futures:
+                try:
+                    future.exception()
+                except Exception:
+                    pass
+        finally:
+            if futures:
+                self.save()
+        return progress
+
+    def suspect(self, track: Track) -> None:
+        """Re-probe a track whose playback ended at once; saved when known."""
+        if self.is_dead(track.video_id):
+            return
+        self.probe(track).add_done_callback(lambda f: self.save())
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                vid: {"ok": v.ok, "reason": v.reason, "at": v.at}
+                for vid, v in self._verdicts.items()
+            }
+        try:
+            write_json_atomic(self._path, data)
+        except OSError:
+            pass
+
+    def summary(self) -> str:
+        now = time.time()
+        with self._lock:
+            fresh = [v for v in self._verdicts.values() if now - v.at <= self.ttl]
+        dead = sum(not v.ok for v in fresh)
+        return f"Health: {len(fresh)} tracks checked, {dead} unavailable"
@@ -0,0 +1,218 @@
+"""Append-only play history with in-memory aggregates."""
+
+import heapq
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .config import (
+    HISTORY_COMPACT_EVENTS,
+    HISTORY_FILE,
+    HISTORY_INDEX_FILE,
+    HISTORY_RECENT_LIMIT,
+    HISTORY_TOP_LIMIT,
+)
+from .models import Playlist, Track, intern_track
+from .storage import write_json_atomic
+
+TOP_MONTH_ID = "__history_top_month__"
+TOP_ALL_ID = "__history_top_all__"
+RECENT_ID = "__history_recent__"
+
+
+def _month(ts: float) -> str:
+    return time.strftime("%Y-%m", time.localtime(ts))
+
+
+class PlayHistory:
+    """Play events appended to a log, folded into a compact index.
+
+    Every event is appended to ``HISTORY_FILE`` exactly once. Counts per
+    track, per month and the recently-played order live in memory, so
+    queries never touch the log. Once the log holds
+    ``HISTORY_COMPACT_EVENTS`` events the aggregates are written to
+    ``HISTORY_INDEX_FILE`` and the log is truncated; events carry a sequence
+    number so a crash between the two steps cannot count anything twice.
+    """
+
+    def __init__(
+        self,
+        log_file: Path = HISTORY_FILE,
+        index_file: Path = HISTORY_INDEX_FILE,
+    ):
+        self._log_file = log_file
+        self._index_file = index_file
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._log_events = 0
+        self._titles: dict[str, str] = {}
+        self._plays: Counter[str] = Counter()
+        self._finishes: Counter[str] = Counter()
+        self._monthly: dict[str, Counter[str]] = {}
+        self._recent: OrderedDict[str, float] = OrderedDict()
+        self._log = None
+        self._load()
+
+    # ── Loading ──────────────────────────────────
+
+    def _load(self) -> None:
+        if self._index_file.exists():
+            try:
+                with open(self._index_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._seq = data.get("seq", 0)
+                self._titles = data.get("titles", {})
+                self._plays = Counter(data.get("plays", {}))
+                self._finishes = Counter(data.get("finishes", {}))
+                self._monthly = {
+                    m: Counter(c) for m, c in data.get("monthly", {}).items()
+                }
+                self._recent = OrderedDict(data.get("recent", []))
+            except (OSError, ValueError):
+                pass
+        if self._log_file.exists():
+            with open(self._log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._log_events += 1
+                    if ev.get("seq", 0) > self._seq:
+                        self._seq = ev["seq"]
+                        self._apply(ev)
+
+    def _apply(self, ev: dict) -> None:
+        vid = ev["id"]
+        title = ev.get("title")
+        if title and title != vid:
+            self._titles[vid] = title
+        if ev["ev"] == "play":
+            self._plays[vid] += 1
+            self._monthly.setdefault(_month(ev["t"]), Counter())[vid] += 1
+            self._recent[vid] = ev["t"]
+            self._recent.move_to_end(vid)
+            while len(self._recent) > HISTORY_RECENT_LIMIT:
+                self._recent.popitem(last=False)
+        elif ev["ev"] == "finish":
+            self._finishes[vid] += 1
+
+    # ── Recording ────────────────────────────────
+
+    def record_play(self, track: Track) -> None:
+        """Record that a track started playing."""
+        self._record("play", track)
+
+    def record_finish(self, track: Track) -> None:
+        """Record that a track played to the end."""
+        self._record("finish", track)
+
+    def _record(self, kind: str, track: Track) -> None:
+        with self._lock:
+            self._seq += 1
+            ev = {
+                "seq": self._seq,
+                "t": time.time(),
+                "ev": kind,
+                "id": track.video_id,
+            }
+            # A bare id is not a title; keep whatever title is known.
+            if track.title != track.video_id:
+                ev["title"] = track.title
+            self._apply(ev)
+            try:
+                if self._log is None:
+                    self._log_file.parent.mkdir(parents=True, exist_ok=True)
+                    self._log = open(self._log_file, "a", encoding="utf-8")
+                self._log.write(json.dumps(ev, ensure_ascii=False) + "\n")
+                self._log.flush()
+            except OSError:
+                return
+            self._log_events += 1
+            if self._log_events >= HISTORY_COMPACT_EVENTS:
+                self._compact()
+
+    def _compact(self) -> None:
+        write_json_atomic(
+            self._index_file,
+            {
+                "seq": self._seq,
+                "titles": self._titles,
+                "plays": self._plays,
+                "finishes": self._finishes,
+                "monthly": self._monthly,
+                "recent": list(self._recent.items()),
+            },
+        )
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self._log_file, "w", encoding="utf-8")
+        self._log_events = 0
+
+    def compact(self) -> None:
+        """Fold the log into the index now."""
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # ── Queries ──────────────────────────────────
+
+    def _tracks(self, ids) -> list[Track]:
+        return [intern_track(self._titles.get(v, v), v) for v in ids]
+
+    def most_played(
+        self, limit: int = HISTORY_TOP_LIMIT, month: Optional[str] = None
+    ) -> list[Track]:
+        """Most played tracks overall, or in a ``YYYY-MM`` month."""
+        with self._lock:
+            counts = self._plays if month is None else self._monthly.get(month, {})
+            top = heapq.nlargest(limit, counts.items(), key=lambda kv: kv[1])
+            return self._tracks(v for v, _ in top)
+
+    def recently_played(self, limit: int = HISTORY_TOP_LIMIT) -> list[Track]:
+        """Distinct tracks, most recently played first."""
+        with self._lock:
+            ids = []
+            for vid in reversed(self._recent):
+                if len(ids) >= limit:
+                    break
+                ids.append(vid)
+            return self._tracks(ids)
+
+    def title(self, video_id: str) -> str:
+        """Last title recorded for video_id, or "" if none is known."""
+        return self._titles.get(video_id, "")
+
+    def play_count(self, video_id: str) -> int:
+        return self._plays.get(video_id, 0)
+
+    def virtual_playlists(self) -> list[Playlist]:
+        """History views as read-only playlists."""
+        return [
+            Playlist(
+                id=TOP_MONTH_ID,
+                name="Top this month",
+                tracks=self.most_played(month=_month(time.time())),
+                is_virtual=True,
+            ),
+            Playlist(
+                id=TOP_ALL_ID,
+                name="Most played",
+                tracks=self.most_played(),
+                is_virtual=True,
+            ),
+            Playlist(
+                id=RECENT_ID,
+                name="Recently played",
+                tracks=self.recently_played(),
+                is_virtual=True,
+            ),
+        ]
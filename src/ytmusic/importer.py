@@ -0,0 +1,363 @@
+"""Tracklists of "Artist - Title" lines matched to tracks in bulk."""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .config import (
+    IMPORT_ACCEPT,
+    IMPORT_BATCH,
+    IMPORT_CANDIDATES,
+    IMPORT_CONCURRENCY,
+    IMPORT_DIR,
+    IMPORT_MARGIN,
+)
+from .dedupe import VARIANTS, normalize_title
+from .models import Playlist, Track
+from .scheduler import CancelToken, JobCancelled, Priority, RateLimited
+from .search import parse_channel_output, submit_search
+from .storage import write_json_atomic
+
+_NUMBERING = re.compile(r"^\d{1,4}[.)]\s+")
+_DURATION = re.compile(r"\s*[(\[]?\b\d{1,2}:\d{2}(?::\d{2})?[)\]]?$")
+_SEPARATOR = re.compile(r"\s+[-–—]\s+|\t")
+_RATE_LIMIT_RETRIES = 3
+_VEVO = re.compile(r"vevo$", re.I)
+# A remaster is the same recording; tracklists rarely say which master.
+_SAME_RECORDING = frozenset({"remaster", "remastered"})
+
+
+def parse_line(line: str) -> Optional[tuple[str, str]]:
+    """Artist and title of a tracklist line; None for blanks and comments.
+
+    Leading track numbers and trailing durations are dropped. A line
+    without an " - " or tab separator is all title.
+    """
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    text = _DURATION.sub("", _NUMBERING.sub("", text)).strip()
+    parts = [p.strip() for p in _SEPARATOR.split(text, maxsplit=1)]
+    if len(parts) == 2 and all(parts):
+        return parts[0], parts[1]
+    return "", text
+
+
+def _words(text: str) -> tuple[Counter, frozenset]:
+    words, variants = normalize_title(text)
+    found = Counter(words.split())
+    return found, (variants | (found.keys() & VARIANTS)) - _SAME_RECORDING
+
+
+def score(artist: str, title: str, track: Track, channel: str = "") -> float:
+    """How well a search result matches a tracklist line, from 0 to 1.
+
+    Mostly the share of the line's title words found in the result's
+    title and of its artist words among the rest or in the uploading
+    ``channel`` ("Artist - Topic" and artist channels leave the artist out
+    of the title), less a little for words the line does not have; a
+    result that is another recording (live, remix, karaoke) than the line
+    asks for loses 40%. Without a channel, a result whose title is exactly
+    the song's is not held to name the artist.
+    """
+    title_words, wanted = _words(title)
+    if not title_words:
+        return 0.0
+    artist_words, artist_variants = _words(artist) if artist else (Counter(), wanted)
+    found, variants = _words(track.title)
+    rest = found - title_words
+    title_cov = (title_words & found).total() / title_words.total()
+    if artist:
+        artist_cov = (artist_words & rest).total() / artist_words.total()
+        if channel:
+            by, _ = _words(_VEVO.sub("", channel.strip()))
+            artist_cov = max(
+                artist_cov, (artist_words & by).total() / artist_words.total()
+            )
+        elif title_cov == 1 and not rest:
+            artist_cov = 1.0
+    else:
+        artist_cov = title_cov
+    extra = (rest - artist_words).total() / found.total() if found else 1.0
+    s = 0.55 * title_cov + 0.35 * artist_cov + 0.1 * (1 - extra)
+    if variants != wanted | artist_variants:
+        s *= 0.6
+    return s
+
+
+def rank(
+    artist: str, title: str, results: list[tuple[Track, str]]
+) -> list[tuple[Track, float]]:
+    """(track, channel) results by score; ties keep the search order."""
+    scored = [(t, score(artist, title, t, channel)) for t, channel in results]
+    return sorted(scored, key=lambda p: -p[1])
+
+
+def pick(
+    ranked: list[tuple[Track, float]], artist: str = ""
+) -> tuple[Optional[Track], str]:
+    """The match to take, or None and why the line needs a look."""
+    if not ranked:
+        return None, "no results"
+    best, top = ranked[0]
+    if top < IMPORT_ACCEPT:
+        return None, "weak match"
+    # With or without the artist in the title, it is the same song.
+    by = _words(artist)[0] if artist else Counter()
+
+    def song(track: Track) -> tuple[Counter, frozenset]:
+        words, variants = _words(track.title)
+        return words - by, variants
+
+    first = song(best)
+    for other, s in ranked[1:]:
+        if top - s >= IMPORT_MARGIN:
+            break
+        if song(other) != first:
+            return None, "ambiguous"
+    return best, ""
+
+
+def state_path(source: Path, playlist_id: str) -> Path:
+    """Where the checkpoint of importing source into a playlist lives."""
+    key = f"{source.resolve()}\0{playlist_id}".encode()
+    return IMPORT_DIR / f"{hashlib.sha1(key).hexdigest()[:16]}.json"
+
+
+@dataclass(slots=True)
+class LineResult:
+    """Outcome for one line: matched, review, failed or skipped."""
+
+    number: int
+    line: str
+    status: str
+    track: Optional[Track] = None
+    reason: str = ""
+    candidates: list[tuple[Track, float]] = field(default_factory=list)
+
+
+@dataclass
+class ImportProgress:
+    """Counters for one import run."""
+
+    lines: int = 0
+    matched: int = 0
+    review: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    resumed: int = 0
+    began: float = 0.0
+
+    @property
+    def finished(self) -> int:
+        return self.matched + self.review + self.failed + self.skipped
+
+    @property
+    def per_minute(self) -> float:
+        elapsed = time.monotonic() - self.began
+        return self.finished / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.finished} lines, {self.matched} matched, "
+            f"{self.review} to review"
+            + (f", {self.failed} failed" if self.failed else "")
+            + f", {self.per_minute:.0f} lines/min"
+        )
+
+
+class TracklistImporter:
+    """Matches a tracklist to tracks and appends them to a playlist.
+
+    Lines are read as a stream. Each is searched as a background job on
+    the shared scheduler, at most ``concurrency`` at a time, and the best
+    result is taken when it scores ``IMPORT_ACCEPT`` with no different
+    song close behind. Every ``batch`` lines, results are written in input
+    order: matches not already in the playlist are appended and ``save``
+    is called, doubtful lines go to ``review_path`` with their best
+    candidates, then a checkpoint at ``state`` records the next line, so
+    running the same import again resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        playlist: Playlist,
+        save: Callable[[], None],
+        review_path: Path,
+        state: Optional[Path] = None,
+        concurrency: int = IMPORT_CONCURRENCY,
+        batch: int = IMPORT_BATCH,
+    ):
+        self.playlist = playlist
+        self.save = save
+        self.review_path = review_path
+        self.state = state
+        self.concurrency = max(1, concurrency)
+        self.batch = max(1, batch)
+        self._done: dict[int, LineResult] = {}
+        self._lock = threading.Lock()
+        self._buffer: list[LineResult] = []
+        self._next = 1
+        self._present: set[str] = set()
+        self._reviewed: set[int] = set()
+
+    def _load_state(self) -> int:
+        if self.state is None:
+            return 1
+        try:
+            with open(self.state, "r", encoding="utf-8") as f:
+                return int(json.load(f)["next_line"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 1
+
+    def _load_reviewed(self) -> set[int]:
+        """Lines already in the review file, from a run cut short."""
+        try:
+            with open(self.review_path, "r", encoding="utf-8") as f:
+                return {int(line.split("\t", 1)[0]) for line in f if line[:1].isdigit()}
+        except (OSError, ValueError):
+            return set()
+
+    def run(
+        self,
+        lines: Iterable[str],
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+        token: Optional[CancelToken] = None,
+    ) -> ImportProgress:
+        """Import every line after the checkpoint. Blocking."""
+        token = token or CancelToken()
+        self._next = start = self._load_state()
+        self._present = {t.video_id for t in self.playlist.tracks}
+        self._reviewed = self._load_reviewed()
+        progress = ImportProgress(resumed=start - 1, began=time.monotonic())
+        slots = threading.Semaphore(self.concurrency)
+
+        def search(number: int, line: str, artist: str, title: str, tries: int):
+            query = f"{artist} - {title}" if artist else title
+            future = submit_search(
+                query, IMPORT_CANDIDATES, Priority.BACKGROUND, token, channels=True
+            )
+            future.add_done_callback(
+                partial(searched, number, line, artist, title, tries)
+            )
+
+        def searched(number, line, artist, title, tries: int, f: Future):
+            try:
+                code, stdout, _ = f.result()
+            except JobCancelled:
+                slots.release()
+                return
+            except RateLimited:
+                if tries < _RATE_LIMIT_RETRIES and not token.cancelled:
+                    # The scheduler is backing the host off; wait our turn.
+                    search(number, line, artist, title, tries + 1)
+                    return
+                code, stdout = 1, b""
+            except Exception:
+                code, stdout = 1, b""
+            if code != 0:
+                result = LineResult(number, line, "failed", reason="search failed")
+            else:
+                ranked = rank(artist, title, parse_channel_output(stdout.decode()))
+                track, reason = pick(ranked, artist)
+                status = "matched" if track is not None else "review"
+                result = LineResult(number, line, status, track, reason, ranked[:3])
+            with self._lock:
+                self._done[number] = result
+            slots.release()
+
+        try:
+            for number, line in enumerate(lines, 1):
+                if number < start:
+                    continue
+                line = line.rstrip("\r\n")
+                progress.lines += 1
+                parsed = parse_line(line)
+                if parsed is None:
+                    with self._lock:
+                        self._done[number] = LineResult(number, line, "skipped")
+                else:
+                    while not slots.acquire(timeout=0.5):
+                        if token.cancelled:
+                            break
+                    if token.cancelled:
+                        break
+                    search(number, line, *parsed, 0)
+                self._collect(progress, on_progress)
+            # Let the searches still in flight finish.
+            idle = 0
+            while idle < self.concurrency and not token.cancelled:
+                if slots.acquire(timeout=0.5):
+                    idle += 1
+                self._collect(progress, on_progress)
+        finally:
+            self._collect(progress, on_progress, flush=True)
+        return progress
+
+    def _collect(
+        self,
+        progress: ImportProgress,
+        on_progress: Optional[Callable[[ImportProgress], None]],
+        flush: bool = False,
+    ) -> None:
+        """Move finished lines, in order, to the buffer; write a full batch."""
+        moved = False
+        with self._lock:
+            while self._next in self._done:
+                result = self._done.pop(self._next)
+                self._next += 1
+                self._buffer.append(result)
+                moved = True
+                if result.status == "matched":
+                    progress.matched += 1
+                elif result.status == "review":
+                    progress.review += 1
+                elif result.status == "failed":
+                    progress.failed += 1
+                else:
+                    progress.skipped += 1
+        if self._buffer and (flush or len(self._buffer) >= self.batch):
+            self._flush(progress)
+        if moved and on_progress:
+            on_progress(progress)
+
+    def _flush(self, progress: ImportProgress) -> None:
+        added = False
+        review = []
+        for r in self._buffer:
+            if r.status == "matched":
+                if r.track.video_id in self._present:
+                    progress.duplicates += 1
+                    continue
+                self.playlist.tracks.append(r.track)
+                self._present.add(r.track.video_id)
+                added = True
+            elif r.status in ("review", "failed") and r.number not in self._reviewed:
+                candidates = " | ".join(
+                    f"{t.video_id} {s:.2f} {t.title}" for t, s in r.candidates
+                )
+                review.append(f"{r.number}\t{r.line}\t{r.reason}\t{candidates}\n")
+        if added:
+            self.save()
+        if review:
+            new = not self.review_path.exists()
+            self.review_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.review_path, "a", encoding="utf-8") as f:
+                if new:
+                    f.write("# line\ttext\treason\tcandidates (id score title)\n")
+                f.writelines(review)
+        if self.state is not None:
+            write_json_atomic(
+                self.state,
+                {"playlist": self.playlist.id, "next_line": self._next},
+            )
+        self._buffer.clear()
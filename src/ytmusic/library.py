@@ -0,0 +1,172 @@
+"""Local full-text index over saved and previously seen tracks."""
+
+import heapq
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import LIBRARY_FILE, LIBRARY_MAX_RESULTS
+from .filter import normalize
+from .models import Track, intern_track
+
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text)
+
+
+def _trigrams(word: str) -> set[str]:
+    return {word[i : i + 3] for i in range(len(word) - 2)}
+
+
+class LibraryIndex:
+    """Token and trigram index of every track title ever seen.
+
+    Documents are appended to ``LIBRARY_FILE`` as JSON lines the first time
+    a track is seen (or when its title changes) and folded into in-memory
+    postings, so adding tracks never rebuilds the index. Words map to the
+    documents containing them; trigrams map to words of the vocabulary, so
+    a substring lookup only scans words, never titles.
+
+    A query matches a title when every query word is a word of it or a
+    substring of one. Titles where every query word matched whole rank
+    first; ties go to the track seen first, which puts saved playlists
+    ahead of old search results. If nothing matches, a query word also
+    matches vocabulary words sharing most of its trigrams, which absorbs
+    small typos.
+    """
+
+    def __init__(self, path: Path = LIBRARY_FILE):
+        self._path = path
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] = {}
+        self._tracks: list[Track] = []
+        self._doc_words: list[tuple[str, ...]] = []
+        self._words: dict[str, set[int]] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._log = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        title, vid = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._index(intern_track(title, vid))
+        except OSError:
+            pass
+
+    def _index(self, track: Track) -> bool:
+        doc = self._ids.get(track.video_id)
+        if doc is not None:
+            if track.title in (self._tracks[doc].title, track.video_id):
+                return False
+            for word in self._doc_words[doc]:
+                self._words[word].discard(doc)
+            self._tracks[doc] = track
+        else:
+            doc = self._ids[track.video_id] = len(self._tracks)
+            self._tracks.append(track)
+            self._doc_words.append(())
+        words = tuple(dict.fromkeys(_words(normalize(track.title))))
+        self._doc_words[doc] = words
+        for word in words:
+            docs = self._words.get(word)
+            if docs is None:
+                docs = self._words[word] = set()
+                for gram in _trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            docs.add(doc)
+        return True
+
+    def add(self, tracks: Iterable[Track]) -> int:
+        """Index tracks not seen before; returns how many were new."""
+        with self._lock:
+            added = [t for t in tracks if self._index(t)]
+            if not added:
+                return 0
+            try:
+                if self._log is None:
+                    self._path.parent.mkdir(parents=True, exist_ok=True)
+                    self._log = open(self._path, "a", encoding="utf-8")
+                for t in added:
+                    self._log.write(
+                        json.dumps([t.title, t.video_id], ensure_ascii=False) + "\n"
+                    )
+                self._log.flush()
+            except OSError:
+                pass
+            return len(added)
+
+    def get(self, video_id: str) -> Optional[Track]:
+        """The indexed track for video_id, if it has been seen."""
+        with self._lock:
+            doc = self._ids.get(video_id)
+            return None if doc is None else self._tracks[doc]
+
+    def search(self, query: str, limit: int = LIBRARY_MAX_RESULTS) -> list[Track]:
+        """Best local matches for query, best first."""
+        words = list(dict.fromkeys(_words(normalize(query))))
+        if not words:
+            return []
+        with self._lock:
+            ranked = self._rank(words, self._substrings, limit)
+            if not ranked:
+                ranked = self._rank(words, self._similar, limit)
+            return [self._tracks[d] for d in ranked]
+
+    def _rank(self, words: list[str], expand, limit: int) -> list[int]:
+        whole = [self._words.get(w, set()) for w in words]
+        exact = set.intersection(*sorted(whole, key=len))
+        ranked = heapq.nsmallest(limit, exact)
+        if len(ranked) == limit:
+            return ranked
+        matched = None
+        for w, docs in sorted(zip(words, whole), key=lambda p: len(p[1])):
+            extra = expand(w)
+            if extra:
+                docs = docs.union(*(self._words[x] for x in extra))
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return ranked
+        return ranked + heapq.nsmallest(limit - len(ranked), matched - exact)
+
+    def _candidates(self, word: str) -> list[set[str]]:
+        return sorted((self._grams.get(g, set()) for g in _trigrams(word)), key=len)
+
+    def _substrings(self, word: str) -> list[str]:
+        """Vocabulary words that contain word, other than word itself."""
+        if len(word) < 3:
+            return [w for w in self._words if w != word and w.startswith(word)]
+        grams = self._candidates(word)
+        if not grams or not grams[0]:
+            return []
+        return [w for w in set.intersection(*grams) if w != word and word in w]
+
+    def _similar(self, word: str) -> list[str]:
+        """Vocabulary words sharing most of word's trigrams."""
+        grams = _trigrams(word)
+        if not grams:
+            return []
+        shared: Counter[str] = Counter()
+        for g in grams:
+            shared.update(self._grams.get(g, ()))
+        need = max(1, int(len(grams) * 0.6))
+        return [w for w, n in shared.items() if n >= need]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
@@ -0,0 +1,289 @@
+"""Integrated loudness analysis and per-track volume normalization."""
+
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it tracks play unadjusted.
+    np = None
+
+from .config import (
+    LOUDNESS_DECODER,
+    LOUDNESS_DIR,
+    LOUDNESS_FILE,
+    LOUDNESS_MAX_GAIN,
+    LOUDNESS_TARGET,
+    LOUDNESS_WORKERS,
+    MPV_VOLUME,
+    OFFLINE_DIR,
+)
+from .storage import write_json_atomic
+
+DECODE_RATE = 48000
+SUB_BLOCK = 0.1  # seconds; gating blocks are four of these (400 ms, 75% overlap)
+BATCH_BLOCKS = 600  # sub-blocks per FFT batch, one minute of audio
+
+
+# ── Measurement ──────────────────────────────────
+
+
+def _biquad_power(b, a, w):
+    z = np.exp(-1j * w)
+    num = b[0] + b[1] * z + b[2] * z * z
+    den = a[0] + a[1] * z + a[2] * z * z
+    return np.abs(num / den) ** 2
+
+
+def k_weighting_power(freqs, fs: int):
+    """|H(f)|^2 of the BS.1770 K-weighting (shelf plus high-pass) at fs."""
+    w = 2 * np.pi * freqs / fs
+    # Stage 1: high shelf modelling the head.
+    k = np.tan(np.pi * 1681.974450955533 / fs)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = _biquad_power(
+        (
+            (vh + vb * k / q + k * k) / a0,
+            2 * (k * k - vh) / a0,
+            (vh - vb * k / q + k * k) / a0,
+        ),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+        w,
+    )
+    # Stage 2: RLB high-pass.
+    k = np.tan(np.pi * 38.13547087602444 / fs)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highpass = _biquad_power(
+        (1.0, -2.0, 1.0), (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0), w
+    )
+    return shelf * highpass
+
+
+def integrated_loudness(samples, fs: int) -> float:
+    """Gated integrated loudness in LUFS of (frames, channels) samples.
+
+    K-weighting is applied in the frequency domain: each 100 ms sub-block
+    is transformed in one batched real FFT, its spectrum weighted by the
+    filter's power response and summed (Parseval) into a mean square.
+    That treats each sub-block as periodic, a close approximation of the
+    time-domain filter at these block lengths. Gating follows BS.1770-4:
+    400 ms blocks, an absolute gate at -70 LUFS and a relative one 10 LU
+    below the ungated mean. Returns -inf for silence.
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    n = int(fs * SUB_BLOCK)
+    count = len(samples) // n
+    if count < 4:
+        return float("-inf")
+    weights = k_weighting_power(np.fft.rfftfreq(n, 1 / fs), fs)
+    # Parseval for a real FFT: interior bins count twice.
+    weights[1 : (n + 1) // 2] *= 2
+    weights /= n * n
+    energy = np.zeros(count)
+    for ch in range(samples.shape[1]):
+        blocks = samples[: count * n, ch].reshape(count, n)
+        for start in range(0, count, BATCH_BLOCKS):
+            spec = np.fft.rfft(blocks[start : start + BATCH_BLOCKS], axis=1)
+            power = spec.real**2 + spec.imag**2
+            energy[start : start + BATCH_BLOCKS] += power @ weights
+    # 400 ms gating blocks every 100 ms: mean of four consecutive sub-blocks.
+    z = np.convolve(energy, np.full(4, 0.25), mode="valid")
+    with np.errstate(divide="ignore"):
+        loud = -0.691 + 10 * np.log10(z)
+    z = z[loud > -70]
+    if not len(z):
+        return float("-inf")
+    relative = -0.691 + 10 * np.log10(z.mean()) - 10
+    with np.errstate(divide="ignore"):
+        z = z[-0.691 + 10 * np.log10(z) > relative]
+    return float(-0.691 + 10 * np.log10(z.mean()))
+
+
+def decode(path: Path):
+    """Read audio as float32 (frames, channels) and its sample rate."""
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as w:
+            width, channels, fs = w.getsampwidth(), w.getnchannels(), w.getframerate()
+            raw = w.readframes(w.getnframes())
+        if width == 3:
+            b = np.frombuffer(raw, np.uint8).reshape(-1, 3)
+            ints = (
+                b[:, 0].astype(np.int32) << 8
+                | b[:, 1].astype(np.int32) << 16
+                | b[:, 2].astype(np.int32) << 24
+            ) >> 8
+            data = ints.astype(np.float32) / 2**23
+        elif width == 1:
+            data = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+        else:
+            dtype = {2: np.int16, 4: np.int32}[width]
+            data = np.frombuffer(raw, dtype).astype(np.float32) / 2 ** (8 * width - 1)
+        return data.reshape(-1, channels), fs
+    out = subprocess.run(
+        [
+            LOUDNESS_DECODER,
+            "-nostdin",
+            "-v",
+            "error",
+            "-i",
+            str(path),
+            "-f",
+            "f32le",
+            "-ac",
+            "2",
+            "-ar",
+            str(DECODE_RATE),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    return np.frombuffer(out, np.float32).reshape(-1, 2), DECODE_RATE
+
+
+def analyze_file(path: str) -> float:
+    """Integrated loudness of an audio file; runs in a worker process."""
+    samples, fs = decode(Path(path))
+    return integrated_loudness(samples, fs)
+
+
+def _worker_init() -> None:
+    os.nice(10)
+
+
+# ── Store ────────────────────────────────────────
+
+
+class LoudnessStore:
+    """Per-track loudness, measured in background processes.
+
+    Results are kept by video_id in ``LOUDNESS_FILE`` and turned into an
+    mpv volume that brings the track to ``LOUDNESS_TARGET`` LUFS, limited
+    to ``LOUDNESS_MAX_GAIN`` dB either way. Audio comes from offline copies
+    or from a stream recorded while it plays; analysis runs in a pool of
+    ``LOUDNESS_WORKERS`` spawned processes at low CPU priority, never on
+    the caller's thread.
+    """
+
+    def __init__(self, path: Path = LOUDNESS_FILE, workers: int = LOUDNESS_WORKERS):
+        self._path = path
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._lufs: dict[str, float] = {}
+        self._pending: set[str] = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.on_measured: Optional[Callable[[str], None]] = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._lufs = {k: float(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    @property
+    def available(self) -> bool:
+        return np is not None and self._workers > 0
+
+    def gain_db(self, video_id: str) -> float:
+        lufs = self._lufs.get(video_id)
+        if lufs is None or lufs == float("-inf"):
+            return 0.0
+        gain = LOUDNESS_TARGET - lufs
+        return max(-LOUDNESS_MAX_GAIN, min(LOUDNESS_MAX_GAIN, gain))
+
+    def volume(self, video_id: str, base: float = MPV_VOLUME) -> float:
+        """mpv volume for the track; mpv's volume scale is cubic."""
+        return min(130.0, base * 10 ** (self.gain_db(video_id) / 60))
+
+    def wants(self, video_id: str) -> bool:
+        with self._lock:
+            return (
+                self.available
+                and video_id not in self._lufs
+                and video_id not in self._pending
+            )
+
+    def record_path(self, video_id: str) -> Optional[Path]:
+        """Where to record a stream for later analysis, if it is needed."""
+        if not self.wants(video_id) or shutil.which(LOUDNESS_DECODER) is None:
+            return None
+        LOUDNESS_DIR.mkdir(parents=True, exist_ok=True)
+        return LOUDNESS_DIR / f"{video_id}.rec"
+
+    def scan(self, directory: Path = OFFLINE_DIR) -> int:
+        """Queue every offline copy that has not been measured yet."""
+        queued = 0
+        try:
+            paths = [p for p in directory.iterdir() if p.suffix != ".part"]
+        except OSError:
+            return 0
+        decodable = shutil.which(LOUDNESS_DECODER) is not None
+        for p in paths:
+            if (decodable or p.suffix == ".wav") and self.wants(p.stem):
+                queued += self.submit(p.stem, p) is not None
+        return queued
+
+    def submit(
+        self, video_id: str, path: Path, delete: bool = False
+    ) -> Optional[Future]:
+        """Measure a file in the background; delete it afterwards if asked."""
+        with self._lock:
+            if not self.available or video_id in self._pending:
+                return None
+            self._pending.add(video_id)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                )
+            future = self._pool.submit(analyze_file, str(path))
+        future.add_done_callback(lambda f: self._done(video_id, path, delete, f))
+        return future
+
+    def _done(self, video_id: str, path: Path, delete: bool, future: Future) -> None:
+        if delete:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._pending.discard(video_id)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                if isinstance(future.exception(), BrokenProcessPool):
+                    # A worker died; start a fresh pool on the next submit.
+                    self._pool = None
+                return
+            self._lufs[video_id] = future.result()
+            data = dict(self._lufs)
+        try:
+            write_json_atomic(self._path, data)
+        except OSError:
+            pass
+        if self.on_measured:
+            self.on_measured(video_id)
+
+    def summary(self) -> str:
+        if not self.available:
+            return "Loudness: off (needs numpy)" if np is None else "Loudness: off"
+        with self._lock:
+            measured, pending = len(self._lufs), len(self._pending)
+        return f"Loudness: {measured} tracks measured, {pending} pending"
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,10 @@
+import sys
+import weakref
 from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Track:
     """Represents a YouTube track."""
 
@@ -14,7 +16,21 @@ class Track:
         return f"https://youtube.com/watch?v={self.video_id}"
 
 
-@dataclass
+# Process-wide track table: every playlist, the queue and search results
+# share one Track per video_id for as long as something references it.
+_tracks: "weakref.WeakValueDictionary[str, Track]" = weakref.WeakValueDictionary()
+
+
+def intern_track(title: str, video_id: str) -> Track:
+    """Return the shared Track for video_id, creating it if needed."""
+    track = _tracks.get(video_id)
+    if track is None:
+        track = Track(sys.intern(title), sys.intern(video_id))
+        _tracks[track.video_id] = track
+    return track
+
+
+@dataclass(slots=True)
 class Playlist:
     """Represents a playlist."""
 
@@ -22,3 +38,4 @@ class Playlist:
     name: str
     tracks: list[Track] = field(default_factory=list)
     is_default: bool = False
+    is_virtual: bool = False
@@ -0,0 +1,266 @@
+"""Offline copies of tracks: parallel, resumable, bandwidth-capped sync."""
+
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from .config import OFFLINE_DIR, SYNC_RATE_LIMIT, SYNC_WORKERS
+from .formats import format_policy
+from .models import Track
+from .scheduler import CancelToken, JobCancelled, Priority
+from .utils import format_time
+
+if TYPE_CHECKING:
+    from .resolver import StreamResolver
+
+CHUNK = 64 * 1024
+
+_EXTENSIONS = {"audio/webm": "webm", "audio/mp4": "m4a", "audio/mpeg": "mp3"}
+_ITAG = re.compile(r"[?&]itag=(\d+)")
+_TOTAL = re.compile(r"/\s*(\d+)\s*$")
+
+
+def local_path(video_id: str, directory: Path = OFFLINE_DIR) -> Optional[Path]:
+    """The finished offline copy of a track, if there is one."""
+    try:
+        for p in directory.glob(f"{video_id}.*"):
+            if p.suffix != ".part":
+                return p
+    except OSError:
+        pass
+    return None
+
+
+def _probe(url: str, content_range: str) -> tuple[Optional[int], str]:
+    """Total size and content type of a stream, from a HEAD request.
+
+    The size in a 416 response's ``Content-Range: */N`` is used when the
+    HEAD request does not give one.
+    """
+    m = _TOTAL.search(content_range)
+    total = int(m.group(1)) if m else None
+    ctype = ""
+    try:
+        req = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            ctype = resp.headers.get_content_type()
+            if total is None and resp.headers.get("Content-Length"):
+                total = int(resp.headers["Content-Length"])
+    except (OSError, ValueError):
+        pass
+    return total, ctype
+
+
+def parse_rate(text: str) -> int:
+    """Parse a rate like ``500K`` or ``1.5M`` into bytes per second."""
+    m = re.fullmatch(r"\s*([\d.]+)\s*([kKmMgG]?)[bB]?\s*", text)
+    if not m:
+        raise ValueError(f"invalid rate: {text!r}")
+    scale = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}[m.group(2).lower()]
+    return int(float(m.group(1)) * scale)
+
+
+class TokenBucket:
+    """Caps the combined rate of every caller; 0 means unlimited."""
+
+    def __init__(self, rate: int, burst: int = CHUNK * 4):
+        self.rate = rate
+        self._burst = max(burst, CHUNK)
+        self._tokens = float(self._burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+@dataclass
+class SyncProgress:
+    """Counters for one sync run."""
+
+    total: int = 0
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    sized: int = 0
+    bytes_done: int = 0
+    bytes_expected: int = 0
+    began: float = 0.0
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.skipped + self.failed
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.began
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """Seconds left, extrapolating the average size to unstarted tracks."""
+        if not self.sized or not self.rate:
+            return None
+        unsized = self.total - self.skipped - self.sized
+        avg = self.bytes_expected / self.sized
+        remaining = self.bytes_expected - self.bytes_done + avg * max(0, unsized)
+        return max(0.0, remaining / self.rate)
+
+    def summary(self) -> str:
+        eta = self.eta()
+        return (
+            f"{self.finished}/{self.total} tracks, "
+            f"{self.rate / 1024 / 1024:.1f} MB/s"
+            + (f", ETA {format_time(eta)}" if eta is not None else "")
+            + (f", {self.failed} failed" if self.failed else "")
+        )
+
+
+class OfflineSync:
+    """Downloads tracks to ``directory`` for playback without a network.
+
+    Tracks are fetched by ``workers`` threads sharing one token bucket of
+    ``rate_limit`` bytes per second. Stream URLs come from the resolver at
+    background priority. Downloads go to a ``.part`` file tagged with the
+    stream's itag and continue with an HTTP range request when the same
+    format is offered again. Tracks that already have a finished file are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        resolver: "StreamResolver",
+        directory: Path = OFFLINE_DIR,
+        workers: int = SYNC_WORKERS,
+        rate_limit: int = SYNC_RATE_LIMIT,
+    ):
+        self.resolver = resolver
+        self.directory = directory
+        self.workers = workers
+        self.bucket = TokenBucket(rate_limit)
+
+    def sync(
+        self,
+        tracks: Iterable[Track],
+        on_progress: Optional[Callable[[SyncProgress], None]] = None,
+        token: Optional[CancelToken] = None,
+    ) -> SyncProgress:
+        """Download every track that has no offline copy yet. Blocking."""
+        token = token or CancelToken()
+        unique = list({t.video_id: t for t in tracks}.values())
+        progress = SyncProgress(total=len(unique), began=time.monotonic())
+        lock = threading.Lock()
+        last_report = [0.0]
+
+        def report(force: bool = False) -> None:
+            if on_progress is None:
+                return
+            now = time.monotonic()
+            if force or now - last_report[0] >= 0.5:
+                last_report[0] = now
+                on_progress(progress)
+
+        def run(track: Track) -> None:
+            if token.cancelled:
+                return
+            if local_path(track.video_id, self.directory) is not None:
+                with lock:
+                    progress.skipped += 1
+                report(True)
+                return
+            try:
+                self._download(track, token, progress, lock, report)
+                ok = True
+            except JobCancelled:
+                return
+            except Exception:
+                ok = False
+            with lock:
+                if ok:
+                    progress.done += 1
+                else:
+                    progress.failed += 1
+            report(True)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(run, unique))
+        report(True)
+        if self.bucket.rate <= 0 and progress.bytes_done:
+            format_policy.throughput.record(
+                progress.bytes_done, time.monotonic() - progress.began
+            )
+        return progress
+
+    def _download(self, track, token, progress, lock, report) -> None:
+        url = self.resolver.resolve(track, Priority.BACKGROUND)
+        if not url:
+            raise OSError(f"could not resolve {track.video_id}")
+        m = _ITAG.search(url)
+        itag = m.group(1) if m else "0"
+        part = self.directory / f"{track.video_id}-{itag}.part"
+        for stale in self.directory.glob(f"{track.video_id}-*.part"):
+            if stale != part:
+                stale.unlink(missing_ok=True)
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            resp = urllib.request.urlopen(req, timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # The range starts past the end: a run may have written every
+            # byte and stopped before the rename.
+            total, ctype = _probe(url, e.headers.get("Content-Range", ""))
+            e.close()
+            if total != offset:
+                part.unlink(missing_ok=True)
+                return self._download(track, token, progress, lock, report)
+            self._finish(track, part, ctype)
+            return
+        with resp:
+            if offset and resp.status != 206:
+                offset = 0  # Range ignored; start over.
+            length = int(resp.headers.get("Content-Length") or 0)
+            ctype = resp.headers.get_content_type()
+            with lock:
+                progress.sized += 1
+                progress.bytes_expected += length
+            with open(part, "ab" if offset else "wb") as f:
+                while True:
+                    token.check()
+                    chunk = resp.read(CHUNK)
+                    if not chunk:
+                        break
+                    self.bucket.consume(len(chunk))
+                    f.write(chunk)
+                    with lock:
+                        progress.bytes_done += len(chunk)
+                    report()
+                f.flush()
+                os.fsync(f.fileno())
+        if length and part.stat().st_size < offset + length:
+            raise OSError("download truncated")
+        self._finish(track, part, ctype)
+
+    def _finish(self, track: Track, part: Path, ctype: str) -> None:
+        ext = _EXTENSIONS.get(ctype, "audio")
+        os.replace(part, self.directory / f"{track.video_id}.{ext}")
@@ -1,13 +1,20 @@
+import itertools
 import json
+import os
 import signal
 import socket
 import subprocess
 import threading
 import time
+import weakref
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Callable
 
 from .config import (
+    CROSSFADE_PRELOAD_SECS,
+    CROSSFADE_SECS,
+    MPV_BINARY,
     MPV_SOCKET,
     SOCKET_TIMEOUT,
     THREAD_POOL_WORKERS,
@@ -15,25 +22,126 @@ from .config import (
     MPV_NO_VIDEO,
     MPV_REALLY_QUIET,
     MPV_TERM_OSD,
+    PLAYER_POLL_INTERVAL,
+    PLAYER_TICK,
+    PLAYER_TICK_IPC_BUDGET,
 )
+from .buffering import BufferState, CacheTuner
+from .formats import format_policy
 from .models import Track
+from .offline import local_path
+from .resolver import StreamResolver
+
+if TYPE_CHECKING:
+    from .loudness import LoudnessStore
 
 
 _thread_pool = ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS)
+_socket_ids = itertools.count()
 
 
-class Player:
-    """Audio player using mpv with IPC control."""
+def _socket_path() -> str:
+    """A fresh IPC socket path, so several mpv instances can coexist."""
+    root, ext = os.path.splitext(MPV_SOCKET)
+    return f"{root}-{os.getpid()}-{next(_socket_ids)}{ext}"
+
+
+class _Preload:
+    __slots__ = ("track", "proc", "socket", "fading", "length", "faded")
+
+    def __init__(self, track: Track, proc: subprocess.Popen, socket_path: str):
+        self.track = track
+        self.proc = proc
+        self.socket = socket_path
+        self.fading = False
+        self.length = 0.0
+        self.faded = 0.0
+
+
+class _Poller:
+    """One thread that drives every player.
+
+    Each tick checks the players' mpv processes for exit and steps running
+    crossfades; every ``PLAYER_POLL_INTERVAL`` their properties are polled.
+    A player therefore adds an mpv process and no threads of its own. Ticks
+    never block: a player's IPC in one tick is cut off after
+    ``PLAYER_TICK_IPC_BUDGET``, and starting or ending a preload runs on
+    the thread pool, so one stuck mpv cannot stall the other zones.
+    """
 
     def __init__(self):
+        self._players: "weakref.WeakSet[Player]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, player: "Player") -> None:
+        with self._lock:
+            self._players.add(player)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                players = list(self._players)
+            now = time.monotonic()
+            for player in players:
+                try:
+                    player._tick(now)
+                except Exception:
+                    pass
+            time.sleep(PLAYER_TICK)
+
+
+_poller = _Poller()
+
+
+class Player:
+    """Audio player using mpv with IPC control.
+
+    With ``crossfade`` set, the track returned by ``peek_next`` is started
+    paused and muted in a second mpv instance ``CROSSFADE_PRELOAD_SECS``
+    before the fade, then faded in over the last ``crossfade`` seconds of
+    the current one. ``play`` adopts that instance instead of spawning a
+    new one, so the next track starts without any load time. At most one
+    instance is preloaded at a time.
+
+    With a ``loudness`` store, each track starts at the volume that
+    normalizes it, and streamed tracks it has not measured yet are recorded
+    while they play and handed to it for analysis once they finish.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[StreamResolver] = None,
+        audio_device: Optional[str] = None,
+        loudness: Optional["LoudnessStore"] = None,
+    ):
+        self.resolver: Optional[StreamResolver] = resolver
+        self.audio_device: Optional[str] = audio_device
+        self.loudness: Optional["LoudnessStore"] = loudness
+        self._records: dict[subprocess.Popen, tuple[str, Path]] = {}
         self._proc: Optional[subprocess.Popen] = None
+        self._socket: str = _socket_path()
+        self._preload: Optional[_Preload] = None
+        self._preloading: bool = False
+        # Bumped whenever the preload is detached, so a spawn still running
+        # on the pool knows its track is no longer wanted.
+        self._generation: int = 0
         self._lock: threading.Lock = threading.Lock()
         self._paused: bool = False
         self._current: Optional[Track] = None
-        self._pos_running: bool = False
+        self._last_tick: float = 0.0
+        self._next_poll: float = 0.0
+        self._last_poll: float = 0.0
         self.position: float = 0.0
         self.duration: float = 0.0
+        self.buffer: BufferState = BufferState()
+        self.tuner: CacheTuner = CacheTuner()
         self.on_finish: Optional[Callable[[], None]] = None
+        self.peek_next: Optional[Callable[[], Optional[Track]]] = None
+        self.crossfade: float = CROSSFADE_SECS
 
     @property
     def is_playing(self) -> bool:
@@ -48,51 +156,140 @@ class Player:
     def current(self) -> Optional[Track]:
         return self._current
 
-    def play(self, track: Track) -> None:
-        """Play a track."""
+    @property
+    def source(self) -> Optional[list[str]]:
+        """The mpv arguments naming what the current instance plays."""
+        proc = self._proc
+        return None if proc is None else list(proc.args[-2:])
+
+    def play(self, track: Track, start: float = 0.0) -> None:
+        """Play a track, optionally from an offset in seconds."""
         self._stop_proc()
         self._current = track
         self._paused = False
-        self.position = 0.0
+        self.position = start
         self.duration = 0.0
+        self.buffer = BufferState()
+        preload = self._take_preload(track)
         with self._lock:
-            cmd = ["mpv"]
-            if MPV_NO_VIDEO:
-                cmd.append("--no-video")
-            if MPV_REALLY_QUIET:
-                cmd.append("--really-quiet")
-            cmd.extend(
+            if preload is not None and not start:
+                self._proc, self._socket = preload.proc, preload.socket
+            else:
+                if preload is not None:
+                    self._kill_preload(preload)
+                self._socket = _socket_path()
+                self._proc = self._spawn(track, self._socket, start=start)
+                preload = None
+            proc = self._proc
+        if preload is not None:
+            self._ipc_batch(
                 [
-                    f"--term-osd={MPV_TERM_OSD}",
-                    f"--volume={MPV_VOLUME}",
-                    f"--input-ipc-server={MPV_SOCKET}",
-                    track.url,
+                    ["set_property", "volume", self._volume(track)],
+                    ["set_property", "pause", False],
                 ]
             )
-            self._proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        self._pos_running = True
-        _thread_pool.submit(self._monitor)
-        _thread_pool.submit(self._poll)
+        self._last_tick = self._next_poll = self._last_poll = time.monotonic()
+        _poller.add(self)
+
+    def _spawn(
+        self, track: Track, socket_path: str, start: float = 0.0, preload: bool = False
+    ) -> subprocess.Popen:
+        # An offline copy plays without touching the network.
+        path = local_path(track.video_id)
+        if path is not None:
+            url = str(path)
+        elif self.resolver is None:
+            url = None
+        elif preload:
+            # Not a play request; leave the prefetch hit rate alone.
+            url = self.resolver.cached(track.video_id)
+        else:
+            url = self.resolver.take(track)
+        record = None
+        if path is None and start <= 0 and self.loudness is not None:
+            record = self.loudness.record_path(track.video_id)
+        cmd = [MPV_BINARY]
+        if MPV_NO_VIDEO:
+            cmd.append("--no-video")
+        if MPV_REALLY_QUIET:
+            cmd.append("--really-quiet")
+        cmd.extend(
+            [
+                f"--term-osd={MPV_TERM_OSD}",
+                f"--volume={0 if preload else self._volume(track):.1f}",
+                f"--input-ipc-server={socket_path}",
+                *self.tuner.args(),
+            ]
+        )
+        if self.audio_device:
+            cmd.append(f"--audio-device={self.audio_device}")
+        if preload:
+            cmd.append("--pause")
+        if start > 0:
+            cmd.append(f"--start={start:.1f}")
+        if record is not None:
+            cmd.append(f"--stream-record={record}")
+        if url:
+            cmd.extend(["--ytdl=no", url])
+        else:
+            cmd.extend([f"--ytdl-format={format_policy.selector()}", track.url])
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if record is not None:
+            self._records[proc] = (track.video_id, record)
+        return proc
+
+    def _volume(self, track: Optional[Track]) -> float:
+        if track is None or self.loudness is None:
+            return MPV_VOLUME
+        return self.loudness.volume(track.video_id)
+
+    def apply_gain(self, video_id: str) -> None:
+        """Set the normalized volume if video_id is playing and not fading."""
+        track = self._current
+        pre = self._preload
+        if (
+            track is not None
+            and track.video_id == video_id
+            and self._proc is not None
+            and not self._paused
+            and not (pre is not None and pre.fading)
+        ):
+            self._ipc_batch([["set_property", "volume", self._volume(track)]])
+
+    def _kill(self, proc: subprocess.Popen) -> None:
+        """End an instance early; its partial recording is useless."""
+        _terminate(proc)
+        rec = self._records.pop(proc, None)
+        if rec is not None:
+            rec[1].unlink(missing_ok=True)
+
+    def _finished(self, proc: subprocess.Popen) -> None:
+        """Hand a completed recording to the loudness store."""
+        rec = self._records.pop(proc, None)
+        if rec is None:
+            return
+        vid, path = rec
+        if self.loudness is None or not path.exists():
+            path.unlink(missing_ok=True)
+        elif self.loudness.submit(vid, path, delete=True) is None:
+            path.unlink(missing_ok=True)
 
     def _stop_proc(self) -> None:
         """Stop the current mpv process."""
-        self._pos_running = False
+        # Detach first so the poller never reports the kill as a finish.
         with self._lock:
-            if self._proc and self._proc.poll() is None:
-                self._proc.terminate()
-                try:
-                    self._proc.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    self._proc.kill()
-            self._proc = None
+            proc, self._proc = self._proc, None
+        if proc:
+            self._kill(proc)
 
     def stop(self) -> None:
         """Stop playback."""
         self._stop_proc()
+        self._drop_preload()
         self._current = None
         self._paused = False
         self.position = 0.0
@@ -102,53 +299,255 @@ class Player:
         """Toggle pause/resume."""
         with self._lock:
             if self._proc and self._proc.poll() is None:
-                if self._paused:
-                    self._proc.send_signal(signal.SIGCONT)
-                    self._paused = False
-                else:
-                    self._proc.send_signal(signal.SIGSTOP)
-                    self._paused = True
-
-    def _ipc(self, cmd: dict) -> Optional[dict]:
-        """Send IPC command to mpv."""
+                sig = signal.SIGCONT if self._paused else signal.SIGSTOP
+                self._proc.send_signal(sig)
+                # A track fading in pauses along with the one fading out.
+                pre = self._preload
+                if pre is not None and pre.fading and pre.proc.poll() is None:
+                    pre.proc.send_signal(sig)
+                self._paused = not self._paused
+
+    # ── Crossfade ────────────────────────────────
+
+    def _take_preload(self, track: Track) -> Optional[_Preload]:
+        """Detach the preloaded instance if it holds this track."""
+        with self._lock:
+            pre, self._preload = self._preload, None
+            self._generation += 1
+        if pre is None:
+            return None
+        if pre.track.video_id == track.video_id and pre.proc.poll() is None:
+            return pre
+        self._kill_preload(pre)
+        return None
+
+    def _drop_preload(self, wait: bool = True) -> None:
+        with self._lock:
+            pre, self._preload = self._preload, None
+            self._generation += 1
+        if pre is not None:
+            if wait:
+                self._kill_preload(pre)
+            else:
+                _thread_pool.submit(self._kill_preload, pre)
+
+    def _kill_preload(self, pre: _Preload) -> None:
+        self._kill(pre.proc)
+        # A killed mpv leaves its IPC socket behind.
+        Path(pre.socket).unlink(missing_ok=True)
+
+    def _start_preload(self, track: Track, generation: int) -> None:
+        """Spawn a paused instance for track; runs on the thread pool."""
+        pre = None
         try:
-            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            s.settimeout(SOCKET_TIMEOUT)
-            s.connect(MPV_SOCKET)
-            s.sendall((json.dumps(cmd) + "\n").encode())
-            data = s.recv(4096).decode()
-            s.close()
-            for line in data.splitlines():
-                try:
-                    r = json.loads(line)
-                    if "data" in r:
-                        return r
-                except Exception:
-                    pass
+            socket_path = _socket_path()
+            proc = self._spawn(track, socket_path, preload=True)
+            pre = _Preload(track, proc, socket_path)
+        finally:
+            with self._lock:
+                self._preloading = False
+                if pre is not None and self._generation == generation:
+                    self._preload, pre = pre, None
+            if pre is not None:
+                self._kill_preload(pre)
+
+    def _maybe_crossfade(
+        self, proc: subprocess.Popen, deadline: Optional[float] = None
+    ) -> None:
+        """Preload and start fading in the next track near the end."""
+        if self.crossfade <= 0 or self.duration < self.crossfade * 2:
+            return
+        remaining = self.duration - self.position
+        if remaining > self.crossfade + CROSSFADE_PRELOAD_SECS:
+            return
+        nxt = self.peek_next() if self.peek_next else None
+        pre = self._preload
+        if pre is not None and (nxt is None or pre.track.video_id != nxt.video_id):
+            # The queue changed under the preload.
+            self._drop_preload(wait=False)
+            pre = None
+        if nxt is None:
+            return
+        if pre is None:
+            with self._lock:
+                if self._preloading:
+                    return
+                self._preloading = True
+                generation = self._generation
+            _thread_pool.submit(self._start_preload, nxt, generation)
+            return
+        if remaining <= self.crossfade and not pre.fading:
+            pre.fading = True
+            pre.length = max(remaining, PLAYER_TICK)
+            self._ipc_batch([["set_property", "pause", False]], pre.socket, deadline)
+
+    def _step_fade(
+        self, proc: subprocess.Popen, elapsed: float, deadline: Optional[float] = None
+    ) -> None:
+        """Ramp the preload up and the current track down, then end it."""
+        pre = self._preload
+        if pre is None or not pre.fading or self._paused:
+            return
+        pre.faded += elapsed
+        f = min(1.0, pre.faded / pre.length)
+        self._ipc_batch(
+            [["set_property", "volume", self._volume(self._current) * (1 - f)]],
+            deadline=deadline,
+        )
+        self._ipc_batch(
+            [["set_property", "volume", self._volume(pre.track) * f]],
+            pre.socket,
+            deadline,
+        )
+        if f >= 1.0:
+            # Ending the faded-out instance reports a normal finish; the app
+            # then plays the next track, which adopts the running preload.
+            with self._lock:
+                if self._proc is proc and proc.poll() is None:
+                    proc.terminate()
+
+    def _ipc_batch(
+        self,
+        commands: list[list],
+        socket_path: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> list:
+        """Send several IPC commands on one connection; return their data.
+
+        Replies still missing at ``deadline`` (a monotonic time) stay None.
+        """
+        results: list = [None] * len(commands)
+
+        def timeout() -> float:
+            if deadline is None:
+                return SOCKET_TIMEOUT
+            left = min(SOCKET_TIMEOUT, deadline - time.monotonic())
+            if left <= 0:
+                raise TimeoutError
+            return left
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.settimeout(timeout())
+                s.connect(socket_path or self._socket)
+                s.sendall(
+                    "".join(
+                        json.dumps({"command": c, "request_id": i}) + "\n"
+                        for i, c in enumerate(commands)
+                    ).encode()
+                )
+                pending = len(commands)
+                buf = b""
+                while pending:
+                    s.settimeout(timeout())
+                    chunk = s.recv(4096)
+                    if not chunk:
+                        break
+                    buf += chunk
+                    *lines, buf = buf.split(b"\n")
+                    for line in lines:
+                        try:
+                            r = json.loads(line)
+                        except ValueError:
+                            continue
+                        i = r.get("request_id")
+                        if isinstance(i, int) and 0 <= i < len(commands):
+                            results[i] = r.get("data")
+                            pending -= 1
         except Exception:
             pass
-        return None
+        return results
 
-    def _poll(self) -> None:
-        """Poll mpv for position and duration."""
-        while self._pos_running:
-            if not self.is_playing:
-                break
-            r = self._ipc({"command": ["get_property", "time-pos"]})
-            if r and isinstance(r.get("data"), (int, float)):
-                self.position = float(r["data"])
-            r = self._ipc({"command": ["get_property", "duration"]})
-            if r and isinstance(r.get("data"), (int, float)):
-                self.duration = float(r["data"])
-            time.sleep(0.5)
-
-    def _monitor(self) -> None:
-        """Monitor process exit."""
+    def _tick(self, now: float) -> None:
+        """Called by the poller: report an exit, step a fade, poll mpv."""
         proc = self._proc
-        if proc:
-            proc.wait()
+        if proc is None:
+            return
+        if proc.poll() is not None:
             with self._lock:
-                still_current = self._proc is proc
-            if still_current and self.on_finish and not self._paused:
-                self._pos_running = False
-                self.on_finish()
+                if self._proc is not proc:
+                    return
+                self._proc = None
+            self._finished(proc)
+            if self.on_finish and not self._paused:
+                _thread_pool.submit(self.on_finish)
+            return
+        if self._paused:
+            # mpv is SIGSTOPped and would not answer IPC.
+            self._last_tick = self._next_poll = self._last_poll = now
+            return
+        elapsed, self._last_tick = now - self._last_tick, now
+        deadline = now + PLAYER_TICK_IPC_BUDGET
+        self._step_fade(proc, elapsed, deadline)
+        if now >= self._next_poll:
+            self._next_poll = now + PLAYER_POLL_INTERVAL
+            elapsed, self._last_poll = now - self._last_poll, now
+            self._poll(proc, elapsed, deadline)
+
+    def _poll(
+        self, proc: subprocess.Popen, elapsed: float, deadline: Optional[float] = None
+    ) -> None:
+        """Poll mpv for position, duration and buffer health."""
+        pos, dur, cached, pct, stalled, speed = self._ipc_batch(
+            [
+                ["get_property", "time-pos"],
+                ["get_property", "duration"],
+                ["get_property", "demuxer-cache-duration"],
+                ["get_property", "cache-buffering-state"],
+                ["get_property", "paused-for-cache"],
+                ["get_property", "cache-speed"],
+            ],
+            deadline=deadline,
+        )
+        if isinstance(pos, (int, float)):
+            self.position = float(pos)
+        if isinstance(dur, (int, float)):
+            self.duration = float(dur)
+        if isinstance(stalled, bool):
+            self._update_buffer(cached, pct, stalled, speed, elapsed, deadline)
+            if not stalled:
+                if isinstance(pos, (int, float)):
+                    self.buffer.played = True
+                self._maybe_crossfade(proc, deadline)
+
+    def _update_buffer(
+        self, cached, pct, stalled, speed, elapsed, deadline=None
+    ) -> None:
+        state = self.buffer
+        if isinstance(cached, (int, float)):
+            state.cache_duration = float(cached)
+        if isinstance(pct, int):
+            state.buffering_pct = pct
+        # The initial fill is start-up latency, not a rebuffer.
+        if stalled and not state.stalled and state.played:
+            if self.tuner.on_stall():
+                self._apply_readahead(deadline)
+        if stalled:
+            self.tuner.on_stalled(elapsed)
+        elif not self._paused and self.tuner.on_playing(elapsed):
+            self._apply_readahead(deadline)
+        state.stalled = stalled
+        # While the cache is still filling, mpv reads as fast as the link
+        # allows, which makes cache-speed a usable throughput sample.
+        if (
+            isinstance(speed, (int, float))
+            and speed > 0
+            and state.cache_duration < self.tuner.cache_secs * 0.9
+        ):
+            format_policy.throughput.record(int(speed * elapsed), elapsed)
+
+    def _apply_readahead(self, deadline: Optional[float] = None) -> None:
+        self._ipc_batch(
+            [["set_property", k, v] for k, v in self.tuner.properties().items()],
+            deadline=deadline,
+        )
+
+
+
+def _terminate(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
@@ -0,0 +1,184 @@
+"""Stream URL resolution with a TTL cache and speculative warmup."""
+
+import threading
+import time
+from typing import Optional
+
+from .config import (
+    STREAM_PRIME,
+    STREAM_PRIME_BYTES,
+    STREAM_URL_TTL,
+    YOUTUBE_HOST,
+    YTDLP_BINARY,
+)
+from .formats import format_policy
+from .models import Track
+from .offline import local_path
+from .scheduler import CancelToken, JobCancelled, Priority, run_process, scheduler
+
+
+class StreamResolver:
+    """Resolves tracks to direct stream URLs through yt-dlp.
+
+    Resolved URLs are cached for ``STREAM_URL_TTL`` seconds, or until the
+    quality mode they were resolved under changes. ``speculate`` resolves a
+    track as a prefetch job at low CPU priority; only one speculation is
+    ever in flight and starting another cancels it. A play request for a
+    track being speculated joins the same job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[str, float, str]] = {}
+        self._speculated: set[str] = set()
+        self._spec_token: Optional[CancelToken] = None
+        self.stats: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "speculated": 0,
+            "cancelled": 0,
+            "resolved": 0,
+            "used": 0,
+        }
+
+    # ── Resolution ───────────────────────────────
+
+    def _resolve_cmd(self, track: Track) -> list[str]:
+        return [
+            YTDLP_BINARY,
+            "-g",
+            "-f",
+            format_policy.selector(),
+            "--no-playlist",
+            "--no-warnings",
+            track.url,
+        ]
+
+    def _submit(
+        self,
+        track: Track,
+        priority: Priority,
+        token: Optional[CancelToken] = None,
+    ):
+        def job(t: CancelToken) -> Optional[str]:
+            url = self.cached(track.video_id)
+            if url is not None:
+                return url
+            nice = 10 if priority >= Priority.PREFETCH else 0
+            mode = format_policy.mode
+            code, stdout, _ = run_process(self._resolve_cmd(track), t, nice)
+            lines = stdout.decode().split()
+            if code != 0 or not lines:
+                return None
+            self._store(track.video_id, lines[0], mode)
+            return lines[0]
+
+        return scheduler.submit(
+            job,
+            priority,
+            key=f"resolve:{track.video_id}",
+            host=YOUTUBE_HOST,
+            token=token,
+        )
+
+    def _store(self, video_id: str, url: str, mode: str) -> None:
+        with self._lock:
+            self._cache[video_id] = (url, time.monotonic() + STREAM_URL_TTL, mode)
+
+    def cached(self, video_id: str) -> Optional[str]:
+        """Return a still-valid cached URL without touching the stats.
+
+        A URL resolved under another quality mode is stale: it names a
+        format the current mode would not pick.
+        """
+        with self._lock:
+            entry = self._cache.get(video_id)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic() or entry[2] != format_policy.mode:
+                del self._cache[video_id]
+                self._speculated.discard(video_id)
+                return None
+            return entry[0]
+
+    def take(self, track: Track) -> Optional[str]:
+        """Look up a URL for playback, counting a hit or a miss."""
+        url = self.cached(track.video_id)
+        with self._lock:
+            if url is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                if track.video_id in self._speculated:
+                    self._speculated.discard(track.video_id)
+                    self.stats["used"] += 1
+        return url
+
+    def resolve(
+        self, track: Track, priority: Priority = Priority.PLAY
+    ) -> Optional[str]:
+        """Resolve a track, at play priority unless told otherwise. Blocking."""
+        url = self.cached(track.video_id)
+        if url is None:
+            try:
+                url = self._submit(track, priority).result()
+            except JobCancelled:
+                return None
+        return url
+
+    # ── Speculation ──────────────────────────────
+
+    def speculate(self, track: Track) -> None:
+        """Warm the cache for a track that is likely to be played next."""
+        if self.cached(track.video_id) is not None or local_path(track.video_id):
+            return
+        self.cancel_speculation()
+        token = CancelToken()
+        with self._lock:
+            self._spec_token = token
+            self.stats["speculated"] += 1
+        future = self._submit(track, Priority.PREFETCH, token)
+        future.add_done_callback(lambda f: self._speculated_done(track, token, f))
+
+    def _speculated_done(self, track: Track, token: CancelToken, future) -> None:
+        with self._lock:
+            if self._spec_token is token:
+                self._spec_token = None
+        if token.cancelled or future.cancelled() or future.exception():
+            return
+        url = future.result()
+        if not url:
+            return
+        with self._lock:
+            self._speculated.add(track.video_id)
+            self.stats["resolved"] += 1
+        if STREAM_PRIME or not format_policy.throughput.samples:
+            # Unprimed, the first speculation still measures the link once, so
+            # the format policy has a rate before mpv reports any.
+            scheduler.submit(lambda t: self._prime(url), Priority.PREFETCH, token=token)
+
+    def _prime(self, url: str) -> None:
+        # Fetch the head of the stream so the CDN edge and TLS session are warm
+        # by the time mpv asks for it; the download doubles as a throughput
+        # sample for the format policy.
+        format_policy.measure(url, STREAM_PRIME_BYTES, timeout=5)
+
+    def cancel_speculation(self) -> None:
+        """Drop the in-flight speculation, killing its yt-dlp if running."""
+        with self._lock:
+            token = self._spec_token
+            if token is None:
+                return
+            self._spec_token = None
+            self.stats["cancelled"] += 1
+        token.cancel()
+
+    def summary(self) -> str:
+        s = self.stats
+        plays = s["hits"] + s["misses"]
+        rate = s["hits"] / plays if plays else 0.0
+        wasted = s["resolved"] - s["used"] + s["cancelled"]
+        return (
+            f"Prefetch hit rate {rate:.0%} ({s['hits']}/{plays}), "
+            f"{s['speculated']} speculated, {wasted} wasted"
+        )
@@ -0,0 +1,328 @@
+"""Priority scheduler for yt-dlp and other network work."""
+
+import asyncio
+import bisect
+import itertools
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Optional
+
+from .config import (
+    SCHED_BACKOFF_MAX,
+    SCHED_BACKOFF_MIN,
+    SCHED_HOST_INTERVAL,
+    SCHED_MAX_WORKERS,
+    SCHED_RESERVED_INTERACTIVE,
+)
+
+
+class Priority(IntEnum):
+    """Job classes, most urgent first."""
+
+    INTERACTIVE = 0
+    PLAY = 1
+    PREFETCH = 2
+    BACKGROUND = 3
+
+
+class JobCancelled(Exception):
+    """The job was cancelled before or while it ran."""
+
+
+class RateLimited(Exception):
+    """The remote host asked us to slow down; the host backs off."""
+
+
+class CancelToken:
+    """Cooperative cancellation handle passed to every job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def on_cancel(self, cb: Callable[[], None]) -> None:
+        """Run cb on cancellation, immediately if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(cb)
+                return
+        cb()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise JobCancelled()
+
+
+class _SharedToken(CancelToken):
+    """Token of a deduplicated job: cancelled once every caller cancels."""
+
+    def __init__(self):
+        super().__init__()
+        self._callers: list[Optional[CancelToken]] = []
+
+    def attach(self, token: Optional[CancelToken]) -> None:
+        self._callers.append(token)
+        if token is not None:
+            token.on_cancel(self._maybe_cancel)
+
+    def _maybe_cancel(self) -> None:
+        if all(t is not None and t.cancelled for t in self._callers):
+            self.cancel()
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "fn", "key", "host", "token", "future", "queued")
+
+    def __init__(self, priority, seq, fn, key, host, token, future):
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.key = key
+        self.host = host
+        self.token = token
+        self.future = future
+        self.queued = time.monotonic()
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Host:
+    __slots__ = ("next_at", "backoff")
+
+    def __init__(self):
+        self.next_at = 0.0
+        self.backoff = 0.0
+
+
+class Scheduler:
+    """Runs jobs on a bounded pool, most urgent class first.
+
+    ``SCHED_RESERVED_INTERACTIVE`` workers are kept free of prefetch and
+    background jobs, so a keypress-driven job never waits behind them.
+    Jobs that share a ``key`` while one is queued or running share a single
+    execution (singleflight). Each ``host`` is paced to one job start per
+    ``SCHED_HOST_INTERVAL`` seconds, and a job raising ``RateLimited`` puts
+    the host into exponential backoff; interactive jobs ignore pacing.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SCHED_MAX_WORKERS,
+        reserved: int = SCHED_RESERVED_INTERACTIVE,
+    ):
+        self.max_workers = max_workers
+        self.reserved = min(reserved, max_workers - 1)
+        self._cond = threading.Condition()
+        self._queue: list[_Job] = []
+        self._inflight: dict[str, _Job] = {}
+        self._hosts: dict[str, _Host] = {}
+        self._seq = itertools.count()
+        self._running = 0
+        self._threads: list[threading.Thread] = []
+        self._stats = {
+            p: {"submitted": 0, "deduped": 0, "run": 0, "wait": 0.0, "max_wait": 0.0}
+            for p in Priority
+        }
+
+    def submit(
+        self,
+        fn: Callable[[CancelToken], Any],
+        priority: Priority = Priority.BACKGROUND,
+        key: Optional[str] = None,
+        host: Optional[str] = None,
+        token: Optional[CancelToken] = None,
+    ) -> Future:
+        """Queue fn(token) and return a Future for its result."""
+        with self._cond:
+            self._stats[priority]["submitted"] += 1
+            if key is not None and key in self._inflight:
+                job = self._inflight[key]
+                job.token.attach(token)
+                self._stats[priority]["deduped"] += 1
+                if priority < job.priority and job in self._queue:
+                    self._queue.remove(job)
+                    job.priority = priority
+                    bisect.insort(self._queue, job)
+                    self._cond.notify()
+                return job.future
+            shared = _SharedToken()
+            shared.attach(token)
+            job = _Job(priority, next(self._seq), fn, key, host, shared, Future())
+            if key is not None:
+                self._inflight[key] = job
+            bisect.insort(self._queue, job)
+            self._ensure_workers()
+            self._cond.notify()
+        return job.future
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self.max_workers:
+            t = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _limit(self, priority: Priority) -> int:
+        if priority <= Priority.PLAY:
+            return self.max_workers
+        return self.max_workers - self.reserved
+
+    def _pick(self, now: float) -> tuple[Optional[_Job], Optional[float]]:
+        """Return the first runnable job, or how long to wait for one."""
+        wake = None
+        for i, job in enumerate(self._queue):
+            if job.token.cancelled:
+                del self._queue[i]
+                return job, None
+            if self._running >= self._limit(job.priority):
+                continue
+            if job.host is not None and job.priority > Priority.INTERACTIVE:
+                host = self._hosts.get(job.host)
+                if host is not None and host.next_at > now:
+                    wait = host.next_at - now
+                    wake = wait if wake is None else min(wake, wait)
+                    continue
+            del self._queue[i]
+            return job, None
+        return None, wake
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    job, wake = self._pick(time.monotonic())
+                    if job is not None:
+                        break
+                    self._cond.wait(wake)
+                if job.token.cancelled:
+                    self._finish(job)
+                    job.future.set_exception(JobCancelled())
+                    continue
+                self._running += 1
+                now = time.monotonic()
+                stats = self._stats[job.priority]
+                wait = now - job.queued
+                stats["run"] += 1
+                stats["wait"] += wait
+                stats["max_wait"] = max(stats["max_wait"], wait)
+                if job.host is not None:
+                    host = self._hosts.setdefault(job.host, _Host())
+                    host.next_at = max(host.next_at, now) + SCHED_HOST_INTERVAL
+            if not job.future.set_running_or_notify_cancel():
+                result, error = None, JobCancelled()
+            else:
+                result, error = None, None
+                try:
+                    result = job.fn(job.token)
+                except BaseException as e:
+                    error = e
+            with self._cond:
+                self._running -= 1
+                self._finish(job)
+                if job.host is not None:
+                    self._update_host(job.host, error)
+                self._cond.notify_all()
+            if job.future.done():
+                continue
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def _finish(self, job: _Job) -> None:
+        if job.key is not None and self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def _update_host(self, name: str, error: Optional[BaseException]) -> None:
+        host = self._hosts.setdefault(name, _Host())
+        if isinstance(error, RateLimited):
+            host.backoff = min(
+                SCHED_BACKOFF_MAX, max(SCHED_BACKOFF_MIN, host.backoff * 2)
+            )
+            host.next_at = time.monotonic() + host.backoff
+        elif error is None:
+            host.backoff = 0.0
+
+    # ── Metrics ──────────────────────────────────
+
+    def metrics(self) -> dict:
+        """Queue depth per class, running jobs and wait-time stats."""
+        with self._cond:
+            depth = {p.name.lower(): 0 for p in Priority}
+            for job in self._queue:
+                depth[job.priority.name.lower()] += 1
+            classes = {}
+            for p, s in self._stats.items():
+                classes[p.name.lower()] = dict(
+                    s, avg_wait=s["wait"] / s["run"] if s["run"] else 0.0
+                )
+            return {
+                "running": self._running,
+                "queued": depth,
+                "classes": classes,
+            }
+
+    def summary(self) -> str:
+        m = self.metrics()
+        queued = sum(m["queued"].values())
+        waits = ", ".join(
+            f"{name} {c['avg_wait'] * 1000:.0f}ms"
+            for name, c in m["classes"].items()
+            if c["run"]
+        )
+        return f"Jobs: {m['running']} running, {queued} queued; avg wait {waits or '-'}"
+
+
+async def await_job(future: Future, token: CancelToken) -> Any:
+    """Await a job from asyncio; cancelling the caller cancels its token."""
+    try:
+        return await asyncio.shield(asyncio.wrap_future(future))
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
+
+
+def run_process(
+    cmd: list[str], token: CancelToken, nice: int = 0
+) -> tuple[int, bytes, bytes]:
+    """Run a subprocess that is killed when the token is cancelled.
+
+    A positive ``nice`` lowers its CPU priority once it has started.
+    """
+    token.check()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if nice:
+        try:
+            os.setpriority(os.PRIO_PROCESS, proc.pid, nice)
+        except OSError:
+            pass
+    token.on_cancel(proc.kill)
+    stdout, stderr = proc.communicate()
+    token.check()
+    if proc.returncode != 0 and b"HTTP Error 429" in stderr:
+        raise RateLimited(cmd[0])
+    return proc.returncode, stdout, stderr
+
+
+scheduler = Scheduler()
@@ -0,0 +1,144 @@
+"""YouTube search via yt-dlp."""
+
+import asyncio
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .config import (
+    SEARCH_MAX_RESULTS,
+    SEARCH_RESULTS,
+    SEARCH_VARIANTS,
+    YOUTUBE_HOST,
+    YTDLP_BINARY,
+)
+from .models import Track, intern_track
+from .scheduler import CancelToken, Priority, await_job, run_process, scheduler
+
+# One line per result; the title goes last since it may hold anything.
+_CHANNEL_FORMAT = "%(id)s\t%(channel,uploader|)s\t%(title)s"
+
+
+def _search_cmd(
+    query: str, count: int = SEARCH_RESULTS, channels: bool = False
+) -> list[str]:
+    if channels:
+        fields = ["--print", _CHANNEL_FORMAT]
+    else:
+        fields = ["--get-title", "--get-id"]
+    return [
+        YTDLP_BINARY,
+        f"ytsearch{count}:{query}",
+        *fields,
+        "--flat-playlist",
+        "--no-warnings",
+    ]
+
+
+def parse_search_output(output: str) -> list[Track]:
+    """Parse alternating title/id lines printed by yt-dlp."""
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return [intern_track(lines[i], lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+
+def parse_channel_output(output: str) -> list[tuple[Track, str]]:
+    """Parse id, channel and title lines printed for a ``channels`` search."""
+    results = []
+    for line in output.splitlines():
+        parts = line.strip("\r\n").split("\t", 2)
+        if len(parts) == 3 and parts[0] and parts[2].strip():
+            results.append((intern_track(parts[2].strip(), parts[0]), parts[1]))
+    return results
+
+
+def submit_search(
+    query: str,
+    count: int = SEARCH_RESULTS,
+    priority: Priority = Priority.INTERACTIVE,
+    token: Optional[CancelToken] = None,
+    channels: bool = False,
+) -> Future:
+    """Queue a yt-dlp search; the Future's result is run_process's.
+
+    With ``channels`` the output is for ``parse_channel_output``.
+    """
+    return scheduler.submit(
+        lambda t: run_process(_search_cmd(query, count, channels), t),
+        priority,
+        key=f"search:{count}:{int(channels)}:{query}",
+        host=YOUTUBE_HOST,
+        token=token,
+    )
+
+
+async def search_tracks(query: str, count: int = SEARCH_RESULTS) -> list[Track]:
+    """Run a single yt-dlp search at interactive priority."""
+    token = CancelToken()
+    future = submit_search(query, count, token=token)
+    _, stdout, _ = await await_job(future, token)
+    return parse_search_output(stdout.decode())
+
+
+def merge_results(
+    batches: list[list[Track]], limit: int = SEARCH_MAX_RESULTS
+) -> list[Track]:
+    """Merge result lists, dedupe by video_id and rank.
+
+    Each hit scores by its position in every list it appears in, so a track
+    found by several variants outranks one found near the top of a single
+    list. Ties go to the better rank, then to the earlier list.
+    """
+    scores: dict[str, float] = {}
+    best: dict[str, tuple[int, int]] = {}
+    tracks: dict[str, Track] = {}
+    for b, batch in enumerate(batches):
+        n = len(batch)
+        for rank, track in enumerate(batch):
+            vid = track.video_id
+            scores[vid] = scores.get(vid, 0.0) + (n - rank) / n
+            if vid not in best or (rank, b) < best[vid]:
+                best[vid] = (rank, b)
+                tracks[vid] = track
+    order = sorted(scores, key=lambda v: (-scores[v], best[v]))
+    return [tracks[v] for v in order[:limit]]
+
+
+async def search_variants(
+    query: str,
+    on_update: Optional[Callable[[list[Track], bool], None]] = None,
+    variants: tuple[str, ...] = SEARCH_VARIANTS,
+) -> list[Track]:
+    """Search several query variants concurrently.
+
+    ``on_update`` is called with the merged results each time a variant
+    returns; the second argument is True once every variant has finished.
+    Wall time is bounded by the slowest variant, not their sum.
+    """
+    queries = list(dict.fromkeys(v.format(query=query) for v in variants))
+
+    async def run(i: int, q: str) -> tuple[int, list[Track]]:
+        return i, await search_tracks(q)
+
+    tasks = [asyncio.create_task(run(i, q)) for i, q in enumerate(queries)]
+    batches: list[list[Track]] = [[] for _ in queries]
+    merged: list[Track] = []
+    errors: list[Exception] = []
+    try:
+        pending = len(tasks)
+        for fut in asyncio.as_completed(tasks):
+            pending -= 1
+            try:
+                i, batch = await fut
+                batches[i] = batch
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors.append(e)
+                if len(errors) == len(tasks):
+                    raise
+            merged = merge_results(batches)
+            if on_update and (merged or pending == 0):
+                on_update(merged, pending == 0)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return merged
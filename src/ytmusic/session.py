@@ -0,0 +1,95 @@
+"""Session snapshot so the app can resume where it left off."""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .config import SESSION_FILE
+from .models import Track, intern_track
+from .storage import WriteBehind, write_json_atomic
+
+
+@dataclass
+class Session:
+    """Queue, results and playback state at the time of a snapshot."""
+
+    queue: list[Track] = field(default_factory=list)
+    queue_index: int = 0
+    current: Optional[Track] = None
+    position: float = 0.0
+    paused: bool = False
+    list_mode: str = "normal"
+    playlist_id: Optional[str] = None
+    results: list[Track] = field(default_factory=list)
+    quality: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        def tracks(ts: list[Track]) -> list[dict]:
+            return [{"title": t.title, "video_id": t.video_id} for t in ts]
+
+        return {
+            "queue": tracks(self.queue),
+            "queue_index": self.queue_index,
+            "current": tracks([self.current])[0] if self.current else None,
+            "position": round(self.position, 1),
+            "paused": self.paused,
+            "list_mode": self.list_mode,
+            "playlist_id": self.playlist_id,
+            "results": tracks(self.results),
+            "quality": self.quality,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        def tracks(ts: list[dict]) -> list[Track]:
+            return [intern_track(t["title"], t["video_id"]) for t in ts]
+
+        current = data.get("current")
+        return cls(
+            queue=tracks(data.get("queue", [])),
+            queue_index=data.get("queue_index", 0),
+            current=tracks([current])[0] if current else None,
+            position=data.get("position", 0.0),
+            paused=data.get("paused", False),
+            list_mode=data.get("list_mode", "normal"),
+            playlist_id=data.get("playlist_id"),
+            results=tracks(data.get("results", [])),
+            quality=data.get("quality"),
+        )
+
+
+_last_saved: Optional[dict] = None
+
+
+def save_session(
+    session: Session,
+    path: Path = SESSION_FILE,
+    writer: Optional[WriteBehind] = None,
+) -> bool:
+    """Write the snapshot if it changed since the last write.
+
+    With a ``writer`` the write is handed to it instead of done here.
+    """
+    global _last_saved
+    data = session.to_dict()
+    if data == _last_saved:
+        return False
+    if writer is not None:
+        writer.submit(data)
+    else:
+        write_json_atomic(path, data)
+    _last_saved = data
+    return True
+
+
+def load_session(path: Path = SESSION_FILE) -> Optional[Session]:
+    global _last_saved
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        session = Session.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    _last_saved = data
+    return session
@@ -0,0 +1,282 @@
+"""Spectrum and level meter fed by PCM from a silent second mpv."""
+
+import errno
+import fcntl
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it there is no spectrum.
+    np = None
+
+from .config import (
+    MPV_BINARY,
+    SPECTRUM_BANDS,
+    SPECTRUM_FFT_SIZE,
+    SPECTRUM_FPS,
+    SPECTRUM_MAX_WINDOWS,
+    SPECTRUM_RATE,
+)
+
+if TYPE_CHECKING:
+    from .player import Player
+
+log = logging.getLogger(__name__)
+
+F_SETPIPE_SZ = 1031  # Linux; not exported by the fcntl module before 3.10
+FLOOR_DB = -60.0
+RELEASE = 0.85  # per-frame decay of a falling bar
+RESYNC_SECS = 1.0
+
+
+class SpectrumAnalyzer:
+    """Log-spaced band levels of mono int16 PCM.
+
+    Each frame transforms up to ``max_windows`` half-overlapping Hann
+    windows of the newest samples in one batched real FFT, so the work per
+    frame is bounded whatever the frame interval. Levels are 0..1 over
+    ``FLOOR_DB``..0 dBFS, rising at once and falling by ``RELEASE``.
+    """
+
+    def __init__(
+        self,
+        rate: int = SPECTRUM_RATE,
+        bands: int = SPECTRUM_BANDS,
+        size: int = SPECTRUM_FFT_SIZE,
+        max_windows: int = SPECTRUM_MAX_WINDOWS,
+    ):
+        self.size = size
+        self.hop = size // 2
+        self.max_windows = max_windows
+        self.window = np.hanning(size).astype(np.float32)
+        freqs = np.fft.rfftfreq(size, 1 / rate)
+        self.edges = np.geomspace(40.0, min(16000.0, rate / 2), bands + 1)
+        # Bins to bands; a band narrower than a bin takes its nearest bin.
+        self._matrix = np.zeros((len(freqs), bands), np.float32)
+        for b in range(bands):
+            sel = (freqs >= self.edges[b]) & (freqs < self.edges[b + 1])
+            if not sel.any():
+                centre = np.sqrt(self.edges[b] * self.edges[b + 1])
+                sel = np.abs(freqs - centre) == np.abs(freqs - centre).min()
+            self._matrix[sel, b] = 1.0
+        # A full-scale sine peaks at 0 dB.
+        self._scale = 1.0 / (self.window.sum() / 2 * 32768.0) ** 2
+        self.levels = np.zeros(bands, np.float32)
+        self.level_db = FLOOR_DB
+
+    def process(self, pcm) -> "np.ndarray":
+        """Update and return the band levels from the newest samples."""
+        count = min(self.max_windows, (len(pcm) - self.size) // self.hop + 1)
+        if count <= 0:
+            self.decay()
+            return self.levels
+        recent = pcm[len(pcm) - self.size - (count - 1) * self.hop :]
+        frames = np.lib.stride_tricks.sliding_window_view(recent, self.size)
+        spec = np.fft.rfft(frames[:: self.hop] * self.window, axis=1)
+        power = (spec.real**2 + spec.imag**2).mean(axis=0) @ self._matrix
+        db = 10 * np.log10(power * self._scale + 1e-12)
+        level = np.clip(1 - db / FLOOR_DB, 0, 1)
+        np.maximum(level, self.levels * RELEASE, out=self.levels)
+        rms = np.sqrt(np.mean(np.square(recent, dtype=np.float32))) / 32768
+        self.level_db = max(FLOOR_DB, 20 * np.log10(rms + 1e-9))
+        return self.levels
+
+    def decay(self) -> None:
+        self.levels *= RELEASE
+        self.level_db = max(FLOOR_DB, self.level_db - 3)
+
+
+class PcmTap:
+    """A muted mpv decoding a source into a FIFO as mono s16 PCM.
+
+    mpv writes only as fast as the FIFO is drained, so the reader paces
+    it. Reads land directly in a preallocated NumPy buffer through
+    ``os.readv``; ``latest()`` returns a view of the newest samples.
+    """
+
+    def __init__(
+        self,
+        source: list[str],
+        start: float = 0.0,
+        rate: int = SPECTRUM_RATE,
+        keep: int = SPECTRUM_FFT_SIZE * SPECTRUM_MAX_WINDOWS,
+    ):
+        self.rate = rate
+        self.position = start
+        self._keep = keep
+        self._buf = np.zeros(keep * 4, np.int16)
+        self._bytes = memoryview(self._buf).cast("B")
+        self._fill = 0  # bytes
+        self._dir = tempfile.mkdtemp(prefix="ytmusic-pcm-")
+        self._fd = -1
+        try:
+            self._spawn(source, start)
+        except BaseException:
+            if self._fd >= 0:
+                os.close(self._fd)
+            shutil.rmtree(self._dir, ignore_errors=True)
+            raise
+
+    def _spawn(self, source: list[str], start: float) -> None:
+        fifo = os.path.join(self._dir, "pcm")
+        os.mkfifo(fifo)
+        # Opened before mpv so that its open for writing never blocks.
+        self._fd = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            # A small pipe keeps mpv close behind what has been read.
+            fcntl.fcntl(self._fd, F_SETPIPE_SZ, 4096)
+        except OSError:
+            pass
+        cmd = [
+            MPV_BINARY,
+            "--no-video",
+            "--really-quiet",
+            "--ao=pcm",
+            f"--ao-pcm-file={fifo}",
+            "--ao-pcm-waveheader=no",
+            "--audio-format=s16",
+            f"--audio-samplerate={self.rate}",
+            "--audio-channels=mono",
+        ]
+        if start > 0:
+            cmd.append(f"--start={start:.1f}")
+        self._proc = subprocess.Popen(
+            cmd + source, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self._proc.poll() is not None
+
+    def advance(self, seconds: float) -> None:
+        """Read up to ``seconds`` of audio, keeping only the newest samples."""
+        want = int(seconds * self.rate) * 2
+        while want > 0:
+            if self._fill > len(self._bytes) - 4096:
+                keep = self._keep * 2
+                self._bytes[:keep] = self._bytes[self._fill - keep : self._fill]
+                self._fill = keep
+            room = min(want, len(self._bytes) - self._fill)
+            try:
+                n = os.readv(self._fd, [self._bytes[self._fill : self._fill + room]])
+            except BlockingIOError:
+                return
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                return
+            if n == 0:  # Not started yet, or finished.
+                return
+            self._fill += n
+            want -= n
+            self.position += n / 2 / self.rate
+
+    def latest(self):
+        """The newest whole samples, as a view into the buffer."""
+        return self._buf[max(0, self._fill // 2 - self._keep) : self._fill // 2]
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        os.close(self._fd)
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class Visualizer:
+    """Drives a ``PcmTap`` and ``SpectrumAnalyzer`` along with a player.
+
+    A thread wakes ``SPECTRUM_FPS`` times a second, reads the audio that
+    has played since the last frame and hands the band levels and the
+    overall level to ``on_frame``. While the player is paused it reads
+    nothing, and mpv, blocked on the full FIFO, uses no CPU either. The tap
+    follows the player across tracks and seeks; ``stop`` ends the thread
+    and the tap. ``cpu_time`` is the thread's CPU time so far.
+    """
+
+    def __init__(
+        self,
+        player: "Player",
+        on_frame: Callable[["np.ndarray", float], None],
+        fps: float = SPECTRUM_FPS,
+    ):
+        self.player = player
+        self.on_frame = on_frame
+        self.interval = 1.0 / fps
+        self.cpu_time = 0.0
+        self.frames = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or not self.available:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        analyzer = SpectrumAnalyzer()
+        tap: Optional[PcmTap] = None
+        playing: Optional[tuple] = None
+        last = time.monotonic()
+        cpu = time.thread_time()
+        try:
+            while not self._stop.wait(self.interval):
+                now = time.monotonic()
+                elapsed, last = now - last, now
+                player = self.player
+                track, source = player.current, player.source
+                key = (track.video_id, tuple(source)) if track and source else None
+                if key != playing or (
+                    tap is not None
+                    and abs(tap.position - player.position) > RESYNC_SECS * 2
+                ):
+                    # A new track, or a seek: start over where the player is.
+                    if tap is not None:
+                        tap.close()
+                        tap = None
+                    playing = key
+                    if key is not None:
+                        try:
+                            tap = PcmTap(source, start=player.position)
+                        except OSError as e:
+                            # No spectrum for this track; keep following.
+                            log.warning("spectrum tap failed: %s", e)
+                if tap is None or player.is_paused:
+                    continue
+                # Follow the wall clock, corrected by the polled position.
+                target = tap.position + elapsed
+                if abs(target - player.position) > RESYNC_SECS:
+                    target = player.position
+                if target > tap.position:
+                    tap.advance(target - tap.position)
+                analyzer.process(tap.latest())
+                self.frames += 1
+                self.cpu_time += time.thread_time() - cpu
+                cpu = time.thread_time()
+                self.on_frame(analyzer.levels, analyzer.level_db)
+        finally:
+            if tap is not None:
+                tap.close()
@@ -0,0 +1,203 @@
+"""Now-playing status pushed to status bars and scripts."""
+
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .config import STATUS_FILE, STATUS_POSITION_STEP, STATUS_SOCKET
+from .storage import write_json_atomic
+
+
+@dataclass(frozen=True, slots=True)
+class Status:
+    """What is playing. ``state`` is playing, paused or stopped."""
+
+    state: str = "stopped"
+    title: str = ""
+    video_id: str = ""
+    position: float = 0.0
+    duration: float = 0.0
+    queue_length: int = 0
+
+    def key(self, step: float) -> tuple:
+        """The parts whose change is worth an update."""
+        return (
+            self.state,
+            self.video_id,
+            self.title,
+            round(self.duration),
+            self.queue_length,
+            int(self.position // step) if step > 0 else 0,
+        )
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["position"] = round(self.position, 1)
+        data["duration"] = round(self.duration, 1)
+        # Lets readers extrapolate the position between updates.
+        data["updated"] = round(time.time(), 3)
+        return data
+
+
+class StatusPublisher:
+    """Pushes ``Status`` changes to subscribers of a Unix socket.
+
+    A subscriber connects to ``socket_path`` and reads one JSON line at
+    once, then one per change; it never has to poll. ``publish`` is cheap
+    to call often: unless the state, track, queue length or position
+    bucket of ``step`` seconds changed it only compares a tuple. A change
+    is encoded once and written to every client without blocking; a client
+    too slow to take it is dropped. With ``file_path`` set, the same JSON
+    also replaces that file atomically on each change.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = STATUS_SOCKET,
+        file_path: Optional[Path] = STATUS_FILE,
+        step: float = STATUS_POSITION_STEP,
+    ):
+        self.socket_path = socket_path
+        self.file_path = file_path
+        self.step = step
+        self.published = 0
+        self._key: Optional[tuple] = None
+        self._line = b""
+        self._clients: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Listen on the socket; False if another instance already does."""
+        if not self.socket_path or self._server is not None:
+            return False
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+            return False
+        except OSError:
+            # Nobody is listening; a leftover socket file can go.
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        finally:
+            probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+            # Only this user may read what is playing, from the moment the
+            # socket file exists.
+            umask = os.umask(0o177)
+            try:
+                server.bind(self.socket_path)
+            finally:
+                os.umask(umask)
+            server.listen()
+        except OSError:
+            server.close()
+            return False
+        self._server = server
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return True
+
+    def _serve(self) -> None:
+        sel = selectors.DefaultSelector()
+        sel.register(self._server, selectors.EVENT_READ)
+        while not self._stop.is_set():
+            for key, _ in sel.select(timeout=0.5):
+                if key.fileobj is self._server:
+                    try:
+                        conn, _ = self._server.accept()
+                    except OSError:
+                        continue
+                    conn.setblocking(False)
+                    with self._lock:
+                        line = self._line
+                        self._clients.append(conn)
+                    if line and not self._send(conn, line):
+                        continue
+                    sel.register(conn, selectors.EVENT_READ)
+                else:
+                    # Subscribers send nothing; readable means gone.
+                    conn = key.fileobj
+                    try:
+                        gone = not conn.recv(64)
+                    except BlockingIOError:
+                        gone = False
+                    except OSError:
+                        gone = True
+                    if gone:
+                        sel.unregister(conn)
+                        self._drop(conn)
+        sel.close()
+
+    def _send(self, conn: socket.socket, line: bytes) -> bool:
+        try:
+            if conn.send(line) == len(line):
+                return True
+        except OSError:
+            pass
+        self._drop(conn)
+        return False
+
+    def _drop(self, conn: socket.socket) -> None:
+        with self._lock:
+            if conn in self._clients:
+                self._clients.remove(conn)
+        conn.close()
+
+    def publish(self, status: Status) -> bool:
+        """Push status if it differs in a way worth reporting."""
+        key = status.key(self.step)
+        if key == self._key:
+            return False
+        self._key = key
+        data = status.to_dict()
+        line = (json.dumps(data, ensure_ascii=False) + "\n").encode()
+        with self._lock:
+            self._line = line
+            clients = list(self._clients)
+        for conn in clients:
+            self._send(conn, line)
+        if self.file_path is not None:
+            try:
+                write_json_atomic(self.file_path, data)
+            except OSError:
+                pass
+        self.published += 1
+        return True
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            conn.close()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def subscribe(socket_path: str = STATUS_SOCKET) -> Iterator[dict]:
+    """Yield the current status, then each change, until the app exits."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        for line in s.makefile("rb"):
+            yield json.loads(line)
@@ -1,7 +1,13 @@
 import json
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
+from typing import Any, Callable, Optional
 
-from .models import Playlist, Track
+from .config import SAVE_WINDOW
+from .models import Playlist, Track, intern_track
 
 
 CONFIG_DIR = Path.home() / ".config" / "ytmusic"
@@ -12,6 +18,26 @@ def _ensure_config_dir():
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def write_json_atomic(path: Path, data, indent: Optional[int] = None) -> None:
+    """Write JSON to a temp file, fsync it and rename it over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def _get_default_data() -> dict:
     default_id = "default"
     return {
@@ -34,7 +60,9 @@ def load_playlists() -> dict[str, Playlist]:
     default_id = data.get("default_id", "default")
 
     for pid, pdata in data.get("playlists", {}).items():
-        tracks = [Track(t["title"], t["video_id"]) for t in pdata.get("tracks", [])]
+        tracks = [
+            intern_track(t["title"], t["video_id"]) for t in pdata.get("tracks", [])
+        ]
         playlists[pid] = Playlist(
             id=pid,
             name=pdata.get("name", "Unnamed"),
@@ -46,20 +74,147 @@ def load_playlists() -> dict[str, Playlist]:
 
 
 def _write_default_data(data: dict) -> None:
-    with open(PLAYLISTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_json_atomic(PLAYLISTS_FILE, data, indent=2)
 
 
-def save_playlists(playlists: dict[str, Playlist], default_id: str) -> None:
-    _ensure_config_dir()
+PlaylistsSnapshot = tuple[str, list[tuple[str, str, tuple[Track, ...]]]]
+
+
+def snapshot_playlists(
+    playlists: dict[str, Playlist], default_id: str
+) -> PlaylistsSnapshot:
+    """A copy of the playlists that later edits cannot change; cheap to take."""
+    return default_id, [
+        (pid, pl.name, tuple(pl.tracks)) for pid, pl in playlists.items()
+    ]
 
-    data = {"default_id": default_id, "playlists": {}}
 
-    for pid, pl in playlists.items():
-        data["playlists"][pid] = {
-            "name": pl.name,
-            "tracks": [{"title": t.title, "video_id": t.video_id} for t in pl.tracks],
-        }
+def playlists_data(snapshot: PlaylistsSnapshot) -> dict:
+    default_id, rows = snapshot
+    return {
+        "default_id": default_id,
+        "playlists": {
+            pid: {
+                "name": name,
+                "tracks": [{"title": t.title, "video_id": t.video_id} for t in tracks],
+            }
+            for pid, name, tracks in rows
+        },
+    }
 
-    with open(PLAYLISTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def save_playlists(playlists: dict[str, Playlist], default_id: str) -> None:
+    """Write the playlists file now; a crash leaves the old or new file."""
+    _ensure_config_dir()
+    data = playlists_data(snapshot_playlists(playlists, default_id))
+    write_json_atomic(PLAYLISTS_FILE, data, indent=2)
+
+
+class WriteBehind:
+    """Saves of one JSON file, coalesced and written on a background thread.
+
+    ``submit`` only keeps the latest state: the first change after a write
+    starts a ``window`` second wait, and whatever was submitted last when
+    it ends is passed through ``encode`` and written with
+    ``write_json_atomic`` on the writer thread, one write at a time. The
+    state must not change after it is submitted; take a copy. ``flush``
+    writes anything pending and waits for it; ``close`` flushes and stops
+    the thread. A failed write is kept in ``error`` and its state retried
+    after ``retry`` seconds unless a newer one comes first; ``flush`` gives
+    up after one failed attempt rather than wait out a broken disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        encode: Callable[[Any], Any] = lambda state: state,
+        window: float = SAVE_WINDOW,
+        indent: Optional[int] = None,
+        retry: float = 5.0,
+    ):
+        self.path = path
+        self.encode = encode
+        self.window = window
+        self.indent = indent
+        self.retry = retry
+        self.submitted = 0
+        self.written = 0
+        self.attempts = 0
+        self.error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        self._state: Any = None
+        self._pending = False
+        self._writing = False
+        self._due = 0.0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, state: Any) -> None:
+        with self._cond:
+            self._state = state
+            self.submitted += 1
+            if not self._pending:
+                self._pending = True
+                self._due = time.monotonic() + self.window
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                wait = self._due - time.monotonic()
+                if wait > 0 and not self._closed:
+                    self._cond.wait(wait)
+                    continue
+                self._write_locked()
+
+    def _write_locked(self) -> None:
+        """Write the latest state; called and returns with the lock held."""
+        state, self._state, self._pending = self._state, None, False
+        self._writing = True
+        self._cond.release()
+        try:
+            write_json_atomic(self.path, self.encode(state), indent=self.indent)
+            error = None
+        except (OSError, ValueError) as e:
+            error = e
+        finally:
+            self._cond.acquire()
+            self._writing = False
+        self.error = error
+        self.attempts += 1
+        if error is None:
+            self.written += 1
+        elif not self._pending and not self._closed:
+            self._state, self._pending = state, True
+            self._due = time.monotonic() + self.retry
+        self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Write anything pending now and wait until it is on disk."""
+        with self._cond:
+            self._due = 0.0
+            self._cond.notify_all()
+            start = self.attempts
+            while self._writing or (self._pending and self._thread is not None):
+                if self.error is not None and self.attempts > start:
+                    return
+                self._cond.wait(0.1)
+            if self._pending:
+                # No writer thread (closed); write on the caller's.
+                self._write_locked()
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
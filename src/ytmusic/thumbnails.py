@@ -0,0 +1,130 @@
+"""Album-art thumbnails rendered as half-block terminal cells."""
+
+import os
+import threading
+import urllib.parse
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it no art is shown.
+    Image = None
+
+from .config import (
+    THUMBNAIL_CACHE_BYTES,
+    THUMBNAIL_CELLS,
+    THUMBNAIL_DIR,
+    THUMBNAIL_URL,
+)
+from .scheduler import Priority, scheduler
+
+_lock = threading.Lock()
+
+
+def render_half_blocks(image, cols: int, rows: int) -> str:
+    """Downscale an image to cols x rows cells of upper-half blocks.
+
+    Each cell shows two pixels: the foreground colour is the top one and the
+    background colour the bottom one.
+    """
+    img = image.convert("RGB").resize((cols, rows * 2), Image.LANCZOS)
+    px = img.load()
+    lines = []
+    for y in range(0, rows * 2, 2):
+        cells = []
+        for x in range(cols):
+            top = "#%02x%02x%02x" % px[x, y]
+            bottom = "#%02x%02x%02x" % px[x, y + 1]
+            cells.append(f"[{top} on {bottom}]▀[/]")
+        lines.append("".join(cells))
+    return "\n".join(lines)
+
+
+class ThumbnailCache:
+    """On-disk cache of pre-rendered thumbnails with LRU eviction.
+
+    Entries are keyed by video_id and ordered by mtime, which is refreshed on
+    every hit; the oldest entries are dropped once the directory grows past
+    ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Path = THUMBNAIL_DIR,
+        max_bytes: int = THUMBNAIL_CACHE_BYTES,
+        url_template: str = THUMBNAIL_URL,
+        cells: tuple[int, int] = THUMBNAIL_CELLS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.url_template = url_template
+        self.cells = cells
+
+    def _path(self, video_id: str) -> Path:
+        return self.directory / f"{video_id}.txt"
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Return cached art, or fetch, render and cache it. Blocking."""
+        path = self._path(video_id)
+        try:
+            art = path.read_text(encoding="utf-8")
+            os.utime(path)
+            return art
+        except OSError:
+            pass
+        if Image is None:
+            return None
+        url = self.url_template.format(video_id=video_id)
+        try:
+            art = scheduler.submit(
+                lambda t: self._fetch(url),
+                Priority.BACKGROUND,
+                key=f"thumb:{video_id}",
+                host=urllib.parse.urlsplit(url).hostname,
+            ).result()
+        except Exception:
+            return None
+        if art is not None:
+            self._put(video_id, art)
+        return art
+
+    def _fetch(self, url: str) -> Optional[str]:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as resp:
+                data = resp.read()
+            with Image.open(BytesIO(data)) as img:
+                img.draft("RGB", (self.cells[0] * 4, self.cells[1] * 8))
+                return render_half_blocks(img, *self.cells)
+        except Exception:
+            return None
+
+    def _put(self, video_id: str, art: str) -> None:
+        with _lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(video_id).with_suffix(".tmp")
+            tmp.write_text(art, encoding="utf-8")
+            os.replace(tmp, self._path(video_id))
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for p in self.directory.glob("*.txt"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                pass
+            total -= size
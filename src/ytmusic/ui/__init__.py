@@ -6,6 +6,7 @@ from .widgets import (
     PlaylistTrackItem,
     QueueItem,
     NowPlayingBar,
+    SpectrumPanel,
 )
 from .keybar import KeyBar
 
@@ -15,5 +16,6 @@ __all__ = [
     "PlaylistTrackItem",
     "QueueItem",
     "NowPlayingBar",
+    "SpectrumPanel",
     "KeyBar",
 ]
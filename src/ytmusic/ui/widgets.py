@@ -1,6 +1,8 @@
 """UI widgets for YT Music application."""
 
 from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.css.query import NoMatches
 from textual.reactive import reactive
 from textual.widget import Widget
 from textual.widgets import Label, ListItem, Static
@@ -24,13 +26,19 @@ class TrackListItem(ListItem):
     def compose(self) -> ComposeResult:
         yield Label(f"  {self.index + 1:>2}.  {self.track.title}")
 
-    def _get_label(self) -> Label:
+    def _get_label(self) -> Label | None:
         if self._label is None:
-            self._label = self.query_one(Label)
+            try:
+                self._label = self.query_one(Label)
+            except NoMatches:
+                # Removed by a rapid redraw before it was composed.
+                return None
         return self._label
 
     def watch_highlighted(self, value: bool) -> None:
         label = self._get_label()
+        if label is None:
+            return
         if value:
             label.update(
                 f"  [bold #7b7bff]{self.index + 1:>2}.  {self.track.title}[/bold #7b7bff]"
@@ -49,20 +57,33 @@ class PlaylistListItem(ListItem):
         self.playlist: Playlist = playlist
         self._label: Label | None = None
 
+    def _icon(self) -> str:
+        if self.playlist.is_default:
+            return "⭐"
+        if self.playlist.is_virtual:
+            return "🕘"
+        return "🎵"
+
     def compose(self) -> ComposeResult:
-        icon = "⭐" if self.playlist.is_default else "🎵"
+        icon = self._icon()
         count = len(self.playlist.tracks)
         name = f"{self.playlist.name} [dim]({count} tracks)[/dim]"
         yield Label(f"  {icon}  {name}")
 
-    def _get_label(self) -> Label:
+    def _get_label(self) -> Label | None:
         if self._label is None:
-            self._label = self.query_one(Label)
+            try:
+                self._label = self.query_one(Label)
+            except NoMatches:
+                # Removed by a rapid redraw before it was composed.
+                return None
         return self._label
 
     def watch_highlighted(self, value: bool) -> None:
         label = self._get_label()
-        icon = "⭐" if self.playlist.is_default else "🎵"
+        if label is None:
+            return
+        icon = self._icon()
         count = len(self.playlist.tracks)
         if value:
             label.update(
@@ -73,29 +94,50 @@ class PlaylistListItem(ListItem):
 
 
 class PlaylistTrackItem(ListItem):
-    """List item for tracks in a playlist."""
+    """List item for tracks in a playlist; ``dead`` marks unavailable ones."""
 
     highlighted: reactive[bool] = reactive(False)
 
-    def __init__(self, track: Track, index: int, playing: bool = False):
+    def __init__(
+        self, track: Track, index: int, playing: bool = False, dead: bool = False
+    ):
         super().__init__()
         self.track: Track = track
         self.index: int = index
         self.playing: bool = playing
+        self.dead: bool = dead
         self._label: Label | None = None
 
     def compose(self) -> ComposeResult:
         icon = "[bold #4dff88]▶ [/bold #4dff88]" if self.playing else "   "
-        yield Label(f"  {icon}{self.index + 1:>2}.  {self.track.title[:50]}")
+        if self.dead:
+            yield Label(self._dead_text())
+        else:
+            yield Label(f"  {icon}{self.index + 1:>2}.  {self.track.title[:50]}")
+
+    def _dead_text(self) -> str:
+        return (
+            f"  [#ff5566]✗ [/#ff5566][#666688]{self.index + 1:>2}.  "
+            f"[strike]{self.track.title[:50]}[/strike]  unavailable[/#666688]"
+        )
 
-    def _get_label(self) -> Label:
+    def _get_label(self) -> Label | None:
         if self._label is None:
-            self._label = self.query_one(Label)
+            try:
+                self._label = self.query_one(Label)
+            except NoMatches:
+                # Removed by a rapid redraw before it was composed.
+                return None
         return self._label
 
     def watch_highlighted(self, value: bool) -> None:
         label = self._get_label()
-        if self.playing:
+        if label is None:
+            return
+        if self.dead:
+            text = self._dead_text()
+            label.update(f"[bold]{text}[/bold]" if value else text)
+        elif self.playing:
             icon = "[bold #4dff88]▶ [/bold #4dff88]"
             if value:
                 label.update(
@@ -128,13 +170,19 @@ class QueueItem(ListItem):
         icon = "[bold #4dff88]▶ [/bold #4dff88]" if self.playing else "   "
         yield Label(f"  {icon}{self.index + 1:>2}.  {self.track.title[:42]}")
 
-    def _get_label(self) -> Label:
+    def _get_label(self) -> Label | None:
         if self._label is None:
-            self._label = self.query_one(Label)
+            try:
+                self._label = self.query_one(Label)
+            except NoMatches:
+                # Removed by a rapid redraw before it was composed.
+                return None
         return self._label
 
     def watch_highlighted(self, value: bool) -> None:
         label = self._get_label()
+        if label is None:
+            return
         if self.playing:
             icon = "[bold #4dff88]▶ [/bold #4dff88]"
             if value:
@@ -158,14 +206,26 @@ class NowPlayingBar(Widget):
     track: reactive[Track | None] = reactive(None)
     paused: reactive[bool] = reactive(False)
     tick: reactive[int] = reactive(0)
+    art: reactive[str] = reactive("")
 
     def __init__(self, player: Player, **kwargs):
         super().__init__(**kwargs)
         self._player = player
 
     def compose(self) -> ComposeResult:
-        yield Static("", id="np-track")
-        yield Static("", id="np-bar")
+        yield Static("", id="np-art")
+        with Vertical(id="np-info"):
+            yield Static("", id="np-track")
+            yield Static("", id="np-bar")
+        yield SpectrumPanel(id="np-spectrum")
+
+    def watch_art(self, art: str) -> None:
+        try:
+            art_w = self.query_one("#np-art", Static)
+        except Exception:
+            return
+        art_w.update(art)
+        art_w.display = bool(art)
 
     def on_mount(self):
         from ..config import NOW_PLAYING_INTERVAL
@@ -176,6 +236,22 @@ class NowPlayingBar(Widget):
         self.tick += 1
         self._draw()
 
+    @staticmethod
+    def _buffer_health(buffer, remaining: float) -> str:
+        from ..config import BUFFER_LOW_SECS
+
+        ahead = buffer.cache_duration
+        if ahead <= 0:
+            return ""
+        # Having the rest of the track buffered is healthy however short.
+        if ahead >= remaining - 1 or ahead >= BUFFER_LOW_SECS * 3:
+            col = "#4dff88"
+        elif ahead >= BUFFER_LOW_SECS:
+            col = "#ffcc44"
+        else:
+            col = "#ff6b6b"
+        return f"  [{col}]▮[/{col}] [dim #444468]{ahead:.0f}s[/dim #444468]"
+
     def _draw(self):
         try:
             track_w = self.query_one("#np-track", Static)
@@ -197,8 +273,14 @@ class NowPlayingBar(Widget):
             offset = self.tick % (len(title) + 7)
             title = padded[offset : offset + max_len]
 
+        buffer = self._player.buffer
         if self.paused:
             badge = "[on #3a0a0a][bold #ff6b6b] ⏸  PAUSED [/bold #ff6b6b][/on #3a0a0a]"
+        elif buffer.stalled:
+            badge = (
+                f"[on #2a2008][bold #ffcc44] ◌  BUFFERING {buffer.buffering_pct}% "
+                f"[/bold #ffcc44][/on #2a2008]"
+            )
         else:
             dot = ["●", "○"][(self.tick // 3) % 2]
             badge = f"[on #0a2a14][bold #4dff88] {dot}  PLAYING [/bold #4dff88][/on #0a2a14]"
@@ -238,6 +320,7 @@ class NowPlayingBar(Widget):
                 f"  [dim #444468]{format_time(pos)}[/dim #444468]  "
                 f"{pb}  "
                 f"[dim #444468]{format_time(dur)}[/dim #444468]"
+                f"{self._buffer_health(buffer, dur - pos)}"
             )
         else:
             from ..config import PROGRESS_BAR_WIDTH
@@ -253,3 +336,28 @@ class NowPlayingBar(Widget):
             bar_w.update(
                 f"  [dim #333355]0:00[/dim #333355]  {pb}  [dim #333355]loading...[/dim #333355]"
             )
+
+
+class SpectrumPanel(Static):
+    """Spectrum bars and a level meter, drawn from 0..1 band levels."""
+
+    BLOCKS = " ▁▂▃▄▅▆▇█"
+    ROW_COLORS = ("#ff6b6b", "#ffcc44", "#4dff88", "#5577ff")
+
+    def __init__(self, rows: int = 4, **kwargs):
+        super().__init__("", **kwargs)
+        self.rows = rows
+
+    def show(self, levels, level_db: float) -> None:
+        from ..spectrum import FLOOR_DB
+
+        heights = [round(v * self.rows * 8) for v in levels]
+        vu = round((1 - level_db / FLOOR_DB) * self.rows * 8)
+        lines = []
+        for row in range(self.rows):
+            base = (self.rows - 1 - row) * 8
+            col = self.ROW_COLORS[row + len(self.ROW_COLORS) - self.rows]
+            bars = "".join(self.BLOCKS[max(0, min(8, h - base))] for h in heights)
+            meter = self.BLOCKS[max(0, min(8, vu - base))] * 2
+            lines.append(f"[{col}]{bars}[/{col}] [bold {col}]{meter}[/bold {col}]")
+        self.update("\n".join(lines))
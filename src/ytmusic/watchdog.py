@@ -0,0 +1,231 @@
+"""Resource sampling for long sessions: memory, descriptors, threads, children."""
+
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .config import (
+    WATCHDOG_INTERVAL,
+    WATCHDOG_LOG,
+    WATCHDOG_LOG_BACKUPS,
+    WATCHDOG_LOG_BYTES,
+    WATCHDOG_TOP,
+    WATCHDOG_WINDOW,
+)
+
+
+@dataclass(slots=True)
+class ResourceSample:
+    """One reading of this process's resources; -1 where unavailable."""
+
+    at: float
+    rss_kib: int = -1
+    fds: int = -1
+    threads: int = 0
+    children: int = -1
+    zombies: int = -1
+    extra: dict[str, int] = field(default_factory=dict)
+
+    def metrics(self) -> dict[str, float]:
+        values = {
+            "rss_mib": self.rss_kib / 1024 if self.rss_kib >= 0 else -1,
+            "fds": self.fds,
+            "threads": self.threads,
+            "children": self.children,
+            "zombies": self.zombies,
+            **self.extra,
+        }
+        return {k: v for k, v in values.items() if v >= 0}
+
+
+def _rss_kib() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def _fd_count() -> int:
+    for d in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(d))
+        except OSError:
+            continue
+    return -1
+
+
+def _children() -> tuple[int, int]:
+    """Direct child processes of this one, and how many are zombies."""
+    pid = os.getpid()
+    children = zombies = 0
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return -1, -1
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may hold spaces; fields resume after its ")".
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        if int(fields[1]) == pid:
+            children += 1
+            zombies += fields[0] == b"Z"
+    return children, zombies
+
+
+def sample(extra: Optional[Callable[[], dict[str, int]]] = None) -> ResourceSample:
+    children, zombies = _children()
+    s = ResourceSample(
+        at=time.monotonic(),
+        rss_kib=_rss_kib(),
+        fds=_fd_count(),
+        threads=threading.active_count(),
+        children=children,
+        zombies=zombies,
+    )
+    if extra is not None:
+        try:
+            s.extra = dict(extra())
+        except Exception:
+            pass
+    return s
+
+
+def slope_per_hour(points: list[tuple[float, float]]) -> float:
+    """Least-squares slope of (seconds, value) points, per hour."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mx = sum(p[0] for p in points) / n
+    my = sum(p[1] for p in points) / n
+    var = sum((p[0] - mx) ** 2 for p in points)
+    if var == 0:
+        return 0.0
+    cov = sum((p[0] - mx) * (p[1] - my) for p in points)
+    return cov / var * 3600
+
+
+class Watchdog:
+    """Samples resources every ``interval`` seconds on a daemon thread.
+
+    Each sample is logged to a rotating ``WATCHDOG_LOG`` with the growth
+    of every metric since the first sample and its trend per hour over the
+    last ``WATCHDOG_WINDOW`` samples. With ``trace`` set, tracemalloc runs
+    too and the ``WATCHDOG_TOP`` source lines whose allocations grew most
+    since the first sample are logged with each sample; tracing slows
+    allocation, so it is off by default. ``extra`` adds counters of the
+    caller's own, such as live widgets.
+    """
+
+    def __init__(
+        self,
+        interval: float = WATCHDOG_INTERVAL,
+        log_path: Optional[Path] = WATCHDOG_LOG,
+        extra: Optional[Callable[[], dict[str, int]]] = None,
+        trace: bool = False,
+    ):
+        self.interval = interval
+        self.extra = extra
+        self.trace = trace
+        self.samples: deque[ResourceSample] = deque(maxlen=WATCHDOG_WINDOW)
+        self.first: Optional[ResourceSample] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._log = logging.getLogger(f"ytmusic.watchdog.{id(self)}")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                log_path,
+                maxBytes=WATCHDOG_LOG_BYTES,
+                backupCount=WATCHDOG_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._log.addHandler(handler)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; does not wait for a sample in progress."""
+        self._stop.set()
+        for handler in self._log.handlers[:]:
+            self._log.removeHandler(handler)
+            handler.close()
+
+    def _run(self) -> None:
+        self.check()
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> ResourceSample:
+        """Take a sample now, log it and return it."""
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        s = sample(self.extra)
+        if self.first is None:
+            self.first = s
+        self.samples.append(s)
+        self._log.info(self.describe(s))
+        if self.trace and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            if self._baseline is None:
+                self._baseline = snapshot
+            else:
+                for stat in snapshot.compare_to(self._baseline, "lineno")[
+                    :WATCHDOG_TOP
+                ]:
+                    self._log.info(f"  alloc {stat}")
+        return s
+
+    def growth(self) -> dict[str, float]:
+        """Change of each metric since the first sample."""
+        if self.first is None or not self.samples:
+            return {}
+        base, last = self.first.metrics(), self.samples[-1].metrics()
+        return {k: v - base[k] for k, v in last.items() if k in base}
+
+    def trends(self) -> dict[str, float]:
+        """Per-hour slope of each metric over the recent samples."""
+        series: dict[str, list[tuple[float, float]]] = {}
+        for s in self.samples:
+            for k, v in s.metrics().items():
+                series.setdefault(k, []).append((s.at, v))
+        return {k: slope_per_hour(points) for k, points in series.items()}
+
+    def describe(self, s: ResourceSample) -> str:
+        growth, trends = self.growth(), self.trends()
+        parts = []
+        for k, v in s.metrics().items():
+            text = f"{k}={v:.1f}" if k == "rss_mib" else f"{k}={v:.0f}"
+            if growth.get(k):
+                text += f" ({growth[k]:+.1f}, {trends.get(k, 0.0):+.2f}/h)"
+            parts.append(text)
+        return " ".join(parts)
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "Resources: not sampled yet"
+        return "Resources: " + self.describe(self.samples[-1])
@@ -0,0 +1,118 @@
+"""Several independent playback zones in one process."""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from .history import PlayHistory
+from .models import Track
+from .player import Player
+from .resolver import StreamResolver
+
+
+@dataclass
+class Zone:
+    """One output: its own player, queue and position in it."""
+
+    name: str
+    player: Player
+    queue: list[Track] = field(default_factory=list)
+    queue_index: int = 0
+    repeat: bool = True
+
+    @property
+    def current(self) -> Optional[Track]:
+        return self.player.current
+
+    def peek_next(self) -> Optional[Track]:
+        if not self.queue:
+            return None
+        nxt = self.queue_index + 1
+        if nxt >= len(self.queue):
+            if not self.repeat:
+                return None
+            nxt = 0
+        return self.queue[nxt]
+
+
+class ZoneManager:
+    """Runs one ``Player`` per zone over a shared resolver and history.
+
+    Zones share the stream resolver (and so its URL cache and speculation),
+    the play history and the player poller thread, so a zone costs one mpv
+    process plus its IPC socket. ``on_change`` is called with the zone
+    whenever it starts a track or runs out of queue.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[StreamResolver] = None,
+        history: Optional[PlayHistory] = None,
+        on_change: Optional[Callable[[Zone], None]] = None,
+    ):
+        self.resolver = resolver or StreamResolver()
+        self.history = history
+        self.on_change = on_change
+        self.zones: dict[str, Zone] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, audio_device: Optional[str] = None) -> Zone:
+        with self._lock:
+            if name in self.zones:
+                raise ValueError(f"zone {name!r} already exists")
+            zone = Zone(name, Player(self.resolver, audio_device=audio_device))
+            self.zones[name] = zone
+        zone.player.on_finish = lambda: self._on_finish(zone)
+        zone.player.peek_next = zone.peek_next
+        return zone
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            zone = self.zones.pop(name)
+        zone.player.stop()
+
+    def enqueue(self, name: str, tracks: Iterable[Track]) -> None:
+        self.zones[name].queue.extend(tracks)
+
+    def play(self, name: str, index: int = 0) -> None:
+        """Play the zone's queue from index."""
+        zone = self.zones[name]
+        if not zone.queue:
+            return
+        zone.queue_index = index % len(zone.queue)
+        self._start(zone)
+
+    def next(self, name: str) -> None:
+        zone = self.zones[name]
+        if zone.queue:
+            self.play(name, zone.queue_index + 1)
+
+    def toggle_pause(self, name: str) -> None:
+        self.zones[name].player.toggle_pause()
+
+    def stop(self, name: str) -> None:
+        self.zones[name].player.stop()
+
+    def stop_all(self) -> None:
+        for zone in list(self.zones.values()):
+            zone.player.stop()
+
+    def _start(self, zone: Zone) -> None:
+        track = zone.queue[zone.queue_index]
+        zone.player.play(track)
+        if self.history is not None:
+            self.history.record_play(track)
+        if self.on_change:
+            self.on_change(zone)
+
+    def _on_finish(self, zone: Zone) -> None:
+        finished = zone.player.current
+        if finished is not None and self.history is not None:
+            self.history.record_finish(finished)
+        if zone.peek_next() is None:
+            zone.player.stop()
+            if self.on_change:
+                self.on_change(zone)
+            return
+        zone.queue_index = (zone.queue_index + 1) % len(zone.queue)
+        self._start(zone)